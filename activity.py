@@ -0,0 +1,135 @@
+from __future__ import annotations
+import arcade
+import heapq
+import itertools
+from spatial import SpatialGrid
+from typing import Tuple
+
+
+# Ground enemies and hostages spend most of their time a long way from the lander, where all their on_update() is
+# doing is counting down to the next thing they do (fire a missile, switch their shield on or off ...).
+# So when they're far enough away from the camera, I put them (along with their shields) to sleep.
+# Each one says how long it can be left alone before something happens, and is woken in time for that - or as soon
+# as it comes near the camera.  When it wakes, it gets one update covering all the time it slept through, so its
+# timers end up exactly where they would have been anyway.
+
+# Sleepers are woken a hair early rather than a hair late (well over constants.TIMER_TOLERANCE), so floating point
+# error can't delay anything by a frame.  Waking early doesn't matter - it's just an update where nothing happens.
+WAKE_EARLY_BY = 1e-6
+
+
+class ActivityManager:
+    """Puts ground entities that are far from the camera to sleep, and catches them up when they wake"""
+    def __init__(self, awake_distance: float, cell_size: int = 256):
+        # Anything within this distance of the camera's view is always awake
+        self.awake_distance = awake_distance
+        self.time = 0  # Total time simulated so far
+        # Everything we're looking after, so we can quickly find what's near the camera
+        self.grid = SpatialGrid(cell_size=cell_size)
+        self.awake: dict[arcade.Sprite, None] = {}
+        # Sleeping entities: the time they've been updated up to, and a token for their place in the wake queue
+        self.sleeping: dict[arcade.Sprite, Tuple[float, int]] = {}
+        self.wake_queue: list[Tuple[float, int, arcade.Sprite]] = []
+        # Entities woken since the last frame started, and the time they'd been updated up to
+        self.waking: dict[arcade.Sprite, float] = {}
+        # Every sprite (entities and their shields) that isn't to be updated this frame
+        self.asleep: set[arcade.Sprite] = set()
+        # The delta time for any sprite catching up this frame
+        self.catch_up: dict[arcade.Sprite, float] = {}
+        self._tokens = itertools.count()
+
+    def __len__(self):
+        return len(self.awake) + len(self.sleeping) + len(self.waking)
+
+    @staticmethod
+    def members(entity: arcade.Sprite) -> list[arcade.Sprite]:
+        # An entity sleeps and wakes along with its shield (and the shield's 'disabled' sprite)
+        members = [entity]
+        if (shield := getattr(entity, 'shield', None)) is not None:
+            members.append(shield)
+            if shield.disabled_shield is not None:
+                members.append(shield.disabled_shield)
+        return members
+
+    def add(self, entity: arcade.Sprite):
+        # Starts off awake - it'll be put to sleep at the start of the next frame if it's far enough away
+        self.grid.insert(entity)
+        self.awake[entity] = None
+
+    def moved(self, entity: arcade.Sprite):
+        # Ground entities only move when they're wrapped around the world.  Shields normally follow their owners
+        # in their own on_update(), so if they're asleep, I move them here.
+        if entity not in self.grid:
+            return
+        self.grid.insert(entity)
+        if entity in self.sleeping:
+            for member in self.members(entity)[1:]:
+                member.position = entity.position
+
+    def wake(self, entity: arcade.Sprite):
+        # Caught up at the start of the next frame
+        if entity in self.sleeping:
+            updated_until, _ = self.sleeping.pop(entity)
+            self.waking[entity] = updated_until
+
+    def sleep(self, entity: arcade.Sprite, updated_until: float):
+        del self.awake[entity]
+        token = next(self._tokens)
+        self.sleeping[entity] = (updated_until, token)
+        self.asleep.update(self.members(entity))
+        time_to_next_event = entity.time_to_next_event()
+        if time_to_next_event != float('inf'):
+            heapq.heappush(self.wake_queue, (updated_until + time_to_next_event, token, entity))
+
+    def forget(self, entity: arcade.Sprite):
+        # It's gone (died or been rescued)
+        self.grid.remove(entity)
+        self.awake.pop(entity, None)
+        self.sleeping.pop(entity, None)
+        self.waking.pop(entity, None)
+        self.asleep.difference_update(self.members(entity))
+
+    def begin_frame(self, delta_time: float, camera: arcade.Camera):
+        updated_until = self.time
+        self.time += delta_time
+        self.catch_up.clear()
+        left, bottom = camera.position
+        region = (left - self.awake_distance,
+                  bottom - self.awake_distance,
+                  left + camera.viewport_width + self.awake_distance,
+                  bottom + camera.viewport_height + self.awake_distance)
+
+        # Anything awake that's now far enough from the camera goes to sleep
+        for entity in list(self.awake):
+            if not entity.sprite_lists:
+                self.forget(entity)
+            elif (entity.right < region[0] or entity.left > region[2] or
+                  entity.top < region[1] or entity.bottom > region[3]):
+                self.sleep(entity, updated_until)
+        # Anything asleep that's come near the camera wakes up ...
+        for entity in self.grid.query(*region):
+            self.wake(entity)
+        # ... as does anything that has something to do
+        while self.wake_queue and self.wake_queue[0][0] <= self.time + WAKE_EARLY_BY:
+            _, token, entity = heapq.heappop(self.wake_queue)
+            if self.sleeping.get(entity, (None, None))[1] == token:
+                self.wake(entity)
+
+        for entity, slept_from in list(self.waking.items()):
+            if not entity.sprite_lists:
+                self.forget(entity)
+                continue
+            self.awake[entity] = None
+            for member in self.members(entity):
+                self.asleep.discard(member)
+                self.catch_up[member] = self.time - slept_from
+        self.waking.clear()
+
+    def update_scene(self, scene: arcade.Scene, delta_time: float, camera: arcade.Camera):
+        # Does the same as scene.on_update(), but skips anything that's asleep
+        self.begin_frame(delta_time, camera)
+        for sprite_list in scene.sprite_lists:
+            for sprite in sprite_list:
+                if sprite in self.asleep:
+                    continue
+                sprite.on_update(self.catch_up.get(sprite, delta_time))
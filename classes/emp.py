@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 import arcade
+import itertools
 import math
+import numpy as np
 import constants
+import sounds
 from classes.engine import Engine
 from classes.shield import Shield
+from classes.shapes import CircleSprite
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from classes.game_object import GameObject
 
+# The spatial index is brought up to date during the collision checks, after everything's moved - so by the time the
+# EMP looks at it, things might have moved on a little since.  Look this much (in pixels) either side of the ring.
+INDEX_MARGIN = 64
 
-class EMP(arcade.SpriteCircle):
+
+class EMP(CircleSprite):
     """An EMP pulse disables any activated shields and engines it touches"""
     def __init__(self, *, scene: arcade.Scene,
                  owner: GameObject,
@@ -32,14 +40,14 @@ class EMP(arcade.SpriteCircle):
         self.center_x = owner.center_x
         self.center_y = owner.center_y
         self.scene.add_sprite('EMPs', self)
-        self.sound = constants.SOUNDS['sounds/emp.mp3']
+        self.sound = sounds.SOUNDS['sounds/emp.mp3']
         sound_speed = self.sound.get_length() / self.lifetime
-        self.sound_player = arcade.play_sound(sound=self.sound, speed=sound_speed, volume=2)
+        self.sound_player = sounds.play_sound(sound=self.sound, speed=sound_speed, volume=2)
         self.media_player_references = ['sound_player']
         self.root_2 = math.sqrt(2)
 
         # Another sprite, which shows the inner part of the EMP, within which it is safe to use engines / shields again
-        self.inner_circle = arcade.SpriteCircle(radius=self.final_radius, color=(*arcade.color.AUROMETALSAURUS, 50))
+        self.inner_circle = CircleSprite(radius=self.final_radius, color=(*arcade.color.AUROMETALSAURUS, 50))
         self.inner_circle.center_x = owner.center_x
         self.inner_circle.center_y = owner.center_y
         self.inner_circle_radius = 10  # Don't initialise with radius = 0!
@@ -60,7 +68,7 @@ class EMP(arcade.SpriteCircle):
         self.width = self.radius * 2
         self.height = self.radius * 2
         if self.radius - 2 * self.initial_radius > 0:
-            if self.inner_circle not in self.scene['EMPs']:
+            if not self.inner_circle.sprite_lists:
                 self.scene.add_sprite('EMPs', self.inner_circle)
             self.inner_circle.center_x = self.owner.center_x
             self.inner_circle.center_y = self.owner.center_y
@@ -73,25 +81,43 @@ class EMP(arcade.SpriteCircle):
         self.EMP_collisions()
 
     def EMP_collisions(self):
-        emp_collision_spritelists = [self.scene[name] for name in constants.EMP_COLLISION_SPRITELISTS]
-        for obj in [o for sprite_list in emp_collision_spritelists for o in sprite_list]:
-            distance = arcade.get_distance_between_sprites(self, obj)
-            # I imagine the EMP as a wave going outwards.  Might add some animation at some point.
-            # I kind of show that in the animation - there's like an outer wave in the expanding circle.
-            # For the user of the weapon, when they see they are in the inner part (which is almost immediately),
-            # it's safe for them to reactivate their shield and engine
-            if (self.inner_circle_radius < distance < self.radius  # Like a wave going outward
-                    # This catches the person firing the EMP if they are using their shield or engine when they actually fire it
-                    or distance < self.radius < 2 * self.initial_radius):
-                if obj in self.scene["Shields"]:
+        # Only look at what's near the wave front, rather than everything in the level - see SpatialGrid.query_annulus()
+        inner_radius = 0 if self.radius < 2 * self.initial_radius else self.inner_circle_radius
+        objects = self.nearby_targets(inner_radius - INDEX_MARGIN, self.radius + INDEX_MARGIN)
+        if not objects:
+            return
+        distances = np.hypot([o.center_x - self.center_x for o in objects],
+                             [o.center_y - self.center_y for o in objects])
+        # I imagine the EMP as a wave going outwards.  Might add some animation at some point.
+        # I kind of show that in the animation - there's like an outer wave in the expanding circle.
+        # For the user of the weapon, when they see they are in the inner part (which is almost immediately),
+        # it's safe for them to reactivate their shield and engine
+        hits = (((self.inner_circle_radius < distances) & (distances < self.radius))  # Like a wave going outward
+                # This catches the person firing the EMP if they are using their shield or engine when they actually fire it
+                | ((distances < self.radius) & (self.radius < 2 * self.initial_radius)))
+        for obj in itertools.compress(objects, hits):
+            if obj.category & constants.SHIELD:
+                shield: Shield = obj
+                if shield.activated and not shield.owner.category & constants.HOSTAGE:
+                    # EMP disables this shield!!
+                    # I've not thought about hostages yet ... maybe their shields get disabled and then they're
+                    # vulnerable?  For now, they are let off the hook and their shields keep working!
                     shield: Shield = obj
-                    if shield.activated and shield.owner not in self.scene["Hostages"]:
-                        # EMP disables this shield!!
-                        # I've not thought about hostages yet ... maybe their shields get disabled and then they're
-                        # vulnerable?  For now, they are let off the hook and their shields keep working!
-                        shield: Shield = obj
-                        shield.disable_for(self.disable_time)
-                if obj in self.scene["Engines"]:
-                    engine: Engine = obj
-                    if engine.activated:
-                        engine.disable_for(self.disable_time)
+                    shield.disable_for(self.disable_time)
+            if obj.category & constants.ENGINE:
+                engine: Engine = obj
+                if engine.activated:
+                    engine.disable_for(self.disable_time)
+
+    def nearby_targets(self, inner_radius: float, outer_radius: float) -> list[arcade.Sprite]:
+        """Everything the EMP cares about that's somewhere around the ring between the two radii"""
+        found = {}
+        for obj in self.owner.world.spatial_index.query_annulus((self.center_x, self.center_y),
+                                                                inner_radius, outer_radius):
+            if obj.category & constants.EMP_TARGETS and obj.sprite_lists:
+                found[obj] = None
+            # Engines aren't in the index themselves - but they're always right next to whatever they're pushing
+            engine = getattr(obj, 'engine', None)
+            if engine is not None and engine.sprite_lists:
+                found[engine] = None
+        return list(found)
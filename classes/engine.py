@@ -2,8 +2,10 @@ from __future__ import annotations
 import arcade
 import math
 import constants
+import physics
 from pathlib import Path
 import sounds
+from textures import TEXTURES
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from classes.game_object import GameObject
@@ -18,15 +20,38 @@ class Engine(arcade.Sprite):
                  scale: float = 0.3,
                  engine_owner_offset: int = None,
                  sound_enabled: bool = False,
-                 engine_activated_sound: arcade.Sound = constants.SOUNDS['sounds/engine.wav'],
-                 engine_disabled_sound: arcade.Sound = constants.SOUNDS['sounds/engine_disabled.mp3'],
-                 max_volume: float = 0.5):
+                 engine_activated_sound: arcade.Sound = None,
+                 engine_disabled_sound: arcade.Sound = None,
+                 max_volume: float = 0.5,
+                 add_to_scene: bool = True):
         super().__init__()
         self.scene = scene
-        self.textures = [arcade.load_texture("images/thrust_1.png"),
-                         arcade.load_texture("images/thrust_2.png")]
-        self.texture = self.textures[0]
+        self.textures = [TEXTURES["images/thrust_1.png"], TEXTURES["images/thrust_2.png"]]
         self.owner = owner  # This is the object whose engine this is
+
+        # Engine sounds
+        self.sound_enabled = sound_enabled
+        self.engine_sound = engine_activated_sound or sounds.SOUNDS['sounds/engine.wav']
+        self.engine_disabled_sound = engine_disabled_sound or sounds.SOUNDS['sounds/engine_disabled.mp3']
+        self.media_player_references = [
+            'engine_sound_player',
+            'engine_disabled_sound_player',
+        ]
+        # Num seconds after which sound attributes are updated.  If I do this every frame, sound is crackly and it doesn't work well.
+        self.sound_attributes_update_interval = 0.2
+
+        self.reset(fuel=fuel, force=force, scale=scale, engine_owner_offset=engine_owner_offset,
+                   max_volume=max_volume)
+        # A missile's engine goes into the scene along with the missile (see Missile.reset())
+        if add_to_scene:
+            self.scene.add_sprite('Engines', self)
+
+    def reset(self, fuel: int = 100, force: int = 5000, scale: float = 0.3, engine_owner_offset: int = None,
+              max_volume: float = 0.5):
+        # Back to how we were when we were made - engines get reused along with their missiles (see pools.py)
+        self.position = 0, 0
+        self.angle = 0
+        self.texture = self.textures[0]
         self.visible = False
         # Actual engine attributes (as opposed to sprite attributes)
         self.activated = False
@@ -37,32 +62,40 @@ class Engine(arcade.Sprite):
         self.burn_rate = 1
         self._boosted = False
         self.engine_owner_offset = engine_owner_offset if engine_owner_offset is not None else self.owner.height
-        self.scene.add_sprite('Engines', self)
         self.disabled_timer = 0
 
         self.velocity_x = self.owner.velocity_x
         self.velocity_y = self.owner.velocity_y
 
-        # Engine sounds
-        self.sound_enabled = sound_enabled
-        self.engine_sound = engine_activated_sound
         self.engine_sound_player = None
-        self.engine_disabled_sound = engine_disabled_sound
         self.engine_disabled_sound_player = None
-        self.media_player_references = [
-            'engine_sound_player',
-            'engine_disabled_sound_player',
-        ]
-
         self.max_volume = max_volume
         # I have a timer so I can control how long sounds play for before I adjust their attributes
         self.sound_timer = 0
-        # Num seconds after which sound attributes are updated.  If I do this every frame, sound is crackly and it doesn't work well.
-        self.sound_attributes_update_interval = 0.2
 
     def refuel(self):
         self.fuel = self.initial_fuel
 
+    # Our owner's row in the physics store needs to know whether we're on, and how hard we push (see physics.py)
+    @property
+    def activated(self) -> bool:
+        return self._activated
+
+    @activated.setter
+    def activated(self, value: bool):
+        self._activated = value
+        physics.store(self.owner, 'engine_on', value)
+
+    @property
+    def force(self) -> float:
+        return self._force
+
+    @force.setter
+    def force(self, value: float):
+        self._force = value
+        # (arcade.Sprite sets a force of its own, for pymunk, before we've got an owner)
+        physics.store(getattr(self, 'owner', None), 'engine_force', value)
+
     @property
     def disabled(self):
         return self.disabled_timer > 0
@@ -84,14 +117,14 @@ class Engine(arcade.Sprite):
             self.force /= 2
 
     def activate(self):
-        if self.disabled and self.owner.__class__.__name__ == ('Lander'):
-            self.engine_disabled_sound_player = self.sound_enabled and arcade.play_sound(self.engine_disabled_sound, volume=1)
+        if self.disabled and self.owner.category & constants.LANDER:
+            self.engine_disabled_sound_player = self.sound_enabled and sounds.play_sound(self.engine_disabled_sound, volume=1)
         elif self.fuel and not self.disabled:
             self.visible = True
             self.activated = True
             # Are we trying to take off after having landed?
             # Want to ensure we don't just immediately land again
-            if self.owner.__class__.__name__ == ('Lander'):
+            if self.owner.category & constants.LANDER:
                 from classes.lander import Lander
                 lander: Lander = self.owner
                 if lander.landed:
@@ -139,7 +172,7 @@ class Engine(arcade.Sprite):
             volume = sounds.get_volume_multiplier((self.center_x, self.center_y)) * self.max_volume
             if not (self.engine_sound_player
                     or self.engine_sound_player and not self.engine_sound.is_playing(self.engine_sound_player)):
-                self.engine_sound_player = arcade.play_sound(sound=self.engine_sound, looping=True, volume=volume)
+                self.engine_sound_player = sounds.play_sound(sound=self.engine_sound, looping=True, volume=volume)
             else:
                 self.engine_sound.set_volume(volume, player=self.engine_sound_player)
             if self.fuel == 0:
@@ -152,11 +185,11 @@ class Engine(arcade.Sprite):
                 self.disabled_timer = 0
                 # If the engine owner happens to be the Lander itself, and the user is still trying to activate
                 # the engine (ie. mouse button / key still pressed), we auto try to re-enable it here
-                if self.owner in self.scene["Lander"].sprite_list and self.owner.trying_to_activate_engine:
+                if self.owner.category & constants.LANDER and self.owner.trying_to_activate_engine:
                     self.activate()
 
     def disable_for(self, seconds: float):
         if self.activated:
-            self.engine_disabled_sound_player = self.sound_enabled and arcade.play_sound(self.engine_disabled_sound, volume=self.max_volume)
+            self.engine_disabled_sound_player = self.sound_enabled and sounds.play_sound(self.engine_disabled_sound, volume=self.max_volume)
         self.disabled_timer = seconds
         self.deactivate()
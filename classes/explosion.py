@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-import math
 import arcade
 import random
 from classes.game_object import GameObject
+from colliders import CircleCollider
 import constants
 import sounds
+import textures
 from typing import TYPE_CHECKING
-from pathlib import Path
 if TYPE_CHECKING:
     from classes.world import World
 
@@ -32,45 +32,43 @@ if TYPE_CHECKING:
 # backwards.  There should be a significant transfer of energy on impact
 # But then might the object fly away faster than the explosion increases in size?  Does this matter?
 
-EXPLOSION_SOUNDS = [arcade.load_sound(Path(bounce_sound)) for bounce_sound in Path('sounds').glob('explosion_*.mp3')]
+EXPLOSION_SOUNDS = sounds.sound_paths('explosion_')
+EXPLOSION_IMAGES = textures.image_paths('explosion_')
 
 
-class Explosion(GameObject):
-    def __init__(self,
-                 scene: arcade.Scene,
-                 world: World,
-                 camera: arcade.Camera,
-                 mass: int,
-                 scale: float,
-                 radius_initial: int,
-                 radius_final: int,
-                 lifetime: float,  # seconds
-                 force: float,  # exerted on mobile objects in contact
-                 velocity_x: float,
-                 velocity_y: float,
-                 center_x: int,
-                 center_y: int,
-                 owner: GameObject | None):
-        files = [
-            "images/explosion_1.png",
-            "images/explosion_2.png",
-            "images/explosion_3.png",
-            "images/explosion_4.png",
-        ]
-        file = random.choice(files)
-        super().__init__(filename=file,
-                         scale=scale * constants.SCALING,
+class Explosion(CircleCollider, GameObject):
+    # Explosions get reused once they've finished - they're made by the world's pools, and reset() every time
+    # something explodes.  See pools.py.
+    def __init__(self, scene: arcade.Scene, world: World, camera: arcade.Camera):
+        super().__init__(filename=EXPLOSION_IMAGES[0],
+                         scale=1,
                          camera=camera,
                          world=world,
                          explodes=False,
-                         mass=mass,
-                         scene=scene,
-                         center_x=center_x,
-                         center_y=center_y,
-                         velocity_x=velocity_x,
-                         velocity_y=velocity_y,
-                         angle=random.randint(1, 360),
-                         owner=owner)
+                         mass=1,
+                         scene=scene)
+        self.sound_player = None
+        self.media_player_references = ['sound_player']
+
+    def reset(self,
+              mass: int,
+              scale: float,
+              radius_initial: int,
+              radius_final: int,
+              lifetime: float,  # seconds
+              force: float,  # exerted on mobile objects in contact
+              velocity_x: float,
+              velocity_y: float,
+              center_x: int,
+              center_y: int,
+              owner: GameObject | None):
+        # (Explosions have always had the scaling applied twice over)
+        self.scale = scale * constants.SCALING * constants.SCALING
+        self.texture = textures.TEXTURES[self.world.random.choice(EXPLOSION_IMAGES)]
+        self.reset_state(center_x=center_x, center_y=center_y, velocity_x=velocity_x, velocity_y=velocity_y,
+                         angle=self.world.random.randint(1, 360))
+        self.mass = mass
+        self.owner = owner
 
         self.velocity_x_initial = velocity_x
         self._radius = radius_initial
@@ -80,15 +78,15 @@ class Explosion(GameObject):
         self.radius_final = radius_final
         self.lifetime = lifetime  # Explosion lifetime in seconds.  Used to scale it from radius_initial to radius_final.
         self.force = force
+        # It's not where it was any more - so it goes back into the collision checks as if it was new
+        self.world.spatial_index.remove(self)
         self.scene.add_sprite(name="Explosions", sprite=self)
         self.timer = 0
-        self.rotation_rate = random.randint(1, 180)  # degrees per second
-        self.root_2 = math.sqrt(2)
+        self.rotation_rate = self.world.random.randint(1, 180)  # degrees per second
 
         # Sound related
-        self.sound: arcade.Sound = random.choice(EXPLOSION_SOUNDS)
+        self.sound: arcade.Sound = sounds.SOUNDS[random.choice(EXPLOSION_SOUNDS)]
         self.sound_player = None
-        self.media_player_references = ['sound_player']
         # Make the sound last as long as the explosion
         self.sound_speed = self.sound.get_length() / self.lifetime
 
@@ -113,28 +111,16 @@ class Explosion(GameObject):
         volume = sounds.get_volume_multiplier((self.center_x, self.center_y)) * self.max_volume
         if not (self.sound_player
                 or self.sound_player and not self.sound.is_playing(self.sound_player)):
-            self.sound_player = arcade.play_sound(sound=self.sound, volume=volume)
+            self.sound_player = sounds.play_sound(sound=self.sound, volume=volume)
         else:
             self.sound.set_volume(volume, player=self.sound_player)
 
         # We start off spinning but, as friction reduces the horizontal speed of the explosion to zero, we stop rotating
         self.angle += 0 if not self.velocity_x_initial else delta_time * self.rotation_rate * abs(self.velocity_x/self.velocity_x_initial)
+        # As the explosion grows, its collisions grow with it - it collides as a circle of its radius
+        # (see colliders.py), so there's no hit box to keep up to date
         self.radius = self.radius_initial + (self.timer / self.lifetime) * (self.radius_final - self.radius_initial)
-
-        # https://api.arcade.academy/en/stable/api/sprites.html#arcade.Sprite.set_hit_box
-        # As the explosion grows, I need to adjust its hit box so collisions remain accurate
-        # We imagine the explosion is at (0, 0).  So basically, I'm specifying points on a circle here
-
-        points = [[self.radius, 0],
-                  [self.radius / self.root_2, -self.radius / self.root_2],
-                  [0, -self.radius],
-                  [-self.radius / self.root_2, -self.radius / self.root_2],
-                  [-self.radius, 0],
-                  [-self.radius / self.root_2, self.radius / self.root_2],
-                  [0, self.radius],
-                  [self.radius / self.root_2, self.radius / self.root_2]]
-        # Hit box ASSUMES THE SCALE IS 1.0!!
-        scaled_points = [[int(a / self.scale), int(b / self.scale)] for a, b in points]
-        self.hit_box = scaled_points
         if self.timer > self.lifetime:
             self.remove_from_sprite_lists()
+            if self.pool is not None:
+                self.pool.release(self)
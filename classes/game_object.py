@@ -1,18 +1,43 @@
 from __future__ import annotations
 import arcade
-import math
 
 import constants
-from constants import SCALING, SPACE_START, SPACE_END
-import collisions
+import physics
+import sounds
+from textures import TEXTURES
+from constants import SCALING, PHYSICS_TIMESTEP
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from classes.world import World
-    from classes.explosion import Explosion
     import pyglet.media as media
+    from pools import ObjectPool
+    from physics import PhysicsStore
 
 
 class GameObject(arcade.Sprite):
+    # Collision category - set by GameScene when we're added to the scene
+    category_id: int = 0
+    category: int = 0
+    collides_with: int = 0
+    # Whether we're pushed back down if we try to fly off into deep space
+    pushed_back_from_deep_space: bool = False
+    # Whether anything still needs our explosion once it's finished (so it can't be reused - see pools.py)
+    keeps_explosion: bool = False
+    # The pool we go back to when we're finished with, if we came from one
+    pool: ObjectPool | None = None
+    # Our row in the world's physics store, while we're in it (see physics.py)
+    physics_store: PhysicsStore | None = None
+    physics_row: int | None = None
+    # These live in that row, while we have one
+    change_x = physics.Stored()
+    change_y = physics.Stored()
+    velocity_x = physics.Stored()
+    velocity_y = physics.Stored()
+    mass = physics.Stored()
+    on_ground = physics.Stored()
+    in_space = physics.Stored()
+    above_space = physics.Stored()
+
     def __init__(self,
                  scene: arcade.Scene,
                  world: World,
@@ -40,7 +65,7 @@ class GameObject(arcade.Sprite):
                  explosion_lifetime: float = 2,  # seconds
                  explosion_force: int = 4000,  # was 20
                  ):
-        super().__init__(filename=filename, scale=scale * SCALING, angle=angle)
+        super().__init__(texture=TEXTURES[filename], scale=scale * SCALING, angle=angle)
         self.scene = scene
         self.camera = camera
         self.shield = None
@@ -49,126 +74,134 @@ class GameObject(arcade.Sprite):
         self.explosion = None
         self.world: World = world
         self.mass = mass
+        self.reset_state(center_x=center_x, center_y=center_y, velocity_x=velocity_x, velocity_y=velocity_y,
+                         on_ground=on_ground, in_space=in_space, above_space=above_space)
+        self.explodes = explodes
+        self.owner = owner
+
+        # Sound related
+        self.max_volume = max_volume
+        self.sound_attributes_update_interval = 0.2
+        # Keep a list of references to the media players so I can ensure that when an object "dies"
+        # I stop all of its sounds
+        self.media_player_references = []
+
+        # Explosion related
+        self.set_explosion(initial_radius_multiplier=explosion_initial_radius_multiplier,
+                           final_radius_multiplier=explosion_final_radius_multiplier,
+                           lifetime=explosion_lifetime,
+                           force=explosion_force)
+
+    def reset_state(self, center_x: float = 0, center_y: float = 0, velocity_x: float = 0, velocity_y: float = 0,
+                    angle: float = None, on_ground: bool = False, in_space: bool = False, above_space: bool = False):
+        # Where we are, how we're moving, and that we're alive - everything about us that changes once we're made.
+        # Objects that get reused (see pools.py) start again from here.
+        if angle is not None:
+            self.angle = angle
         self.center_x = center_x
         self.center_y = center_y
         # Don't like the Sprite.velocity attribute, since it's obvious delta_time can vary,
         # so it's not really a velocity - it's a change in position
         self.velocity_x = velocity_x
         self.velocity_y = velocity_y
-        self.change_x = int(self.velocity_x * (1/60))  # pixels per second!
-        self.change_y = int(self.velocity_y * (1/60))  #
+        self.change_x = int(self.velocity_x * PHYSICS_TIMESTEP)  # pixels per second!
+        self.change_y = int(self.velocity_y * PHYSICS_TIMESTEP)  #
         # Gravity only applies when we're not "in space"!
         self.in_space = in_space
         self.above_space = above_space
         self.on_ground = on_ground
         self.dead = False
         self.collided = False
-        self.explodes = explodes
-        self.owner = owner
-
-        # Sound related
+        self.explosion = None
         self.sound_timer = 0
-        self.max_volume = max_volume
-        self.sound_attributes_update_interval = 0.2
-        # Keep a list of references to the media players so I can ensure that when an object "dies"
-        # I stop all of its sounds
-        self.media_player_references = []
+        # arcade works out our collision radius from our size the first time it's needed, and then hangs on to it
+        self.collision_radius = None
 
-        # Explosion related
-        self.explosion_radius_initial = int(self.height * explosion_initial_radius_multiplier)
-        self.explosion_radius_final = int(self.height * explosion_final_radius_multiplier)
-        self.explosion_lifetime = explosion_lifetime  # seconds
-        self.explosion_force = explosion_force
+    def set_explosion(self, initial_radius_multiplier: float, final_radius_multiplier: float, lifetime: float,
+                      force: int):
+        # How big an explosion we make - which depends on how big we are
+        self.explosion_radius_initial = int(self.height * initial_radius_multiplier)
+        self.explosion_radius_final = int(self.height * final_radius_multiplier)
+        self.explosion_lifetime = lifetime  # seconds
+        self.explosion_force = force
 
     def on_update(self, delta_time: float = 1 / 60):
-        # Are we in space or not?
-        self.in_space = True if self.center_y >= SPACE_START else False
-        self.above_space = True if self.center_y >= SPACE_END else False
-        # Calculate current velocity from auto-maintained self.change_XXX variables and delta time
-        self.velocity_x = self.change_x / delta_time  # pixels per second!
-        self.velocity_y = self.change_y / delta_time
-        # Calculate the force being applied
-        force_x, force_y = self.apply_explosion_force()
-        force_y += self.determine_force_y(force_y)
-        force_x += self.determine_force_x(force_x)
-        # Force due to explosions
-
-        # Calculate changes in coordinates due to force
-        # s = ut + (0.5)at^2
-        self.change_x += 0.5 * (force_x / self.mass) * (delta_time ** 2)
-        self.change_y += 0.5 * (force_y / self.mass) * (delta_time ** 2)
-
-        self.center_x += self.change_x
-        self.center_y += self.change_y
-
-    def apply_explosion_force(self):
-        # Force due to explosions - not applied to ground objects or explosions themselves
-        if self.on_ground or not collisions.is_sprite_in_camera_view(sprite=self, camera=self.camera) or self.__class__.__name__ == "Explosion":
-            # Don't go to the trouble of applying explosion forces to sprites that are off screen
-            return 0, 0
-
-        force_x, force_y = 0, 0
-        # Explosions change size, meaning their hit box becomes inaccurate, and I'm not
-        # immediately sure how to fix that.  So will treat them as circles and use the radius and make my own check
-        for explosion in self.scene["Explosions"]:
-            explosion: Explosion
-            if collisions.modulus((self.center_x - explosion.center_x, self.center_y - explosion.center_y)) < explosion.radius:
-                # Direction of force is along the vector from the explosion to the game object.
-                if (explosion.center_x - self.center_x) == 0 and (explosion.center_y - self.center_y == 0):
-                    continue
-                unit_vector = collisions.unit_vector_from_pos1_to_pos2((explosion.center_x, explosion.center_y), (self.center_x, self.center_y))
-                angle = math.atan2(unit_vector[1], unit_vector[0])
-                force_x += explosion.force * math.cos(angle)
-                force_y += explosion.force * math.sin(angle)
-        return force_x, force_y
+        # Forces and movement (including whether we're in space, and our velocity) are worked out for everything
+        # that moves at once, by the world's physics store, before the sprites are updated.  See physics.py.
+        pass
+
+    # Where we are and which way we're facing are kept in our row of the physics store too (if we have one)
+    @property
+    def center_x(self) -> float:
+        return self._position[0]
+
+    @center_x.setter
+    def center_x(self, value: float):
+        arcade.Sprite.center_x.fset(self, value)
+        physics.store(self, 'x', value)
+
+    @property
+    def center_y(self) -> float:
+        return self._position[1]
+
+    @center_y.setter
+    def center_y(self, value: float):
+        arcade.Sprite.center_y.fset(self, value)
+        physics.store(self, 'y', value)
+
+    @property
+    def position(self) -> arcade.Point:
+        return self._position
+
+    @position.setter
+    def position(self, value: arcade.Point):
+        arcade.Sprite.position.fset(self, value)
+        physics.store(self, 'x', value[0])
+        physics.store(self, 'y', value[1])
+
+    @property
+    def angle(self) -> float:
+        return self._angle
+
+    @angle.setter
+    def angle(self, value: float):
+        arcade.Sprite.angle.fset(self, value)
+        physics.store(self, 'angle', value)
+
+    def remove_from_sprite_lists(self):
+        super().remove_from_sprite_lists()
+        # Out of the scene means out of the physics store
+        if self.physics_store is not None:
+            self.physics_store.remove(self)
+
+    def time_to_next_event(self) -> float:
+        # How long we could be left without an update before we'd do anything other than count down a timer
+        # (see ActivityManager).  Most things are doing something all the time.
+        return 0
 
     def explode(self):
-        # Explosions are automatically added to the scene
-        from classes.explosion import Explosion
-        self.explosion = Explosion(scene=self.scene,
-                                   world=self.world,
-                                   camera=self.camera,
-                                   mass=self.mass,
-                                   scale=self.scale,
-                                   radius_initial=self.explosion_radius_initial,
-                                   radius_final=self.explosion_radius_final,
-                                   lifetime=self.explosion_lifetime,  # seconds
-                                   # Force here is what's applied to airborne objects that are
-                                   # within the explosion (and presumably shielded!).
-                                   # Say gravity is 100, lander mass is 20, so gravitational force
-                                   # is f = ma -> 2000.
-                                   # So trying to get a feel for what the right value should be,
-                                   # but 4000 is double the kind of average gravitational pull
-                                   force=self.explosion_force,  # was 20
-                                   velocity_x=self.velocity_x,
-                                   velocity_y=self.velocity_y,
-                                   center_x=int(self.center_x),
-                                   center_y=int(self.center_y),
-                                   owner=self)
-
-    def determine_force_x(self, force_x):
-        # Force due to engine
-        if self.engine is not None and self.engine.activated:
-            force_x -= self.engine.force * math.sin(self.radians)
-        # Force due to friction with the ground
-        # Only really applies to explosions, since everything explodes on contact with the ground
-        if self.on_ground and abs(self.velocity_x) > 0:
-            friction = self.mass * self.world.gravity * self.world.friction_coefficient
-            if self.velocity_x > 0:
-                force_x -= friction
-            else:
-                force_x += friction
-        return force_x
-
-    def determine_force_y(self, force_y):
-        if not self.in_space and not getattr(self, "landed", None):
-            # When not in the allowed(!) region of space, there's the world's gravity ...
-            # (Unless we're the lander and we've actually landed)
-            force_y -= self.mass * self.world.gravity
-        # Force due to engine
-        if self.engine is not None and self.engine.activated:
-            force_y += self.engine.force * math.cos(self.radians)
-        return force_y
+        # Explosions are automatically added to the scene.  They're recycled once they've finished (see pools.py)
+        self.explosion = self.world.pools.explosions.acquire(
+            mass=self.mass,
+            scale=self.scale,
+            radius_initial=self.explosion_radius_initial,
+            radius_final=self.explosion_radius_final,
+            lifetime=self.explosion_lifetime,  # seconds
+            # Force here is what's applied to airborne objects that are
+            # within the explosion (and presumably shielded!).
+            # Say gravity is 100, lander mass is 20, so gravitational force
+            # is f = ma -> 2000.
+            # So trying to get a feel for what the right value should be,
+            # but 4000 is double the kind of average gravitational pull
+            force=self.explosion_force,  # was 20
+            velocity_x=self.velocity_x,
+            velocity_y=self.velocity_y,
+            center_x=int(self.center_x),
+            center_y=int(self.center_y),
+            owner=self)
+        if self.keeps_explosion:
+            # eg. the camera carries on looking at where the lander's explosion ended up - so it's never reused
+            self.explosion.pool = None
 
     def die(self):
         self.dead = True
@@ -183,12 +216,17 @@ class GameObject(arcade.Sprite):
         for ref in self.media_player_references:
             player:  media.Player | None = getattr(self, ref, None)
             if player:
-                arcade.stop_sound(player)
+                sounds.stop_sound(player)
         if self.explodes:
             self.explode()
         self.remove_from_sprite_lists()
+        if self.on_ground and self.world is not None:
+            # Whatever we were sitting on is free again
+            self.world.free_surfaces.release(self)
         if getattr(self, "score_points", None):
             constants.GAME_OBJECTS["score"] += self.score_points
+        if self.pool is not None:
+            self.pool.release(self)
 
 
 
@@ -0,0 +1,50 @@
+from __future__ import annotations
+import arcade
+import constants
+from typing import Callable, List, Optional
+
+
+def set_category(sprite: arcade.Sprite, sprite_list_name: str):
+    # Tag the sprite with the collision category of the list it's going into
+    category_id = constants.CATEGORY_IDS.get(sprite_list_name, 0)
+    sprite.category_id = category_id
+    sprite.category = 1 << category_id if category_id else 0
+    sprite.collides_with = constants.COLLIDES_WITH.get(category_id, 0)
+
+
+class GameScene(arcade.Scene):
+    """A Scene that gives every sprite its collision category as it's added"""
+    def __init__(self):
+        super().__init__()
+        # Things that aren't sprites but are drawn in amongst them (eg. the terrain), by the name of the sprite list
+        # they're drawn just before
+        self.drawn_before: dict[str, Callable[[], None]] = {}
+        # Things that want to know whenever a sprite's added to a sprite list (eg. the physics store), by its name
+        self.watchers: dict[str, list[Callable[[arcade.Sprite], None]]] = {}
+
+    def draw_before(self, name: str, draw: Callable[[], None]):
+        self.drawn_before[name] = draw
+
+    def watch(self, name: str, on_add: Callable[[arcade.Sprite], None]):
+        self.watchers.setdefault(name, []).append(on_add)
+
+    def add_sprite(self, name: str, sprite: arcade.Sprite) -> None:
+        set_category(sprite, name)
+        super().add_sprite(name, sprite)
+        for on_add in self.watchers.get(name, ()):
+            on_add(sprite)
+
+    def add_sprite_list(self,
+                        name: str,
+                        use_spatial_hash: bool = False,
+                        sprite_list: Optional[arcade.SpriteList] = None) -> None:
+        if sprite_list:
+            for sprite in sprite_list:
+                set_category(sprite, name)
+        super().add_sprite_list(name=name, use_spatial_hash=use_spatial_hash, sprite_list=sprite_list)
+
+    def draw(self, names: Optional[List[str]] = None, **kwargs) -> None:
+        for name in names or list(self.name_mapping):
+            if name in self.drawn_before:
+                self.drawn_before[name]()
+            self.name_mapping[name].draw(**kwargs)
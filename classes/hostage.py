@@ -1,7 +1,7 @@
 from __future__ import annotations
 import arcade
 import itertools
-from constants import SCALING
+from constants import SCALING, LANDER
 import random
 from classes.game_object import GameObject
 from classes.shield import Shield
@@ -40,6 +40,20 @@ class Hostage(GameObject):
             self.shield.position = self.position
             self.scene.add_sprite("Hostages", self)
             self.shield.activate()  # Hostage shield is permanently activated
+            self.world.activity.add(self)
+            # We're rescued by the lander staying close enough for long enough
+            self.world.sensors.add(self, radius=self.rescue_distance, detects=LANDER,
+                                   on_enter=self.lander_arrived, on_exit=self.lander_left)
+
+    def lander_arrived(self, lander: Lander):
+        self.being_rescued = True
+        # We might have been put to sleep
+        self.world.activity.wake(self)
+        lander.start_rescuing(self)
+
+    def lander_left(self, lander: Lander):
+        self.being_rescued = False
+        lander.stop_rescuing(self)
 
     def on_update(self, delta_time: float = 1 / 60):
         if self.being_rescued:
@@ -48,6 +62,11 @@ class Hostage(GameObject):
                 # Hostage has been rescued!
                 self.remove_from_sprite_lists()
                 self.shield.remove_from_sprite_lists()
+                self.world.free_surfaces.release(self)
                 self.lander.hostage_rescued(self)
         else:
             self._current_timer = self.rescue_timer
+
+    def time_to_next_event(self) -> float:
+        # Nothing happens unless we're being rescued
+        return 0 if self.being_rescued else self.shield.time_to_next_event()
@@ -3,7 +3,7 @@ import arcade
 import math
 import sounds
 import constants
-import collisions
+import physics
 from pathlib import Path
 from classes.game_object import GameObject
 from classes.engine import Engine
@@ -15,6 +15,10 @@ if TYPE_CHECKING:
 
 
 class Lander(GameObject):
+    pushed_back_from_deep_space = True
+    # The camera follows our explosion when we die
+    keeps_explosion = True
+
     def __init__(self, scene: arcade.Scene, camera: arcade.Camera, world: World, fuel=100, shield_charge=100, EMP_count=1):
         super().__init__(scene=scene,
                          world=world,
@@ -40,11 +44,11 @@ class Lander(GameObject):
 
         # Sound related
         self.sound_enabled = True
-        self.teleport_complete_sound = constants.SOUNDS['sounds/teleport_complete.mp3']
+        self.teleport_complete_sound = sounds.SOUNDS['sounds/teleport_complete.mp3']
         self.teleport_complete_sound_player = None
-        self.teleport_ongoing_sound = constants.SOUNDS['sounds/teleport_ongoing.wav']
+        self.teleport_ongoing_sound = sounds.SOUNDS['sounds/teleport_ongoing.wav']
         self.teleport_ongoing_sound_player = None
-        self.recharged_sound = constants.SOUNDS['sounds/recharged.mp3']
+        self.recharged_sound = sounds.SOUNDS['sounds/recharged.mp3']
         self.recharged_sound_player = None
         self.media_player_references = [
             'teleport_complete_sound_player',
@@ -66,10 +70,11 @@ class Lander(GameObject):
     def landed(self, value: bool):
         if self._landed is not value:
             self._landed = value
+            physics.store(self, 'landed', value)
             if value:
                 # Don't play recharged sound when the level is completed
                 if self.scene["Hostages"]:
-                    self.recharged_sound_player = arcade.play_sound(sound=self.recharged_sound, volume=self.max_volume)
+                    self.recharged_sound_player = sounds.play_sound(sound=self.recharged_sound, volume=self.max_volume)
                 # Refill fuel and recharge shield
                 self.engine.deactivate()
                 self.engine.refuel()
@@ -86,44 +91,34 @@ class Lander(GameObject):
 
     def on_update(self, delta_time: float = 1 / 60):
         super().on_update(delta_time=delta_time)
-        # Create list of the rescuers we are currently rescuing
-        if not self.dead:
-            for hostage in self.scene["Hostages"]:
-                distance_to_hostage = collisions.modulus((hostage.center_x - self.center_x, hostage.center_y - self.center_y))
-                if distance_to_hostage <= hostage.rescue_distance:
-                    hostage.being_rescued = True
-                    self._hostages_being_rescued.add(hostage)
-                elif hostage.being_rescued:
-                    hostage.being_rescued = False
-                    self._hostages_being_rescued.remove(hostage)
+        # The hostages we're rescuing keep us up to date with who they are (see Hostage.lander_arrived())
 
         # If we're still rescuing anyone - animate the tractor beam!
         if self._hostages_being_rescued:
             self._tractor_beam_timer += delta_time
             if not (self.teleport_ongoing_sound_player
                     or self.teleport_ongoing_sound_player and not self.teleport_ongoing_sound.is_playing(self.teleport_ongoing_sound_player)):
-                self.teleport_ongoing_sound_player = arcade.play_sound(sound=self.teleport_ongoing_sound, looping=True, volume=self.max_volume)
+                self.teleport_ongoing_sound_player = sounds.play_sound(sound=self.teleport_ongoing_sound, looping=True, volume=self.max_volume)
 
         else:
             self._tractor_beam_timer = 0
             self.teleport_ongoing_sound_player and self.teleport_ongoing_sound.stop(self.teleport_ongoing_sound_player)
             self.teleport_ongoing_sound_player = None
 
+    def start_rescuing(self, hostage):
+        self._hostages_being_rescued.add(hostage)
+
+    def stop_rescuing(self, hostage):
+        # (A hostage that's just been rescued leaves its sensor, and so stops being rescued, a frame later)
+        self._hostages_being_rescued.discard(hostage)
+
     def hostage_rescued(self, hostage):
         self._hostages_being_rescued.remove(hostage)
         if self.teleport_ongoing_sound_player and not self._hostages_being_rescued:
             self.teleport_ongoing_sound.stop(self.teleport_ongoing_sound_player)
-        self.teleport_complete_sound_player = arcade.play_sound(sound=self.teleport_complete_sound, volume=self.max_volume)
+        self.teleport_complete_sound_player = sounds.play_sound(sound=self.teleport_complete_sound, volume=self.max_volume)
         constants.GAME_OBJECTS["score"] += hostage.score_points
 
-    def determine_force_y(self, force_y):
-        force_y = super().determine_force_y(force_y)
-        if self.above_space and self.change_y > 0:
-            # We want to stop people flying off into deep space, but I don't want to fling them wildly
-            # back at the ground.  So we only apply the force while we're gaining altitude
-            force_y -= self.mass * 5 * (self.center_y - constants.SPACE_END)
-        return force_y
-
     def draw_landing_angle_guide(self):
         length = (6 * self.height)
         y = self.center_y + length * math.cos(self.max_landing_angle * math.pi / 180)
@@ -143,9 +138,8 @@ class Lander(GameObject):
 
     def die(self):
         super().die()
-        for hostage in self._hostages_being_rescued:
-            hostage.being_rescued = False
-        self._hostages_being_rescued = set()
+        # Any hostages we were rescuing stop being rescued straight away
+        self.world.sensors.discard(self)
 
     # noinspection PyPep8Naming
     def activate_EMP(self):
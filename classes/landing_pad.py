@@ -1,6 +1,8 @@
 from __future__ import annotations
 import arcade
 import collisions
+import constants
+from classes.shapes import SolidColorSprite
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from classes.lander import Lander
@@ -18,7 +20,7 @@ if TYPE_CHECKING:
 # Not figured out how to do all that yet, so for now, lets just do a landing pad
 
 
-class LandingPad(arcade.SpriteSolidColor):
+class LandingPad(SolidColorSprite):
     def __init__(self, scene: arcade.Scene, lander: Lander, world: World, width: int, height: int):
         super().__init__(width=width, height=height, color=arcade.color.WHITE_SMOKE)
         self.disabled_color = arcade.color.WHITE_SMOKE
@@ -42,6 +44,9 @@ class LandingPad(arcade.SpriteSolidColor):
 
         self.velocity_x, self.velocity_y = 0, 0
         self.on_ground = True
+        # Landing pad is automatically activated when the lander is close enough
+        world.sensors.add(self, radius=self.width, detects=constants.LANDER,
+                          on_enter=self.lander_arrived, on_exit=self.lander_left)
 
     @property
     def safe_to_land(self):
@@ -52,16 +57,17 @@ class LandingPad(arcade.SpriteSolidColor):
         self._safe_to_land = value
         self.color = self.safe_to_land_color if value else self.unsafe_to_land_color
 
+    def lander_arrived(self, lander: Lander):
+        self.activated = True
+
+    def lander_left(self, lander: Lander):
+        self.activated = False
+        self.activated_timer = 0
+        self.color = self.disabled_color
+
     def on_update(self, delta_time: float = 1 / 60):
-        # Landing pad is automatically activated when the lander is close enough
-        if arcade.sprite.get_distance_between_sprites(self, self.lander) < self.width:
-            if not self.activated:
-                self.activated = True
+        if self.activated:
             self.activated_timer += delta_time
-        elif self.activated is True:
-            self.activated = False
-            self.activated_timer = 0
-            self.color = self.disabled_color
 
         # When activated, the landing pad's colour is determined by whether it's safe to land
         # ie. is the lander fully over the pad, is it going slowly enough, and is it not too tilted
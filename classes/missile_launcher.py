@@ -1,11 +1,11 @@
 from __future__ import annotations
 import arcade
 import constants
-import random
 import itertools
 from classes.game_object import GameObject
 from classes.missile import Missile
 from classes.shield import Shield
+from guidance import LEAD_PURSUIT
 
 import collisions
 from typing import TYPE_CHECKING
@@ -14,6 +14,13 @@ if TYPE_CHECKING:
 
 
 class MissileLauncher(GameObject):
+    # The missiles we fire - what they look like, and their settings (see Missile.reset())
+    missile_filename = "images/missile.png"
+    missile_settings = {}
+    # About how many of our missiles can be around at once (their fuel lasts a bit longer than the missile interval,
+    # and then they take a while to fall)
+    missiles_in_flight = 2
+
     def __init__(self, scene: arcade.Scene, camera: arcade.Camera, world: World, missile_interval: int = 15,
                  scale: float = 0.3 * constants.SCALING, mass: int = 300, shield: bool = False):
         super().__init__(scene=scene,
@@ -27,7 +34,7 @@ class MissileLauncher(GameObject):
                          )
 
         self.missile_interval = missile_interval
-        self.current_interval = random.randint(0, missile_interval)
+        self.current_interval = world.random.randint(0, missile_interval)
         if shield:
             # Effectively infinite shield
             self.shield = Shield(scene=scene, owner=self, charge=999999, sound_enabled=True, max_volume=0.1)
@@ -39,6 +46,9 @@ class MissileLauncher(GameObject):
             # If we can't place the object on the world, we never add it to a sprite list.
             # It's just forgotten about
             self.scene.add_sprite("Ground Enemies", self)
+            self.world.activity.add(self)
+            # Make our missiles now, rather than when we fire them (see pools.py)
+            self.world.pools.prewarm_missiles(self.missile_filename, self.missiles_in_flight)
 
         self.score_points = 20 if self.shield else 10
 
@@ -46,29 +56,56 @@ class MissileLauncher(GameObject):
         self.current_interval -= delta_time
         # If there's a shield, we switch it off before firing and back on again afterwards
         if (self.shield is not None
-                and self.current_interval <= self.shield_disabled_for_missile_fire_interval / 2
+                and self.current_interval <= self.shield_disabled_for_missile_fire_interval / 2 + constants.TIMER_TOLERANCE
                 and self.shield.activated):
             self.shield.deactivate()
-        if self.current_interval <= 0:
+        if self.current_interval <= constants.TIMER_TOLERANCE:
             self.fire_missile()
             self.current_interval = self.missile_interval
         if (self.shield is not None
                 and not self.shield.disabled
-                and self.shield_disabled_for_missile_fire_interval / 2 < self.current_interval <= self.missile_interval - (self.shield_disabled_for_missile_fire_interval / 2)
+                and self.shield_disabled_for_missile_fire_interval / 2 + constants.TIMER_TOLERANCE < self.current_interval <= self.missile_interval - (self.shield_disabled_for_missile_fire_interval / 2) + constants.TIMER_TOLERANCE
                 and not self.shield.activated):
             self.shield.activate()
 
+    def time_to_next_event(self) -> float:
+        # Firing, or switching the shield off beforehand / back on afterwards (see on_update())
+        time_to_next_event = self.current_interval
+        if self.shield is not None:
+            half_interval = self.shield_disabled_for_missile_fire_interval / 2
+            if self.shield.activated:
+                time_to_next_event = min(time_to_next_event, self.current_interval - half_interval)
+            elif self.current_interval > self.missile_interval - half_interval:
+                time_to_next_event = min(time_to_next_event,
+                                         self.current_interval - (self.missile_interval - half_interval))
+            elif self.current_interval > half_interval + constants.TIMER_TOLERANCE and not self.shield.disabled:
+                return 0
+            time_to_next_event = min(time_to_next_event, self.shield.time_to_next_event())
+        return max(time_to_next_event, 0)
+
     def fire_missile(self):
-        missile = Missile(scene=self.scene, world=self.world, camera=self.camera,
-                          )
+        missile: Missile = self.world.pools.missiles(self.missile_filename).acquire(**self.missile_settings)
         missile.center_x = self.center_x
         missile.center_y = self.top + missile.height
-        missile.change_y = 160 * (1/60)
+        missile.change_y = 160 * constants.PHYSICS_TIMESTEP
 
 
 class SuperMissileLauncher(MissileLauncher):
     # Would like a different picture for the super missile launcher, and for it's missiles
     # I'd quite like it to activate shields in between firing missiles ...
+    missile_filename = "images/super_missile.png"
+    missile_settings = dict(mass=100,
+                            scale=0.4 * constants.SCALING,
+                            # Engine related
+                            engine_fuel=60,
+                            engine_force=12000,
+                            engine_scale=0.5 * constants.SCALING,
+                            engine_max_volume=0.4,
+                            # Explosion related
+                            explosion_final_radius_multiplier=8,
+                            explosion_force=6000,
+                            explosion_lifetime=4)
+    missiles_in_flight = 5
 
     def __init__(self, scene: arcade.Scene, camera: arcade.Camera, world: World, missile_interval: int = 15,
                  scale: float = 0.5 * constants.SCALING, mass: int = 600):
@@ -82,21 +119,18 @@ class SuperMissileLauncher(MissileLauncher):
                          )
         self.score_points = 30
 
-    def fire_missile(self):
-        missile = Missile(scene=self.scene, world=self.world, camera=self.camera,
-                          mass=100,
-                          scale=0.4 * constants.SCALING,
-                          # Engine related
-                          engine_fuel=60,
-                          engine_force=12000,
-                          engine_scale=0.5 * constants.SCALING,
-                          engine_max_volume=0.4,
-                          filename="images/super_missile.png",
-                          # Explosion related
-                          explosion_final_radius_multiplier=8,
-                          explosion_force=6000,
-                          explosion_lifetime=4
-                          )
-        missile.center_x = self.center_x
-        missile.center_y = self.top + missile.height
-        missile.change_y = 160 * (1/60)
+
+class SmartMissileLauncher(MissileLauncher):
+    # Missiles that try to cut the lander off, rather than just chasing it (see guidance.py)
+    missile_settings = dict(guidance=LEAD_PURSUIT)
+
+    def __init__(self, scene: arcade.Scene, camera: arcade.Camera, world: World, missile_interval: int = 15,
+                 scale: float = 0.3 * constants.SCALING, mass: int = 300):
+        super().__init__(scene=scene,
+                         camera=camera,
+                         world=world,
+                         mass=mass,
+                         scale=scale,
+                         missile_interval=missile_interval,
+                         )
+        self.score_points = 15
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import arcade
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# The layers used to be drawn whole, every frame - every star in the sky (and their wrap-around copies), even though
+# only a screen's worth of them can ever be seen at once.  So shapes that say how far across they go are put into
+# tiles (each one a strip of the layer TILE_WIDTH wide), and only the tiles that overlap the camera get drawn.
+# A dense starfield then costs about the same to draw as a sparse one.
+
+TILE_WIDTH = 1024
+
+
+class Tile:
+    """The shapes whose left hand sides are in one strip of a layer"""
+    def __init__(self):
+        self.shape_element_list = arcade.ShapeElementList()
+        # How far across the shapes actually go (they can overhang the strip)
+        self.left = float('inf')
+        self.right = float('-inf')
+
+    def append(self, shape: arcade.Shape, x_range: Tuple[float, float]):
+        self.shape_element_list.append(shape)
+        self.left = min(self.left, x_range[0])
+        self.right = max(self.right, x_range[1])
+
+
+class ParallaxLayer:
+    """One of the background layers - a bunch of shapes that all scroll together.
+    Making an arcade shape needs a window (it goes straight into a GPU buffer), so the layer just keeps hold of how to
+    make each of its shapes, and only actually makes them the first time it's drawn.  That way a World can be built
+    without a window - eg. when running the game headless (see sim.py)."""
+    def __init__(self):
+        # How to make each shape, and how far across the layer it goes (None if it goes all the way across)
+        self.shape_makers: List[Tuple[Callable[[], arcade.Shape], Optional[Tuple[float, float]]]] = []
+        self.tiles: List[Tile] | None = None
+        # Shapes that go all the way across (eg. the clouds) are drawn whatever, after the tiles
+        self.untiled: arcade.ShapeElementList | None = None
+        # As with ShapeElementList, this is actually the left hand side of the layer, not the centre!
+        self.center_x = 0
+        self.center_y = 0
+
+    def append(self, shape_maker: Callable[[], arcade.Shape], x_range: Tuple[float, float] | None = None):
+        self.shape_makers.append((shape_maker, x_range))
+        self.tiles = None
+
+    def __len__(self):
+        return len(self.shape_makers)
+
+    def make_shapes(self):
+        tiles: Dict[int, Tile] = {}
+        self.untiled = arcade.ShapeElementList()
+        for shape_maker, x_range in self.shape_makers:
+            if x_range is None:
+                self.untiled.append(shape_maker())
+                continue
+            index = int(x_range[0] // TILE_WIDTH)
+            if index not in tiles:
+                tiles[index] = Tile()
+            tiles[index].append(shape_maker(), x_range)
+        self.tiles = [tiles[index] for index in sorted(tiles)]
+
+    def draw(self, left: float | None = None, right: float | None = None):
+        """Draw the layer - or, given the left and right hand sides of what the camera can see, just what's on screen"""
+        if self.tiles is None:
+            self.make_shapes()
+        # What the camera can see, in terms of how far across the layer
+        if left is not None:
+            left -= self.center_x
+        if right is not None:
+            right -= self.center_x
+        for shape_element_list in [*(tile.shape_element_list for tile in self.tiles
+                                     if (left is None or tile.right >= left) and (right is None or tile.left <= right)),
+                                   self.untiled]:
+            if len(shape_element_list) == 0:
+                continue
+            shape_element_list.center_x = self.center_x
+            shape_element_list.center_y = self.center_y
+            shape_element_list.draw()
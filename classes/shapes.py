@@ -0,0 +1,28 @@
+from __future__ import annotations
+import arcade
+from textures import GENERATED_TEXTURES
+
+
+# Stand-ins for arcade's SpriteCircle and SpriteSolidColor, that share their textures (see textures.py) rather than
+# each size and colour getting one of its own.
+
+
+class CircleSprite(arcade.Sprite):
+    """A circle of the given radius and colour"""
+    def __init__(self, radius: float, color: arcade.Color):
+        texture = GENERATED_TEXTURES.circle(radius, color)
+        super().__init__(texture=texture, scale=2 * radius / texture.width)
+
+
+class SolidColorSprite(arcade.Sprite):
+    """A rectangle of the given size and colour"""
+    def __init__(self, width: float, height: float, color: arcade.Color):
+        super().__init__(texture=GENERATED_TEXTURES.white())
+        self.width = width
+        self.height = height
+        # The hit box would otherwise be the size of the (small) texture
+        self.hit_box = ((-width / 2, -height / 2), (width / 2, -height / 2),
+                        (width / 2, height / 2), (-width / 2, height / 2))
+        self.color = color[:3]
+        if len(color) == 4:
+            self.alpha = color[3]
@@ -1,8 +1,11 @@
 from __future__ import annotations
 import arcade
 from classes.game_object import GameObject
+from classes.shapes import CircleSprite
+from colliders import CircleCollider, check_for_collision
 from pathlib import Path
 import constants
+import sounds
 
 
 shield_disabled_when_collisions_exist_with = [
@@ -12,14 +15,10 @@ shield_disabled_when_collisions_exist_with = [
     "Ground Enemies",
     "Air Enemies",
     "Explosions"]
+SHIELD_BLOCKERS = constants.category_bits(*shield_disabled_when_collisions_exist_with)
 
-terrain = [
-    "Terrain Left Edge",
-    "Terrain Centre",
-    "Terrain Right Edge", ]
 
-
-class Shield(arcade.SpriteCircle):
+class Shield(CircleCollider, CircleSprite):
     """The shield - a sprite that stays centred on the owner and can be activated / deactivated"""
     def __init__(self, scene: arcade.Scene,
                  owner: arcade.Sprite,
@@ -49,10 +48,10 @@ class Shield(arcade.SpriteCircle):
 
         # Shield sounds
         self.sound_enabled = sound_enabled
-        self.shield_activate_sound = constants.SOUNDS['sounds/shield_activated.mp3']
-        self.shield_disabled_sound = constants.SOUNDS['sounds/shield_disabled.mp3']
+        self.shield_activate_sound = sounds.SOUNDS['sounds/shield_activated.mp3']
+        self.shield_disabled_sound = sounds.SOUNDS['sounds/shield_disabled.mp3']
         # Don't currently use the continuous sound
-        #self.shield_continuous = constants.SOUNDS['sounds/shield_continuous.wav']
+        #self.shield_continuous = sounds.SOUNDS['sounds/shield_continuous.wav']
         self.max_volume = max_volume
         # This keeps track of the "media player" that is playing the current sound
         # Each time I play a sound, I think it returns a different player!
@@ -81,28 +80,36 @@ class Shield(arcade.SpriteCircle):
         if not self.owner.dead:
             if self.activated:
                 self.charge = max(self.charge - delta_time, 0)
-                if self.charge == 0:
+                if self.charge <= constants.TIMER_TOLERANCE:
+                    self.charge = 0
                     self.deactivate()
             # If disabled (ie. someone tried to activate it whilst an object was within its perimeter),
             # count down to being un-disabled
             if self.disabled:
                 self._disabled_timer -= delta_time
-                if self._disabled_timer <= 0:
+                if self._disabled_timer <= constants.TIMER_TOLERANCE:
                     self._disabled_timer = 0
                     # If the shield owner happens to be the Lander itself, and the user is still trying to operate
                     # the shield (ie. mouse button / key still pressed), we auto try to re-enable it here
-                    if self.owner in self.scene["Lander"].sprite_list and self.owner.trying_to_activate_shield:
+                    if self.owner.category & constants.LANDER and self.owner.trying_to_activate_shield:
                         self.activate()
 
+    def time_to_next_event(self) -> float:
+        # Running out of charge, or coming to the end of being disabled
+        time_to_next_event = self.charge if self.activated else float('inf')
+        if self.disabled:
+            time_to_next_event = min(time_to_next_event, self._disabled_timer)
+        return time_to_next_event
+
     def activate(self):
         if self.disabled:
             # If the shield is disabled, sound was played when it was disabled
             return
 
-        if not self.charge and self.owner in self.scene["Lander"].sprite_list:
+        if not self.charge and self.owner.category & constants.LANDER:
             # If the user is trying to activate their shield but has no charge, we play the sound every time
             # to help them understand
-            self.media_player = self.sound_enabled and arcade.play_sound(self.shield_disabled_sound, volume=self.max_volume)
+            self.media_player = self.sound_enabled and sounds.play_sound(self.shield_disabled_sound, volume=self.max_volume)
             return
 
         if self.attempted_to_activate_shield_with_collision():
@@ -112,7 +119,7 @@ class Shield(arcade.SpriteCircle):
         # Shield is being activated
         self.visible = True
         self.activated = True
-        self.media_player = self.sound_enabled and arcade.play_sound(self.shield_activate_sound, volume=self.max_volume)
+        self.media_player = self.sound_enabled and sounds.play_sound(self.shield_activate_sound, volume=self.max_volume)
 
     def deactivate(self):
         self.visible = False
@@ -120,7 +127,10 @@ class Shield(arcade.SpriteCircle):
 
     def disable_for(self, seconds: float):
         self._disabled_timer = seconds
-        self.media_player = self.sound_enabled and arcade.play_sound(self.shield_disabled_sound,
+        # If our owner has been put to sleep, it needs to know about this
+        if (world := getattr(self.owner, 'world', None)) is not None:
+            world.activity.wake(self.owner)
+        self.media_player = self.sound_enabled and sounds.play_sound(self.shield_disabled_sound,
                                                                      volume=self.max_volume)
         self.deactivate()
 
@@ -129,23 +139,31 @@ class Shield(arcade.SpriteCircle):
         # If you try to, it is disabled for a small period.
         # Except that ground objects are allowed to have their shields collide with the terrain.
         # And except for Hostages who always have an activated shield, regardless.
-        if self.owner not in self.scene["Hostages"]:
-            collisions = arcade.check_for_collision_with_lists(self, [self.scene[i] for i in shield_disabled_when_collisions_exist_with])
-            if self.owner not in self.scene["Ground Enemies"]:
-                terrain_collisions = arcade.check_for_collision_with_lists(self, [self.scene[i] for i in terrain])
-                collisions += terrain_collisions
-            for obj in collisions:
-                if obj in self.scene["Shields"] and not obj.activated:
+        if not self.owner.category & constants.HOSTAGE:
+            for obj in self.colliding_objects():
+                if obj.category & constants.SHIELD and not obj.activated:
                     # Collisions with de-activated shields don't count
                     continue
                 if self.owner == obj or self is obj:
                     # collisions with your own shield are obviously allowed
                     continue
                 return True
+            if not self.owner.category & constants.GROUND_ENEMY:
+                return bool(self.owner.world.terrain.colliding_rects(self))
             return False
 
+    def colliding_objects(self) -> list[arcade.Sprite]:
+        # Rather than checking against every sprite in every list, only look at what's near us in the world's spatial
+        # index - brought up to date first, as things have moved since the last collision checks.
+        # Explosions aren't in the index, but there's never many of them.
+        world = self.owner.world
+        world.update_spatial_index()
+        candidates = [s for s in world.spatial_index.nearby(self) if s.category & SHIELD_BLOCKERS]
+        candidates += self.scene["Explosions"]
+        return [s for s in candidates if check_for_collision(self, s)]
+
 
-class DisabledShield(arcade.SpriteCircle):
+class DisabledShield(CircleSprite):
     """If someone tries to activate the actual shield with an object within it's perimeter, the shield
     is disabled for a period of time, during which this "disabled shield" is displayed"""
     def __init__(self, scene: arcade.Scene, owner: arcade.Sprite):
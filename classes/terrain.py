@@ -0,0 +1,159 @@
+from __future__ import annotations
+import arcade
+import random
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable, NamedTuple, Optional, Tuple
+from colliders import check_for_collision_with_rect
+from continuous_collisions import Impact, circle_column_impact
+
+
+# The terrain used to be a few hundred rectangle sprites, in three spatially hashed sprite lists (one of them full of
+# copies of another, for the world wrap) - every one of them drawn as a sprite and kept in a spatial hash, even though
+# the terrain never changes during a level.
+# Now it's just the rectangles' edges, in arrays, which is all the collision checks ever needed - and it's drawn as a
+# single shape, made the first time it's drawn (so, as with the ParallaxLayers, the world can be built headless).
+
+
+class Terrain:
+    """The terrain rectangles, indexed so we can find what's underneath a point in O(log n)"""
+    def __init__(self, rects: Iterable[Tuple[float, float, float]], wrap_copies: int, color: arcade.Color):
+        # The rects are (left, right, top) - they all sit on the ground - ordered left to right.
+        # The last 'wrap_copies' of them are just copies of the ones at the left hand edge, for the world wrap.
+        lefts, rights, tops = zip(*rects)
+        self.lefts = array('d', lefts)
+        self.rights = array('d', rights)
+        self.tops = array('d', tops)
+        self.max_height = max(self.tops)
+        # Rects from here onwards are the wrap-around copies of the left edge
+        self.wrap_copies_start = len(self.lefts) - wrap_copies
+        self.color = color
+        self.shape_element_list: arcade.ShapeElementList | None = None
+
+    def __len__(self):
+        return len(self.lefts)
+
+    def index_at(self, x: float) -> int:
+        """Index of the rect underneath x (clamped to the ends of the terrain)"""
+        # If x is exactly on the boundary between two rects, we get the left hand one
+        i = bisect_left(self.lefts, x) - 1
+        return min(max(i, 0), len(self.lefts) - 1)
+
+    def height_at(self, x: float) -> float:
+        return self.tops[self.index_at(x)]
+
+    def neighbours(self, x: float) -> Tuple[int, int, int]:
+        """Indexes of the rect underneath x and the rects either side of it"""
+        i = self.index_at(x)
+        return max(i - 1, 0), i, min(i + 1, len(self.lefts) - 1)
+
+    def indexes_between(self, left: float, right: float) -> range:
+        """Indexes of the rects overlapping the horizontal span left -> right"""
+        return range(self.index_at(left), self.index_at(right) + 1)
+
+    def colliding_rects(self, sprite: arcade.Sprite) -> list[int]:
+        """Indexes of the rects the sprite is touching"""
+        # Only rects we horizontally overlap, and that are tall enough to reach us, can possibly be hit.
+        # The hit box check is then only done on those few.
+        bottom = sprite.bottom
+        if bottom > self.max_height:
+            return []
+        return [i for i in self.indexes_between(sprite.left, sprite.right)
+                if self.tops[i] >= bottom
+                and check_for_collision_with_rect(sprite, self.lefts[i], 0, self.rights[i], self.tops[i])]
+
+    def first_impact(self, start: Tuple[float, float], displacement: Tuple[float, float],
+                     radius: float) -> Optional[Impact]:
+        """Earliest point a circle moving from start hits the terrain this frame (None if it doesn't)"""
+        s_x, s_y = start
+        d_x, d_y = displacement
+        if min(s_y, s_y + d_y) - radius > self.max_height:
+            return None
+        first = None
+        # Only the rects underneath the whole of the swept path need looking at
+        for i in self.indexes_between(min(s_x, s_x + d_x) - radius, max(s_x, s_x + d_x) + radius):
+            impact = circle_column_impact(start, displacement, radius, self.lefts[i], self.rights[i], self.tops[i])
+            # If we're already overlapping more than one rect, deal with the deepest overlap first
+            if impact is not None and (first is None or (impact.time, -impact.depth) < (first.time, -first.depth)):
+                first = impact
+        return first
+
+    def draw(self):
+        if self.shape_element_list is None:
+            points = []
+            for left, right, top in zip(self.lefts, self.rights, self.tops):
+                points += [(left, 0), (right, 0), (right, top), (left, top)]
+            self.shape_element_list = arcade.ShapeElementList()
+            self.shape_element_list.append(arcade.create_rectangles_filled_with_colors(points,
+                                                                                        [self.color] * len(points)))
+        self.shape_element_list.draw()
+
+
+class Span(NamedTuple):
+    left: float
+    right: float
+    top: float
+    rect: int  # Index of the terrain rect it's on top of
+
+
+class FreeSurfaces:
+    """The bits of the terrain tops that nothing has been placed on yet"""
+    def __init__(self, terrain: Terrain, rng: random.Random):
+        self.random = rng
+        # Free spans, keyed (and sorted) by their left hand ends - so we can find the one something is sitting on ...
+        self.spans: dict[float, Span] = {}
+        self.lefts: list[float] = []
+        # ... and sorted by width, so we can pick one at random from all those that are wide enough
+        self.by_width: list[Tuple[float, float]] = []
+        # Where everything that's been placed is sitting, so its span can be freed up again when it goes
+        self.occupied: dict[arcade.Sprite, Span] = {}
+        # (Leaving out the wrap-around copies of the left edge at the far right of the world)
+        for i in range(terrain.wrap_copies_start):
+            self._add(Span(terrain.lefts[i], terrain.rights[i], terrain.tops[i], i))
+
+    def __len__(self):
+        return len(self.spans)
+
+    def random_span(self, min_width: float) -> Optional[Span]:
+        """A free span wider than min_width, chosen at random (None if there isn't one)"""
+        i = bisect_right(self.by_width, (min_width, float('inf')))
+        if i == len(self.by_width):
+            return None
+        return self.spans[self.by_width[self.random.randrange(i, len(self.by_width))][1]]
+
+    def occupy(self, sprite: arcade.Sprite, left: float, right: float):
+        """Split the free span under left -> right into whatever is left either side of it"""
+        i = bisect_right(self.lefts, left) - 1
+        if i < 0 or self.spans[self.lefts[i]].right <= left:
+            return
+        span = self._remove(self.lefts[i])
+        left, right = max(left, span.left), min(right, span.right)
+        self._add(span._replace(right=left))
+        self._add(span._replace(left=right))
+        self.occupied[sprite] = span._replace(left=left, right=right)
+
+    def release(self, sprite: arcade.Sprite):
+        """Whatever the sprite was sitting on is free again, so join it back up with the free bits either side"""
+        span = self.occupied.pop(sprite, None)
+        if span is None:
+            return
+        i = bisect_left(self.lefts, span.left)
+        if i > 0 and (before := self.spans[self.lefts[i - 1]]).right == span.left and before.rect == span.rect:
+            span = span._replace(left=self._remove(before.left).left)
+        if (after := self.spans.get(span.right)) is not None and after.rect == span.rect:
+            span = span._replace(right=self._remove(after.left).right)
+        self._add(span)
+
+    def _add(self, span: Span):
+        # Nothing fits on a span with no width, so don't bother keeping it
+        if span.right <= span.left:
+            return
+        self.spans[span.left] = span
+        insort(self.lefts, span.left)
+        insort(self.by_width, (span.right - span.left, span.left))
+
+    def _remove(self, left: float) -> Span:
+        span = self.spans.pop(left)
+        del self.lefts[bisect_left(self.lefts, left)]
+        del self.by_width[bisect_left(self.by_width, (span.right - span.left, left))]
+        return span
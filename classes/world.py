@@ -1,12 +1,23 @@
-import itertools
 import math
 
 import arcade
-import random
-from typing import Union, Tuple
-from constants import WORLD_WIDTH, WORLD_HEIGHT, BACKGROUND_COLOR, SPACE_START, SPACE_END
-import copy
+from typing import Union, Tuple, Callable, Optional, TYPE_CHECKING
+from constants import WORLD_WIDTH, WORLD_HEIGHT, BACKGROUND_COLOR, SPACE_START, SPACE_END, SPATIAL_INDEX_CELL_SIZE, \
+    EXPLOSION_FORCE_SPRITELISTS, ACTIVITY_DISTANCE, PHYSICS_SPRITELISTS, GENERAL_OBJECT_SPRITELISTS, SENSED_SPRITELISTS
+from spatial import SpatialGrid
+from explosion_field import ExplosionField
+from activity import ActivityManager
+from physics import PhysicsStore
+from guidance import MissileGuidance
+from sensors import SensorField
+from classes.terrain import Terrain, FreeSurfaces
+from classes.parallax_layer import ParallaxLayer
+from rng import LevelRandom, new_session_seed
+import itertools
+from functools import partial
 from collections import defaultdict
+if TYPE_CHECKING:
+    from pools import Pools
 
 
 class World:
@@ -22,28 +33,47 @@ class World:
                  hill_width: float = None,
                  camera_width: int = None,
                  camera_height: int = None,
-                 max_gravity: int = 200):
+                 max_gravity: int = 200,
+                 level_random: LevelRandom = None):
         self.scene = scene
+        # Random numbers for generating the world, and separately for everything that happens on it once it's made
+        self.level_random = level_random if level_random is not None else LevelRandom(new_session_seed(), level=0)
+        self.world_random = self.level_random.world
+        self.random = self.level_random.gameplay
         self.landing_pad_width_limit = landing_pad_width_limit
-        self.sky_color = sky_color if sky_color else random.choices(range(256), k=3)
-        self.ground_color = ground_color if ground_color else random.choices(range(256), k=3)
-        self.gravity = gravity if gravity is not None else random.randint(20, max(20, max_gravity))
+        self.sky_color = sky_color if sky_color else self.world_random.choices(range(256), k=3)
+        self.ground_color = ground_color if ground_color else self.world_random.choices(range(256), k=3)
+        self.gravity = gravity if gravity is not None else self.world_random.randint(20, max(20, max_gravity))
         # I play with the below number - it's not an exact count!  But it does set how densely the sky is populated with stars
-        self.star_count = star_count if star_count is not None else random.randint(100, 600)
+        self.star_count = star_count if star_count is not None else self.world_random.randint(100, 600)
         # Terrain attributes
-        self.hill_height = hill_height if hill_height is not None else random.randint(20, 100) / 100
-        self.hill_width = hill_width if hill_width is not None else random.randint(20, 100) / 100
-        self.friction_coefficient = friction_coefficient if friction_coefficient is not None else random.randint(1, 5)
+        self.hill_height = hill_height if hill_height is not None else self.world_random.randint(20, 100) / 100
+        self.hill_width = hill_width if hill_width is not None else self.world_random.randint(20, 100) / 100
+        self.friction_coefficient = friction_coefficient if friction_coefficient is not None else self.world_random.randint(1, 5)
         self.max_terrain_height = None
         self.camera_width = camera_width
         self.camera_height = camera_height
+        # Spatial index of the sprites that can collide with each other.  Kept up to date by the collision checks.
+        self.spatial_index = SpatialGrid(cell_size=SPATIAL_INDEX_CELL_SIZE)
+        # The forces from all the explosions, worked out once a frame
+        self.explosion_field = ExplosionField(scene, EXPLOSION_FORCE_SPRITELISTS)
+        # Puts the ground enemies and hostages that are far from the camera to sleep
+        self.activity = ActivityManager(awake_distance=ACTIVITY_DISTANCE, cell_size=SPATIAL_INDEX_CELL_SIZE)
+        # Moves everything that moves
+        self.physics = PhysicsStore(scene, self, PHYSICS_SPRITELISTS)
+        # Points all the missiles at the lander
+        self.guidance = MissileGuidance(scene, wrap_width=WORLD_WIDTH - 2 * camera_width)
+        # Tells hostages and the landing pad when the lander comes near
+        self.sensors = SensorField(scene, SENSED_SPRITELISTS, cell_size=SPATIAL_INDEX_CELL_SIZE)
+        # Missiles and explosions to reuse (see pools.py) - set up along with the level
+        self.pools: Optional[Pools] = None
         # Background parallax layers
         # key is the parallax factor.  0 (closest) matches foreground, 1 (furthest away possible) is completely static
-        self.background_layers: defaultdict[float, arcade.ShapeElementList] = defaultdict(arcade.ShapeElementList)
+        self.background_layers: defaultdict[float, ParallaxLayer] = defaultdict(ParallaxLayer)
 
         # Not everything is a sprite!  But I don't need to detect collisions with everything, so that's ok.
         # Will have a list of shapes associated with the world that get drawn but can't be interacted with, and shove
-        # them into the 'background_layers'
+        # them into the 'background_layers'.  (The shapes themselves aren't made until the layers are first drawn.)
         self.background_layers[1].append(self.get_sky_to_space_fade_rectangle())
         # Add the stars
         self.add_stars(parallax_factors=[0.9, 0.7, 0.5])
@@ -53,7 +83,7 @@ class World:
 
 
         # Background layers are used for a parallax scrolling effect
-        colour1 = (random.randint(20, 100), random.randint(20, 100), random.randint(20, 100))
+        colour1 = (self.world_random.randint(20, 100), self.world_random.randint(20, 100), self.world_random.randint(20, 100))
         colour2 = (colour1[0] + 30, colour1[1] + 30, colour1[2] + 30)
         colour3 = (colour2[0] + 30, colour2[1] + 30, colour2[2] + 30)
         parallax_factor = 0.8
@@ -85,22 +115,27 @@ class World:
                                                                      num_triangles=8)
 
         # The foreground
-        self.terrain_left_edge, self.terrain_centre, self.terrain_right_edge = self.get_terrain(self.landing_pad_width_limit)
-        self.scene.add_sprite_list("Terrain Left Edge", use_spatial_hash=True, sprite_list=self.terrain_left_edge)
-        self.scene.add_sprite_list("Terrain Centre", use_spatial_hash=True, sprite_list=self.terrain_centre)
-        self.scene.add_sprite_list("Terrain Right Edge", use_spatial_hash=True, sprite_list=self.terrain_right_edge)
+        # Index over all the terrain rects, used for collisions, explosions and placing objects on the ground
+        self.terrain = self.get_terrain(self.landing_pad_width_limit)
+        # It's drawn in amongst the sprites - in front of the lander, missiles and so on, behind what's on the ground
+        self.scene.draw_before("Ground Enemies", self.terrain.draw)
+        self.max_terrain_height = self.terrain.max_height
+        # The bits of the terrain surface that are still free for placing things on
+        self.free_surfaces = FreeSurfaces(self.terrain, self.random)
 
-        self.max_terrain_height = max([r.height for r in itertools.chain(self.terrain_left_edge, self.terrain_centre)])
+    def update_spatial_index(self):
+        # Only sprites that have changed cells since the last update actually get moved around in the grid
+        self.spatial_index.update(itertools.chain(*[self.scene[name] for name in GENERAL_OBJECT_SPRITELISTS]))
 
     def add_clouds(self, *, parallax_factors: list[float]):
-        def get_cloud_rectangles(*, vertical_range, number_of_strips) -> list[arcade.Shape]:
+        def get_cloud_rectangles(*, vertical_range, number_of_strips) -> list[Callable[[], arcade.Shape]]:
             # A background rectangle, presumably white-ish in colour, that's meant to give the impression of clouds
             cloud_rectangles = []
             y_high = vertical_range[0]
             for i in range(number_of_strips):
                 # So more likely to have clouds bunched together at the bottom, which is a nice effect
-                y_low = random.randint(vertical_range[0], min(y_high + 200, vertical_range[1]))
-                y_high = random.randint(y_low, y_low + 100)
+                y_low = self.world_random.randint(vertical_range[0], min(y_high + 200, vertical_range[1]))
+                y_high = self.world_random.randint(y_low, y_low + 100)
                 points = ((-WORLD_WIDTH, y_low),
                           (WORLD_WIDTH, y_low),
                           (WORLD_WIDTH, y_high),
@@ -111,7 +146,7 @@ class World:
                     (*arcade.color.WHITE_SMOKE, 150),
                     (*arcade.color.WHITE_SMOKE, 150),
                 )
-                cloud_rectangles.append(arcade.create_rectangle_filled_with_colors(points, colors))
+                cloud_rectangles.append(partial(arcade.create_rectangle_filled_with_colors, points, colors))
 
                 if y_high >= vertical_range[1]:
                     break
@@ -120,11 +155,11 @@ class World:
         # I also want horizontal white strips (ie. a bit like clouds)
         # The clouds don't actually move in a parallax way, but I do want them to be inbetween other parallax layers ...
         # So the parallax factor I'm using here is simply for the purpose of ordering when the clouds get drawn.
-        number_of_strips = random.randint(3, 8)
+        number_of_strips = self.world_random.randint(3, 8)
         vertical_range = [int((1/6) * WORLD_HEIGHT), int(0.5 * WORLD_HEIGHT)]
         cloud_rectangles = get_cloud_rectangles(vertical_range=vertical_range, number_of_strips=number_of_strips)
         for cloud in cloud_rectangles:
-            factor = random.choice(parallax_factors)
+            factor = self.world_random.choice(parallax_factors)
             self.background_layers[factor].append(cloud)
 
     def add_stars(self, *, parallax_factors: list[float]):
@@ -139,12 +174,13 @@ class World:
         def get_star(*, height_range: Tuple[int, int], brightness_range: Tuple[int, int],
                      background_wrapping_point: int):
             # Stars in the sky ...
-            # Kind of gets one star, but also any copies needed to make the wrap around logic work
-            x = random.randrange(background_wrapping_point)
-            y = random.randrange(*height_range)
-            brightness = random.randrange(*brightness_range)
+            # Kind of gets one star, but also any copies needed to make the wrap around logic work (along with how far
+            # across each one goes)
+            x = self.world_random.randrange(background_wrapping_point)
+            y = self.world_random.randrange(*height_range)
+            brightness = self.world_random.randrange(*brightness_range)
 
-            radius = random.randrange(2, 8)
+            radius = self.world_random.randrange(2, 8)
             color = (brightness, brightness, brightness)
             # If we scroll really slowly, the background_wrapping_point is less than the width of the screen,
             # so we won't actually fill it up!  So some copies may be needed
@@ -154,7 +190,8 @@ class World:
             x = x - n * background_wrapping_point
             # I think this makes sense ... !!
             while x < WORLD_WIDTH:
-                stars.append(arcade.create_rectangle_filled(x, y, radius, radius, color, 45))
+                stars.append((partial(arcade.create_rectangle_filled, x, y, radius, radius, color, 45),
+                              (x - radius, x + radius)))
                 x += background_wrapping_point
             return stars
 
@@ -166,20 +203,20 @@ class World:
             for _ in range(int(self.star_count/(index+1))):
                 # The lander can get up to WORLD_HEIGHT (and even a bit higher if it tries hard enough) - I want
                 # it to still see stars in the space above it.  So I go above WORLD_HEIGHT when generating stars.
-                for star in get_star(height_range=(int((2 / 3) * WORLD_HEIGHT), int(1.25 * WORLD_HEIGHT)),
+                for star, x_range in get_star(height_range=(int((2 / 3) * WORLD_HEIGHT), int(1.25 * WORLD_HEIGHT)),
                                                           brightness_range=(127, 256),
                                                           background_wrapping_point=background_wrapping_point):
-                    self.background_layers[factor].append(star)
+                    self.background_layers[factor].append(star, x_range)
 
             # Let's have fewer stars, less bright, at the top of the atmosphere, below "space"
             # Above covers 0.59 of the world height.
             # Below covers 0.104 of the world height.
             # This gives a ratio which maintains star density
             for _ in range(int(self.star_count * (0.104 / 0.59) / (index+1))):
-                for star in get_star(height_range=(int((5 / 9) * WORLD_HEIGHT), int((2 / 3) * WORLD_HEIGHT)),
+                for star, x_range in get_star(height_range=(int((5 / 9) * WORLD_HEIGHT), int((2 / 3) * WORLD_HEIGHT)),
                                                           brightness_range=(50, 127),
                                                           background_wrapping_point=background_wrapping_point):
-                    self.background_layers[factor].append(star)
+                    self.background_layers[factor].append(star, x_range)
 
     def get_mountains(self, *, parallax_factor: float,
                       colour: tuple[int, int, int],
@@ -201,10 +238,10 @@ class World:
         # So that is the point on the background that we want to do the wrap.
 
         def get_mountain(*, left, height, width):
-            """Returns a triangle starting at >=x, and not ending >= max_x.  Also returns
+            """Returns a triangle (and how far across it goes) starting at >=x, and not ending >= max_x.  Also returns
             any necessary copies needed to make the wrap around logic work"""
             def brighten(colour: tuple[int, int, int]):
-                values = [random.randint(50, 100) for _ in range(3)]
+                values = [self.world_random.randint(50, 100) for _ in range(3)]
                 colour = tuple(min(colour[a] + values[a], 255) for a in range(3))
                 return colour
 
@@ -215,36 +252,37 @@ class World:
             left = left - n * background_wrapping_point
             triangles = []
             while left < WORLD_WIDTH:
-                triangles.append(arcade.create_triangles_filled_with_colors(point_list=((left, 0),
-                                                                                        (int(left + width / 2), height),
-                                                                                        (left + width, 0)),
-                                                                            color_list=[colour, brightened_colour,
-                                                                                        colour]))
+                triangles.append((partial(arcade.create_triangles_filled_with_colors,
+                                          point_list=((left, 0),
+                                                      (int(left + width / 2), height),
+                                                      (left + width, 0)),
+                                          color_list=[colour, brightened_colour, colour]),
+                                  (left, left + width)))
                 left += background_wrapping_point
             return triangles
 
-        background_triangles = arcade.ShapeElementList()
+        background_triangles = ParallaxLayer()
         wrapping_point = WORLD_WIDTH - 2 * self.camera_width
         background_wrapping_point = wrapping_point * (1 - parallax_factor)
 
         for i in range(num_triangles):
-            height = random.randint(*height_range)
-            width = random.randint(*width_range)
-            left = random.randint(0, int(background_wrapping_point - width_range[0]))
-            colour = (colour[0] + random.randint(-10, 10), colour[1] + random.randint(-10, 10), colour[2] + random.randint(-10, 10))
+            height = self.world_random.randint(*height_range)
+            width = self.world_random.randint(*width_range)
+            left = self.world_random.randint(0, int(background_wrapping_point - width_range[0]))
+            colour = (colour[0] + self.world_random.randint(-10, 10), colour[1] + self.world_random.randint(-10, 10), colour[2] + self.world_random.randint(-10, 10))
             colour = (max(min(colour[0], 255), 0), max(min(colour[0], 255), 0), max(min(colour[0], 255), 0))
             triangles = get_mountain(left=left, height=height, width=width)
-            for t in triangles:
-                background_triangles.append(t)
+            for t, x_range in triangles:
+                background_triangles.append(t, x_range)
         return background_triangles
 
-    def get_terrain(self, landing_pad_width_limit) -> Tuple[arcade.SpriteList, arcade.SpriteList, arcade.SpriteList]:
+    def get_terrain(self, landing_pad_width_limit) -> Terrain:
         # Generates a set of rectangles that's used as the terrain.
         # We are assured that at least one of them is wide enough for the landing pad.
         def get_rect(x, max_x, min_x=None):
             """Returns a rectangle starting at x, and not ending >= max_x"""
-            height = max(50, int(random.randint(30, int((1/3) * WORLD_HEIGHT)) * self.hill_height))
-            width = min(int(random.randint(100, 500) * self.hill_width), max_x - x)
+            height = max(50, int(self.world_random.randint(30, int((1/3) * WORLD_HEIGHT)) * self.hill_height))
+            width = min(int(self.world_random.randint(100, 500) * self.hill_width), max_x - x)
             if min_x:
                 # We make sure there is at least one spot for the landing pad
                 width = max(min_x, width)
@@ -252,39 +290,37 @@ class World:
             # the size of the current hill if there's only a tiny hill left over
             if 0 < max_x - x - width < 100 * self.hill_width:
                 width += max_x - x - width
-            rect = arcade.SpriteSolidColor(width=width, height=height, color=self.ground_color)
-            rect.bottom = 0
-            rect.left = x
-            return rect
+            # (left, right, top)
+            return x, x + width, height
 
-        terrain_centre = arcade.SpriteList()
-        terrain_left_edge = arcade.SpriteList()
-        terrain_right_edge = arcade.SpriteList()
+        terrain_left_edge = []
+        terrain_centre = []
+        terrain_right_edge = []
 
-        # Bunch of rectangle sprites from left to right
+        # Bunch of rectangles from left to right
         x = 0
         while x < 2 * self.camera_width:
-            left_edge_rect = get_rect(x, max_x=2 * self.camera_width)
-            right_edge_rect = copy.copy(left_edge_rect)
-            right_edge_rect.left = WORLD_WIDTH - 2 * self.camera_width + x
-            terrain_left_edge.append(left_edge_rect)
-            terrain_right_edge.append(right_edge_rect)
-            x += left_edge_rect.width
+            left, right, top = get_rect(x, max_x=2 * self.camera_width)
+            terrain_left_edge.append((left, right, top))
+            terrain_right_edge.append((WORLD_WIDTH - 2 * self.camera_width + left,
+                                       WORLD_WIDTH - 2 * self.camera_width + right, top))
+            x = right
         # Ensure there's a possible spot for the Landing Pad
         rect = get_rect(x, max_x=WORLD_WIDTH - 2 * self.camera_width, min_x=int(landing_pad_width_limit * 1.5))
         terrain_centre.append(rect)
-        x += rect.width
+        x = rect[1]
         while x < WORLD_WIDTH - 2 * self.camera_width:
             rect = get_rect(x, max_x=WORLD_WIDTH - 2 * self.camera_width)
             terrain_centre.append(rect)
-            x += rect.width
+            x = rect[1]
 
         # I want a wrap around effect, so that you can endlessly fly sideways and it's a bit like you're just going round the world
         # To do this, I need an extra camera width on the end of the world, the matches the first camera width
 
-        return terrain_left_edge, terrain_centre, terrain_right_edge
+        return Terrain(terrain_left_edge + terrain_centre + terrain_right_edge, wrap_copies=len(terrain_right_edge),
+                       color=self.ground_color)
 
-    def get_sky_to_space_fade_rectangle(self) -> arcade.Shape:
+    def get_sky_to_space_fade_rectangle(self) -> Callable[[], arcade.Shape]:
         # A rectangle from bottom to 2/3rds screen height, with increasing transparency from bottom to top,
         # so that the sky fades into space ...
         # Because of the way the parallax background layers work, I've made this really
@@ -297,4 +333,4 @@ class World:
                   (*self.sky_color, 255),
                   BACKGROUND_COLOR,
                   BACKGROUND_COLOR)
-        return arcade.create_rectangle_filled_with_colors(points, colors)
+        return partial(arcade.create_rectangle_filled_with_colors, points, colors)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import arcade
+from typing import Sequence, Tuple
+
+
+# Explosions and shields are circles, but arcade only knows about polygon hit boxes.  Explosions used to build
+# themselves a new 8 sided hit box every frame as they grew, and every collision check (even for two shields) went
+# through arcade's polygon-polygon test.
+# Anything that's a CircleCollider is treated as the circle it actually is instead: circle against circle is just a
+# distance check, and circle against anything else is a check against the other sprite's hit box.  Its bounds (left,
+# right, top, bottom) come straight from its centre and radius too, rather than from its hit box.
+
+
+class CircleCollider:
+    """Mixin for sprites that collide as a circle, rather than as their hit box"""
+    @property
+    def collision_circle_radius(self) -> float:
+        return self.width / 2
+
+    @property
+    def left(self) -> float:
+        return self.center_x - self.collision_circle_radius
+
+    @left.setter
+    def left(self, value: float):
+        self.center_x = value + self.collision_circle_radius
+
+    @property
+    def right(self) -> float:
+        return self.center_x + self.collision_circle_radius
+
+    @right.setter
+    def right(self, value: float):
+        self.center_x = value - self.collision_circle_radius
+
+    @property
+    def bottom(self) -> float:
+        return self.center_y - self.collision_circle_radius
+
+    @bottom.setter
+    def bottom(self, value: float):
+        self.center_y = value + self.collision_circle_radius
+
+    @property
+    def top(self) -> float:
+        return self.center_y + self.collision_circle_radius
+
+    @top.setter
+    def top(self, value: float):
+        self.center_y = value - self.collision_circle_radius
+
+
+def check_for_collision(sprite1: arcade.Sprite, sprite2: arcade.Sprite) -> bool:
+    """Same as arcade.check_for_collision(), except that CircleColliders are treated as circles"""
+    circle1 = isinstance(sprite1, CircleCollider)
+    circle2 = isinstance(sprite2, CircleCollider)
+    if not circle1 and not circle2:
+        return arcade.check_for_collision(sprite1, sprite2)
+    if circle1 and circle2:
+        d_x = sprite1.center_x - sprite2.center_x
+        d_y = sprite1.center_y - sprite2.center_y
+        radii = sprite1.collision_circle_radius + sprite2.collision_circle_radius
+        return d_x * d_x + d_y * d_y < radii * radii
+    circle, other = (sprite1, sprite2) if circle1 else (sprite2, sprite1)
+    return circle_touches_polygon((circle.center_x, circle.center_y), circle.collision_circle_radius,
+                                  other.get_adjusted_hit_box())
+
+
+def check_for_collision_with_rect(sprite: arcade.Sprite, left: float, bottom: float, right: float, top: float) -> bool:
+    """Whether the sprite touches the (axis aligned) rectangle - eg. one of the terrain rects"""
+    points = ((left, bottom), (right, bottom), (right, top), (left, top))
+    if isinstance(sprite, CircleCollider):
+        return circle_touches_polygon((sprite.center_x, sprite.center_y), sprite.collision_circle_radius, points)
+    return arcade.are_polygons_intersecting(sprite.get_adjusted_hit_box(), points)
+
+
+def circle_touches_polygon(centre: Tuple[float, float], radius: float,
+                           points: Sequence[Tuple[float, float]]) -> bool:
+    c_x, c_y = centre
+    # Quick check first - most of the time we're nowhere near
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    if c_x + radius < min(xs) or c_x - radius > max(xs) or c_y + radius < min(ys) or c_y - radius > max(ys):
+        return False
+    # Either one of the polygon's edges passes within radius of the centre ...
+    radius_squared = radius * radius
+    inside = False
+    for i in range(len(points)):
+        a_x, a_y = points[i - 1]
+        b_x, b_y = points[i]
+        e_x, e_y = b_x - a_x, b_y - a_y
+        length_squared = e_x * e_x + e_y * e_y
+        # Nearest point on the edge to the centre
+        t = 0 if length_squared == 0 else max(0.0, min(1.0, ((c_x - a_x) * e_x + (c_y - a_y) * e_y) / length_squared))
+        n_x, n_y = a_x + t * e_x - c_x, a_y + t * e_y - c_y
+        if n_x * n_x + n_y * n_y < radius_squared:
+            return True
+        # (Counting edge crossings along a ray from the centre, for the check below)
+        if (a_y > c_y) != (b_y > c_y) and c_x < a_x + (c_y - a_y) * e_x / e_y:
+            inside = not inside
+    # ... or the centre's inside the polygon (ie. the circle's entirely inside it)
+    return inside
@@ -5,12 +5,15 @@ import random
 import arcade
 from arcade import Sprite, Scene, SpriteList, Camera
 import constants
+import sounds
 from typing import Tuple
-from pathlib import Path
 import math
 import itertools
+import numpy as np
 from typing import List
 from pyglet.math import Vec2
+from colliders import CircleCollider, check_for_collision
+from continuous_collisions import Impact, circle_circle_impact, circle_column_impact, reflect
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from classes.landing_pad import LandingPad
@@ -19,28 +22,61 @@ if TYPE_CHECKING:
     from classes.game_object import GameObject
     from classes.explosion import Explosion
     from classes.world import World
+    from classes.terrain import Terrain
+    from spatial import SpatialGrid
 
 
-BOUNCE_SOUNDS = [arcade.load_sound(Path(bounce_sound)) for bounce_sound in Path('sounds').glob('bounce_*.mp3')]
+BOUNCE_SOUNDS = sounds.sound_paths('bounce_')
 
 
 # The coefficient of restitution epsilon (e), is the ratio of the final to initial relative speed between two objects
 # after they collide. It normally ranges from 0 to 1 where 1 would be a perfectly elastic collision.
 # Default value is 0.5
 coefficient_of_restitution = {
-    # Tuple[Class, Class] : coefficient
-    frozenset({"Lander", "Missile"}): 0.1,
-    frozenset({'RocketLauncher', 'Lander'}): 0.5,
-    frozenset({"Explosion", "Missile"}): 0.1,
-    frozenset({"Explosion", "Lander"}): 0.1,
-    frozenset({"Shield", "Explosion"}): 0.1,
-    frozenset({"Shield", "Shield"}): 3.5,  # For hostages, feels about right
-    frozenset({"Shield", "Missile"}): 0.1,
-    frozenset({"Shield", "Lander"}): 0.8,
-    frozenset({'Shield', 'RocketLauncher'}): 0.5,
+    # Tuple[Sprite list, Sprite list] : coefficient
+    frozenset({"Lander", "Missiles"}): 0.1,
+    frozenset({'Ground Enemies', 'Lander'}): 0.5,
+    frozenset({"Explosions", "Missiles"}): 0.1,
+    frozenset({"Explosions", "Lander"}): 0.1,
+    frozenset({"Shields", "Explosions"}): 0.1,
+    frozenset({"Shields"}): 3.5,  # For hostages, feels about right
+    frozenset({"Shields", "Missiles"}): 0.1,
+    frozenset({"Shields", "Lander"}): 0.8,
+    frozenset({'Shields', 'Ground Enemies'}): 0.5,
 }
 
 
+def get_restitution_table() -> np.ndarray:
+    # The same coefficients, as a table indexed by the category ids of the two sprites
+    table = np.full((constants.CATEGORY_COUNT, constants.CATEGORY_COUNT), 0.5)
+    for names, coefficient in coefficient_of_restitution.items():
+        ids = [constants.CATEGORY_IDS[name] for name in names]
+        # (A frozenset of a sprite list with itself only has the one name in it)
+        table[ids[0], ids[-1]] = table[ids[-1], ids[0]] = coefficient
+    return table
+
+
+RESTITUTION_TABLE = get_restitution_table()
+
+# When a shield bounces off something fixed, it's left this far clear of it, so it isn't touching it next frame
+CONTACT_GAP = 0.01
+
+
+def check_for_collision_with_lists(sprite: Sprite, sprite_lists: List[SpriteList]) -> List[Sprite]:
+    # arcade's version of this asks the GPU about every sprite list that doesn't use a spatial hash - which needs a
+    # window (so doesn't work headless), and is overkill for the handful of sprites we're talking about anyway.
+    # Sprite lists without a spatial hash just get checked a sprite at a time.
+    # Circles (see colliders.py) are checked against everything a sprite at a time too - arcade doesn't know about them.
+    collisions = []
+    for sprite_list in sprite_lists:
+        if isinstance(sprite, CircleCollider):
+            collisions += [s for s in sprite_list if s is not sprite and check_for_collision(sprite, s)]
+        else:
+            collisions += arcade.check_for_collision_with_list(sprite, sprite_list,
+                                                               method=1 if sprite_list.spatial_hash else 3)
+    return collisions
+
+
 def modulus(a: Tuple[float, float]) -> float:
     return math.sqrt(a[0]**2 + a[1]**2)
 
@@ -61,10 +97,10 @@ def unit_vector_from_pos1_to_pos2(pos1: Tuple[float, float], pos2: Tuple[float,
 # Circular collisions (think I'm going to treat all non-terrain collisions in this way)
 # https://ravnik.eu/collision-of-spheres-in-2d/
 def circular_collision(sprite1: Sprite, sprite2: Sprite) -> Tuple[Tuple[float, float], Tuple[float, float]]:
-    e = coefficient_of_restitution.get(frozenset({sprite1.__class__.__name__, sprite2.__class__.__name__}), 0.5)
-    if sprite1.__class__.__name__ == 'Shield':
+    e = float(RESTITUTION_TABLE[sprite1.category_id, sprite2.category_id])
+    if sprite1.category & constants.SHIELD:
         sprite1 = sprite1.owner
-    if sprite2.__class__.__name__ == 'Shield':
+    if sprite2.category & constants.SHIELD:
         sprite2 = sprite2.owner
     n = unit_vector_from_pos1_to_pos2(sprite1.position, sprite2.position)
     t = -n[1], n[0]  # Tangent unit vector
@@ -88,6 +124,65 @@ def circular_collision(sprite1: Sprite, sprite2: Sprite) -> Tuple[Tuple[float, f
     return v1, v2
 
 
+# If more than this many pairs need their velocities resolving in a frame, it's quicker to do them all at once
+# with numpy than one at a time with circular_collision().  Below it, numpy's overhead isn't worth it.
+BATCHED_COLLISION_THRESHOLD = 4
+
+
+def circular_collisions(positions_1: np.ndarray, positions_2: np.ndarray,
+                        velocities_1: np.ndarray, velocities_2: np.ndarray,
+                        masses_1: np.ndarray, masses_2: np.ndarray,
+                        restitution: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Exactly the same sums as circular_collision(), but for many pairs at once.
+    # Positions and velocities are (n, 2) arrays, masses and restitution are (n,) arrays.
+    # (Done in the same order as circular_collision(), so the results match it exactly.)
+    d = positions_2 - positions_1
+    n = d / np.sqrt(d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1])[:, np.newaxis]
+    t = np.column_stack((-n[:, 1], n[:, 0]))  # Tangent unit vectors
+    u1_n = velocities_1[:, 0] * n[:, 0] + velocities_1[:, 1] * n[:, 1]
+    u2_n = velocities_2[:, 0] * n[:, 0] + velocities_2[:, 1] * n[:, 1]
+    v1_t = velocities_1[:, 0] * t[:, 0] + velocities_1[:, 1] * t[:, 1]
+    v2_t = velocities_2[:, 0] * t[:, 0] + velocities_2[:, 1] * t[:, 1]
+    m1, m2, e = masses_1, masses_2, restitution
+
+    v1_n = (m2 / (m1 + m2)) * ((m1 / m2 - e) * u1_n + (1 + e) * u2_n)
+    v2_n = (m1 / (m1 + m2)) * ((1 + e) * u1_n + (m2 / m1 - e) * u2_n)
+
+    v1 = v1_n[:, np.newaxis] * n + v1_t[:, np.newaxis] * t
+    v2 = v2_n[:, np.newaxis] * n + v2_t[:, np.newaxis] * t
+    return v1, v2
+
+
+def resolve_circular_collisions(pending_collisions: List[Tuple[Sprite, Sprite, List[GameObject]]]):
+    # Each pending collision is (sprite1, sprite2, objects whose velocity should be set from the result).
+    # The velocities are applied in the order the collisions were found.  That's not quite the same as doing them one
+    # at a time, though - see where they're collected, in check_for_collisions_general().
+    if not pending_collisions:
+        return
+    if len(pending_collisions) <= BATCHED_COLLISION_THRESHOLD:
+        velocities = [circular_collision(sprite1, sprite2)[0] for sprite1, sprite2, _ in pending_collisions]
+    else:
+        bodies_1, bodies_2, category_ids_1, category_ids_2 = [], [], [], []
+        for sprite1, sprite2, _ in pending_collisions:
+            category_ids_1.append(sprite1.category_id)
+            category_ids_2.append(sprite2.category_id)
+            bodies_1.append(sprite1.owner if sprite1.category & constants.SHIELD else sprite1)
+            bodies_2.append(sprite2.owner if sprite2.category & constants.SHIELD else sprite2)
+        velocities, _ = circular_collisions(
+            positions_1=np.array([b.position for b in bodies_1], dtype=float),
+            positions_2=np.array([b.position for b in bodies_2], dtype=float),
+            velocities_1=np.array([(b.velocity_x, b.velocity_y) for b in bodies_1], dtype=float),
+            velocities_2=np.array([(b.velocity_x, b.velocity_y) for b in bodies_2], dtype=float),
+            masses_1=np.array([b.mass for b in bodies_1], dtype=float),
+            masses_2=np.array([b.mass for b in bodies_2], dtype=float),
+            restitution=RESTITUTION_TABLE[category_ids_1, category_ids_2])
+        velocities = velocities.tolist()
+
+    for (_, _, objs), v1 in zip(pending_collisions, velocities):
+        for obj in objs:
+            obj.change_x, obj.change_y = v1[0] * constants.PHYSICS_TIMESTEP, v1[1] * constants.PHYSICS_TIMESTEP
+
+
 def check_for_collisions(scene: Scene, camera: Camera, world: World):
 
     # Collisions with the terrain and the landing pad are one-sided collisions.
@@ -110,14 +205,18 @@ def check_for_collisions(scene: Scene, camera: Camera, world: World):
     # An explosion colliding with a shielded object exerts a force which, I think, will only affect the object it's
     # colliding with.
 
-    terrain_spritelists = [scene[name] for name in constants.TERRAIN_SPRITELISTS]
+    terrain = world.terrain
 
-    general_object_spritelists = [scene[name] for name in constants.GENERAL_OBJECT_SPRITELISTS]
+    # Broadphase - bring the world's spatial index up to date with everything that can be hit this frame.
+    world.update_spatial_index()
+    spatial_index = world.spatial_index
 
     lander: Lander = scene['Lander'].sprite_list[0] if scene['Lander'].sprite_list else None
     landing_pad: LandingPad = scene['Landing Pad'].sprite_list[0]
 
     considered_collisions = set()
+    pending_collisions = []
+    lander_collisions = 0
     # The things below can hit each other.
     # The things missed off (eg. terrain and ground enemies) can only be hit by these things
     for sprite in itertools.chain(scene['Lander'],
@@ -130,26 +229,43 @@ def check_for_collisions(scene: Scene, camera: Camera, world: World):
         is_collision = False
         # Terrain / Landing pad collisions don't affect the terrain / landing pad - it's only about what hit them
         is_collision |= check_for_collision_with_landing_pad(sprite, lander=lander, landing_pad=landing_pad, scene=scene)
-        is_collision |= check_for_collision_with_terrain(sprite, terrain_spritelists, scene, world)
-        is_collision |= check_for_collisions_general(sprite, general_object_spritelists, scene, considered_collisions, lander, camera)
-
-        # Not 100% sold on this, but below, if the lander has collided with something,
-        # I cause a little camera shake.  It's fixed amplitude and along the movement vector of the lander,
-        # which is not necessarily the same as the vector along which it was hit, so not very sophisticated
+        is_collision |= check_for_collision_with_terrain(sprite, terrain, scene)
+        is_collision |= check_for_collisions_general(sprite, spatial_index, scene, considered_collisions, lander, pending_collisions)
         if lander is not None and lander in {sprite, getattr(sprite, 'owner')} and is_collision:
-            angle = math.atan2(lander.change_y, lander.change_x)
-            vector = Vec2(5 * math.cos(angle), 5 * math.sin(angle))
-            camera.shake(vector,
-                         speed=0.5,
-                         damping=0.7)
+            lander_collisions += 1
+
+    # The bounces from the general collisions are all worked out together, now we know about all of them
+    resolve_circular_collisions(pending_collisions)
+
+    # Not 100% sold on this, but below, if the lander has collided with something,
+    # I cause a little camera shake.  It's fixed amplitude and along the movement vector of the lander,
+    # which is not necessarily the same as the vector along which it was hit, so not very sophisticated
+    for _ in range(lander_collisions):
+        angle = math.atan2(lander.change_y, lander.change_x)
+        vector = Vec2(5 * math.cos(angle), 5 * math.sin(angle))
+        camera.shake(vector,
+                     speed=0.5,
+                     damping=0.7)
 
 
 def check_for_collision_with_landing_pad(sprite: Sprite, lander: Lander, landing_pad: LandingPad, scene: Scene) -> bool:
     # I have realized it should only ever be the lander that interacts with the landing pad,
     # because it will have its own force field that comes on automatically and will block everything except the lander
-    if sprite in scene['Ground Enemies']:
+    if sprite.category & constants.GROUND_ENEMY:
         return False
-    collision = arcade.check_for_collision(sprite, landing_pad)
+    if sprite.category & constants.SHIELD:
+        # Shields are swept against the landing pad, rather than just checked where they've ended up.
+        # A collision with a deactivated shield isn't a collision, and shields of things on the ground don't move.
+        shield: Shield = sprite
+        if not shield.activated or shield.owner.category & constants.ALLOWED_TERRAIN_SHIELD_COLLISIONS:
+            return False
+        start, displacement, radius = shield_movement(shield)
+        impact = circle_column_impact(start, displacement, radius, landing_pad.left, landing_pad.right, landing_pad.top)
+        if impact is None:
+            return False
+        bounce_shield_off_fixed_surface(shield, start, displacement, impact)
+        return True
+    collision = check_for_collision(sprite, landing_pad)
     sprite_collided = bool(collision)
     if collision:
         # Lander and LandingPad
@@ -161,17 +277,10 @@ def check_for_collision_with_landing_pad(sprite: Sprite, lander: Lander, landing
                 sprite_collided = False
             else:
                 lander.die()
-        elif sprite in scene['Shields'].sprite_list:
-            shield: Shield = sprite
-            if shield.activated:
-                check_for_shield_collision_with_rectangle_sprite(shield, landing_pad)
-            else:
-                # A collision with a deactivated shield isn't a collision
-                sprite_collided = False
-        elif sprite not in scene['Explosions'].sprite_list:
+        elif not sprite.category & constants.EXPLOSION:
             sprite: GameObject
             sprite.die()
-        elif sprite in scene['Explosions'].sprite_list:
+        else:
             explosion: Explosion = sprite
             if landing_pad.left <= explosion.center_x <= landing_pad.right and explosion.center_y <= landing_pad.top:
                 explosion.change_y = 0
@@ -205,42 +314,47 @@ def is_sprite_in_camera_view(sprite: Sprite, camera: Camera):
     return True
 
 
-def check_for_collisions_general(sprite: Sprite, general_object_spritelists: List[SpriteList], scene: Scene, considered_collisions: set, lander: Lander, camera: Camera):
-    # Unfortunately, I've realized that checking for all these collisions slows the game down.
-    # A weakness of python arcade, that they may well fix in a later version
-    # https://api.arcade.academy/en/2.5.7/arcade_vs_pygame_performance.html#collision-detection
-    # I think my solution will be to simply secretly only check for non-"use_spatial_hash=True" collisions
-    # when the lander can see them.  ie. Non-terrain collisions off screen just won't happen
-    # Alternatively, I could simply decide that missiles can't collide with each other - that would make a significant
-    # difference and probably wouldn't affect the enjoyment of the game very much
-    if not is_sprite_in_camera_view(sprite=sprite, camera=camera):
+def check_for_collisions_general(sprite: Sprite, spatial_index: SpatialGrid, scene: Scene, considered_collisions: set, lander: Lander,
+                                 pending_collisions: list):
+    # Checking every sprite against every general sprite list used to slow the game down so much that I only
+    # checked for collisions when the lander could see them (arcade does a GPU query for each list that isn't
+    # spatially hashed).  Now the spatial index hands back only the sprites sharing a grid cell with this one,
+    # so the precise hit box check is only done on those, and collisions happen across the whole world.
+    # Deactivated shields never count as collisions, so don't bother with their hit boxes at all.
+    if sprite.category & constants.SHIELD and not sprite.activated:
         return False
-    collisions = arcade.check_for_collision_with_lists(sprite, general_object_spritelists)
+    # The index was built at the start of the collision checks, so skip anything that has since been removed
+    # from the scene (eg. it's already died this frame) - otherwise it would keep on exploding!
+    collisions = [candidate for candidate in spatial_index.nearby(sprite)
+                  if sprite.collides_with & candidate.category
+                  and candidate.sprite_lists
+                  and not (candidate.category & constants.SHIELD and not candidate.activated)
+                  and check_for_collision(sprite, candidate)]
     sprite_collided = False
     for collision in collisions:
         # Nothing to do if the sprite and the collision object are one and the same,
         # or if one is the shield of the other,
         # or if we've already dealt with this case
         if (sprite == collision
-                or (sprite.__class__.__name__ == 'Shield' and sprite.owner == collision)
-                or (collision.__class__.__name__ == 'Shield' and collision.owner == sprite)
+                or (sprite.category & constants.SHIELD and sprite.owner == collision)
+                or (collision.category & constants.SHIELD and collision.owner == sprite)
                 or ((collision, sprite) in considered_collisions)):
             continue
         else:
             considered_collisions.add((sprite, collision))
 
-        if (sprite in scene['Shields'] and not sprite.activated or
-                collision in scene['Shields'] and not collision.activated):
+        if (sprite.category & constants.SHIELD and not sprite.activated or
+                collision.category & constants.SHIELD and not collision.activated):
             # When a shield isn't activated, it isn't visible, and doesn't count as a collision
             continue
 
         # Here I'm considering what happens where one side of the "collision" is an explosion
         # It can only be the "sprite" side, as I've not put Explosions into general_object_spritelists.
-        if "Explosion" == sprite.__class__.__name__:
+        if sprite.category & constants.EXPLOSION:
             # But if an object comes into contact with an explosion and doesn't have an activated shield, it blows up
             # (ie. If you're not a shield and don't have a shield, or you're not a shield and have a shield but it's
             # deactivated, then you blow up)
-            if (collision.__class__.__name__ != 'Shield' and (
+            if (not collision.category & constants.SHIELD and (
                     getattr(collision, 'shield', None) is None or
                     ((shield := getattr(collision, 'shield', None)) is not None and shield.activated is False))):
                 collision: GameObject
@@ -253,7 +367,7 @@ def check_for_collisions_general(sprite: Sprite, general_object_spritelists: Lis
         # Is this collision between two shields, where one is a shielded ground object?
         # In that case, that shield is essentially treated like the terrain - it is fixed in place,
         # and the other object bounces off without losing energy.
-        if ({"Shield"} == {sprite.__class__.__name__, collision.__class__.__name__} and
+        if (sprite.category & collision.category & constants.SHIELD and
                 True in {sprite.owner.on_ground, collision.owner.on_ground}):
             if sprite.owner.on_ground:
                 point = (sprite.owner.center_x, sprite.owner.center_y)
@@ -261,199 +375,153 @@ def check_for_collisions_general(sprite: Sprite, general_object_spritelists: Lis
             else:
                 point = (collision.owner.center_x, collision.owner.center_y)
                 obj_1, obj_2 = sprite.owner, collision.owner
-            collision_with_fixed_point(point_x=point[0], point_y=point[1], obj=obj_1)
-
-            # Now - have a bug-type scenario sometimes where shields can get "stuck" together.
-            # ie. We compute the bounce back vector, but it's not enough for the two objects to stop colliding,
-            # so then we immediately detect another collision but then bounce the two objects back a bit closer again!
-            # So I check to see if the initial change we've applied is enough, and if not, apply it again.
-            i = 0
-            while True:
-                i += 1
-                change_pos_of_sprite_and_shield_by_vector(obj=obj_1, x=obj_1.change_x, y=obj_1.change_y)
-                if not arcade.check_for_collision(obj_1.shield, obj_2.shield) or obj_1.center_y < 0:
-                    # If we're no longer colliding, then we can undo the last pos change, as it will get applied later.
-                    change_pos_of_sprite_and_shield_by_vector(obj=obj_1, x=-obj_1.change_x, y=-obj_1.change_y)
-                    break
-                if obj_1.center_y < 0:
-                    # Ok - something has definitely gone wrong.  We've been stuck in this while loop, applied a bunch
-                    # of little nudges to our object and it's now below ground.  We obviously somehow got the wrong
-                    # direction initially - I'm simply going to bump the object back in the other direction
-                    print("Switched the direction of the bounce so as to stay above ground!")
-                    obj_1.change_x = -obj_1.change_x
-                    obj_1.change_y = -obj_1.change_y
-                if i == 30:
-                    raise ValueError(f"Collision trap.  Rebound vector for obj_1: (x: {obj_1.change_x}, "
-                                     f"y: {obj_1.change_y}). obj_1 centre: ({obj_1.center_x}, {obj_1.center_y}). "
-                                     f"obj_2 centre: ({obj_2.center_x}, {obj_2.center_y}).")
-
+            if obj_1.on_ground:
+                # Neither of them can move
+                continue
+            # Work out where, along this frame's movement, the two shields first touched, and bounce off from there.
+            # (I used to bounce, then keep nudging the object along its new vector until the shields stopped
+            # overlapping, which could get stuck - this is done in one step.)
+            start = (obj_1.center_x - obj_1.change_x, obj_1.center_y - obj_1.change_y)
+            displacement = (obj_1.change_x, obj_1.change_y)
+            impact = circle_circle_impact(start, displacement, (obj_1.shield.width + obj_2.shield.width) / 2, point)
+            if impact is None:
+                # The hit boxes touch, but the circles don't quite - bounce off from where we are
+                impact = Impact(time=1, normal=unit_vector_from_pos1_to_pos2(point, (obj_1.center_x, obj_1.center_y)))
             # Two shields have bounced
-            arcade.play_sound(random.choice(BOUNCE_SOUNDS))
+            bounce_shield_off_fixed_surface(obj_1.shield, start, displacement, impact)
             continue
 
         # This is the general collision bit.  I essentially treat a collision like two circles colliding.
         # The resultant velocities depend on the respective masses, but ground objects don't suddenly start moving.
         # (Currently I just make ground objects very heavy and don't alter their (zero) velocity,
         # although I should really ignore their mass and just make objects bounce off, I think.)
-        v1, v2 = circular_collision(sprite, collision)
-        for obj, velocity in [(sprite, v1), (collision, v2)]:
-            if obj in scene['Shields']:
+        # The new velocities are worked out for all the collisions at once, at the end of the frame.
+        # Anything that isn't protected by a shield still blows up straight away.
+        # NB. this changes the order things happen in, compared with bouncing here and now:
+        #  - The bounce is worked out from where things are at the end of the frame's collision checks, not where they
+        #    are now - and a shield bouncing off another shield (above) can have moved one of them in between.
+        #  - die() runs before the new velocity's been set, and the lander's camera shake (in check_for_collisions())
+        #    goes by the lander's velocity after all the bounces, rather than before this one.
+        bounced = []
+        for obj in (sprite, collision):
+            if obj.category & constants.SHIELD:
                 if obj.owner.on_ground is False:
-                    obj.owner.change_x, obj.owner.change_y = v1[0] * (1/60), v1[1] * (1/60),
+                    bounced.append(obj.owner)
             else:
                 if obj.on_ground is False:
-                    obj.change_x, obj.change_y = v1[0] * (1/60), v1[1] * (1/60)
+                    bounced.append(obj)
                 obj.die()
+        if bounced:
+            pending_collisions.append((sprite, collision, bounced))
 
     return sprite_collided
 
 
-def collision_with_fixed_point(*, point_x: int, point_y: int, obj: Sprite):
-    # Point to sprite centre vector (unit vector normal to plane)
-    n_x, n_y = unit_vector_from_pos1_to_pos2((point_x, point_y), (obj.center_x, obj.center_y))
-    # Tangential unit vector along plane
-    t_x, t_y = -n_y, n_x
-    # So want to project the existing movement vectors onto these vectors, then the tangential movement
-    # is preserved and the movement along the normal vector is reversed ...
-    normal_projection = dot((obj.change_x, obj.change_y), (n_x, n_y))
-    tangential_projection = dot((obj.change_x, obj.change_y), (t_x, t_y))
-    obj.change_x = -normal_projection * n_x + tangential_projection * t_x
-    obj.change_y = -normal_projection * n_y + tangential_projection * t_y
-
-
-def check_for_collision_with_terrain(sprite: Sprite, terrain: List[SpriteList], scene: Scene, world: World):
-    # Trying to find ways to speed up my collision checks.
-    # If the sprite is above the highest mountain, it's definitely not colliding with the terrain ...
-    if sprite.bottom > world.max_terrain_height:
-        return False
-    elif sprite in scene['Shields'].sprite_list:
+def check_for_collision_with_terrain(sprite: Sprite, terrain: Terrain, scene: Scene):
+    if sprite.category & constants.SHIELD:
         shield: Shield = sprite
         if shield.activated:
             return check_for_shield_collision_with_terrain(shield, terrain, scene)
         # If a shield isn't activated, it's also not visible and not really meant to be there
         # Let's return now before any work is done
         return False
-    elif sprite in scene['Explosions'].sprite_list:
+    # Trying to find ways to speed up my collision checks.
+    # If the sprite is (and was) above the highest mountain, it's definitely not colliding with the terrain ...
+    if min(sprite.bottom, sprite.bottom - sprite.change_y) > terrain.max_height:
+        return False
+    elif sprite.category & constants.EXPLOSION:
         sprite: Explosion
         check_for_explosion_collision_with_terrain(sprite, terrain)
         return False
+    elif (shield := getattr(sprite, 'shield', None)) is not None and shield.activated:
+        # The shield bounces off the terrain before whatever's inside it can reach it
+        return False
     # I think everything else should just die ...
-    elif arcade.check_for_collision_with_lists(sprite, terrain):
+    # Super missiles can move further than their own length in a frame, so as well as checking where the sprite has
+    # ended up, I check whether its centre passed through the terrain on the way.
+    elif (terrain.colliding_rects(sprite) or
+          terrain.first_impact((sprite.center_x - sprite.change_x, sprite.center_y - sprite.change_y),
+                               (sprite.change_x, sprite.change_y), radius=0) is not None):
         sprite: GameObject
         sprite.die()
         return True
     return False
 
 
-def check_for_explosion_collision_with_terrain(explosion: Explosion, terrain: List[SpriteList]):
+def check_for_explosion_collision_with_terrain(explosion: Explosion, terrain: Terrain):
     # Rather than explosions looking like they're hovering in the air, it makes more sense to just
     # consider the centre points.  So if an explosion is on the ground, you only see the top half of it.
     # The reason this function is different to the others is that explosions don't bounce.
 
     # So I want the three ground rects - directly underneath, and left and right
-    # Since rects are in order from left to right, this shouldn't be hard
-    r1, r2, r3 = None, None, None
-    for r in [i for t in terrain for i in t.sprite_list]:
-        r1, r2, r3 = r2, r3, r
-        if not r1:
-            continue
-        if r1.right <= explosion.center_x <= r3.left:
-            break
-    if explosion.center_y <= r2.top:
+    # The terrain index finds these with a binary search on the rect left hand sides
+    r1, r2, r3 = terrain.neighbours(explosion.center_x)
+    if explosion.center_y <= terrain.tops[r2]:
         explosion.change_y = 0
         explosion.on_ground = True
     else:
         explosion.on_ground = False
-    if ((explosion.center_x + explosion.change_x <= r1.right and r1.top > explosion.center_y) or
-            (explosion.center_x + explosion.change_x >= r3.left and r3.top > explosion.center_y)):
+    if ((explosion.center_x + explosion.change_x <= terrain.rights[r1] and terrain.tops[r1] > explosion.center_y) or
+            (explosion.center_x + explosion.change_x >= terrain.lefts[r3] and terrain.tops[r3] > explosion.center_y)):
         explosion.change_x = 0
     # Not interested in returning whether the sprite collided or not, as don't do screen shakes for explosions
 
 
-def check_for_shield_collision_with_terrain(shield: Shield, terrain: List[SpriteList], scene: Scene):
+def check_for_shield_collision_with_terrain(shield: Shield, terrain: Terrain, scene: Scene):
     # The LandingPad and Hostages' and Ground Enemies shields are allowed to clash with the terrain
-    if shield.owner in itertools.chain(*[scene[name].sprite_list for name in constants.ALLOWED_TERRAIN_SHIELD_COLLISIONS_SPRITELISTS]):
+    if shield.owner.category & constants.ALLOWED_TERRAIN_SHIELD_COLLISIONS:
         return False
-    collision_with_terrain = arcade.check_for_collision_with_lists(shield, terrain)
-    for rect in collision_with_terrain:
-        rect: arcade.SpriteSolidColor
-        check_for_shield_collision_with_rectangle_sprite(shield=shield, rect=rect)
-
-    return bool(collision_with_terrain)
-
+    start, displacement, radius = shield_movement(shield)
+    impact = terrain.first_impact(start, displacement, radius)
+    if impact is None:
+        return False
+    bounce_shield_off_fixed_surface(shield, start, displacement, impact)
+    return True
 
-def check_for_shield_collision_with_rectangle_sprite(shield: Shield, rect: arcade.SpriteSolidColor):
-    # 5 possibilities.  Bounce off left side, left corner, top side, right corner or right side.
-    # Left or right side
-    sprite_collided = False
-    if (shield.center_y <= rect.top and
-            ((shield.left < rect.left <= shield.right) or (shield.left <= rect.right < shield.right))):
-        shield.owner.change_x *= -1
-        sprite_collided = True
-    # Top side
-    elif (rect.left <= shield.center_x <= rect.right) and shield.bottom <= rect.top:
-        shield.owner.change_y *= -1
-        sprite_collided = True
-    # Left and right corners
-    elif (((shield.left < rect.left <= shield.right) or (shield.left <= rect.right < shield.right))
-          and shield.bottom <= rect.top):
-        # Want to bounce off the plane that is perpendicular to the vector from the corner to the shield centre
-        # (Which is what happens when you bounce off a flat wall, except that the plane is much more obvious then!)
-        if shield.left < rect.left <= shield.right:
-            corner_x, corner_y = rect.left, rect.top
-        else:
-            corner_x, corner_y = rect.right, rect.top
-        collision_with_fixed_point(point_x=corner_x, point_y=corner_y, obj=shield.owner)
-        sprite_collided = True
 
-    if sprite_collided:
-        arcade.play_sound(random.choice(BOUNCE_SOUNDS))
-    # Check to see if we still have a collision between these two objects.
-    # If we do, keep applying the bounce back vector
-    if sprite_collided:
-        while True:
-            change_pos_of_sprite_and_shield_by_vector(obj=shield.owner, x=shield.owner.change_x, y=shield.owner.change_y)
-            if not arcade.check_for_collision(shield, rect):
-                # If we're no longer colliding, then we can undo the last pos change, as it will get applied later.
-                change_pos_of_sprite_and_shield_by_vector(obj=shield.owner, x=-shield.owner.change_x, y=-shield.owner.change_y)
-                break
+def shield_movement(shield: Shield) -> Tuple[Tuple[float, float], Tuple[float, float], float]:
+    # Where the shield was at the start of the frame, how far it moved, and its radius
+    owner = shield.owner
+    return ((owner.center_x - owner.change_x, owner.center_y - owner.change_y),
+            (owner.change_x, owner.change_y),
+            shield.width / 2)
+
+
+def bounce_shield_off_fixed_surface(shield: Shield, start: Tuple[float, float], displacement: Tuple[float, float],
+                                    impact: Impact):
+    # Terrain, the landing pad and the shields of things on the ground don't move when they're hit.
+    # The shield (and its owner) is put back to where it first touched the surface this frame - or, if it was already
+    # overlapping it, pushed straight back out - and its velocity is reflected off the surface.
+    # 5 possibilities for a terrain rect - left side, left corner, top side, right corner or right side -
+    # but they're all just a different surface normal.
+    owner = shield.owner
+    n_x, n_y = impact.normal
+    distance = impact.depth + CONTACT_GAP
+    x = start[0] + impact.time * displacement[0] + n_x * distance
+    y = start[1] + impact.time * displacement[1] + n_y * distance
+    change_pos_of_sprite_and_shield_by_vector(obj=owner, x=x - owner.center_x, y=y - owner.center_y)
+    # Only bounce if we're heading into the surface - if we're already moving away, leave well alone
+    if dot((owner.change_x, owner.change_y), impact.normal) < 0:
+        owner.change_x, owner.change_y = reflect((owner.change_x, owner.change_y), impact.normal)
+    sounds.play_sound(sounds.SOUNDS[random.choice(BOUNCE_SOUNDS)])
 
 
 def place_on_world(sprite: Sprite, world: World, scene: Scene):
     # Idea here is that I have a sprite I want to place on the terrain, but want to make sure
     # it doesn't collide with something already there.
-    # Note the sprite lists that make up the items on the terrain below.
-    # I make a list of all the surfaces of the terrain rectangles, then
-    # split up those surfaces that already have an object on them into the free bits,
-    # then filter out every bit that's not wide enough for the sprite, then
-    # pick one of the remaining surface bits at random and place the sprite
-    # somewhere on it at random
-
-    surfaces = [((r.left, r.right), r.top) for r in world.terrain_left_edge.sprite_list + world.terrain_centre.sprite_list]
-    for spr in itertools.chain(*[scene[group].sprite_list for group in constants.PLACE_ON_WORLD_SPRITELISTS]):
-        spr_width = spr.width if not getattr(spr, 'shield', None) else spr.shield.width
-
-        # Find the surface the sprite is on, then split that surface into the two remaining segments
-        for s in surfaces[:]:
-            (x_left, x_right), y = s
-            if x_left <= spr.center_x - spr_width / 2 and x_right >= spr.center_x + spr_width / 2:
-                surfaces.remove(s)
-                surfaces.extend([((x_left, spr.center_x - spr_width / 2), y), ((spr.center_x + spr_width / 2, x_right), y)])
-
-    # Surfaces is now a list of the free spaces on top of the terrain.
-    # Any of these that's wide enough will work for whatever we're placing on the world
+    # The world keeps track of the free bits of the terrain surfaces (ie. the tops of the terrain rects, split up
+    # around everything that's already been placed on them), so I just pick one of those at random that's wide
+    # enough for the sprite, and place the sprite somewhere on it at random
 
     # Bit confusing, but want to consider potential sprite shield when thinking of the sprite width
     # But since the object hasn't been placed yet, can't use shield.left, shield.right - have to consider the width
     sprite_width = sprite.width if not getattr(sprite, 'shield', None) else sprite.shield.width
-    surfaces = [s for s in surfaces if s[0][1] - s[0][0] > sprite_width]
-    if not surfaces:
+    surface = world.free_surfaces.random_span(min_width=sprite_width)
+    if surface is None:
         # There are no free spaces on the terrain for the sprite
         return False
-    # Pick one of the surfaces for the sprite
-    random.shuffle(surfaces)
-    ((x_left, x_right), y) = surfaces[0]
     # Now we have chosen the surface, we can choose exactly where on the surface.
-    sprite.center_x = random.randint(int(x_left + sprite_width / 2), int(x_right - sprite_width / 2))
-    sprite.bottom = y
+    sprite.center_x = world.random.randint(int(surface.left + sprite_width / 2), int(surface.right - sprite_width / 2))
+    sprite.bottom = surface.top
+    world.free_surfaces.occupy(sprite, sprite.center_x - sprite_width / 2, sprite.center_x + sprite_width / 2)
     return True
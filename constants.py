@@ -1,8 +1,6 @@
 from __future__ import annotations
 import arcade
-from pathlib import Path
 from dataclasses import dataclass
-import itertools
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from classes.lander import Lander
@@ -17,13 +15,6 @@ SPACE_END = int((5 / 7) * WORLD_HEIGHT)
 SPACE_START = int((2/3) * WORLD_HEIGHT)
 BACKGROUND_COLOR = arcade.color.BLACK
 
-TERRAIN_SPRITELISTS = [
-    # Purposefully ordered left to right, for explosion collision logic
-    "Terrain Left Edge",
-    "Terrain Centre",
-    "Terrain Right Edge"
-]
-
 GENERAL_OBJECT_SPRITELISTS = [
     "Lander",
     "Shields",
@@ -43,16 +34,98 @@ NON_TERRAIN_SPRITELISTS = [
 
 RESCALED_MINIMAP_SPRITES = [
     "Lander",
-    "Landing Pad",
+    "Landing Pad",  # Doesn't move, but it does change colour when the lander gets to it
     "Air Enemies",
     "Missiles",
     "Ground Enemies",
     "Hostages",
 ]
+# Times a second the moving things on the minimap (ie. RESCALED_MINIMAP_SPRITES) are redrawn
+MINIMAP_REFRESH_RATE = 15
+
+# Size of the cells in the spatial index used as the collision broadphase.
+# Roughly the size of a big shield - much smaller and sprites spread across lots of cells
+SPATIAL_INDEX_CELL_SIZE = 256
 
 ALLOWED_TERRAIN_SHIELD_COLLISIONS_SPRITELISTS = ['Landing Pad', 'Hostages', 'Ground Enemies']
-PLACE_ON_WORLD_SPRITELISTS = ["Landing Pad", "Ground Enemies", "Hostages"]
+
+# Collision categories.  Every sprite is given the category id of the sprite list it's added to (see GameScene),
+# along with the matching category bit and a mask of the categories it can collide with.
+# That means the hot code can do a bit test instead of comparing class names or searching through a sprite list.
+# Id 0 is left for sprites that haven't been added to the scene.
+CATEGORY_IDS = {
+    "Lander": 1,
+    "Shields": 2,
+    "Missiles": 3,
+    "Air Enemies": 4,
+    "Ground Enemies": 5,
+    "Explosions": 6,
+    "Hostages": 7,
+    "Landing Pad": 8,
+    "Engines": 9,
+    "Disabled Shields": 10,
+    "EMPs": 11,
+}
+CATEGORY_COUNT = max(CATEGORY_IDS.values()) + 1
+
+
+def category_bits(*sprite_list_names: str) -> int:
+    bits = 0
+    for name in sprite_list_names:
+        bits |= 1 << CATEGORY_IDS[name]
+    return bits
+
+
+LANDER = category_bits("Lander")
+SHIELD = category_bits("Shields")
+MISSILE = category_bits("Missiles")
+AIR_ENEMY = category_bits("Air Enemies")
+GROUND_ENEMY = category_bits("Ground Enemies")
+EXPLOSION = category_bits("Explosions")
+HOSTAGE = category_bits("Hostages")
+LANDING_PAD = category_bits("Landing Pad")
+ENGINE = category_bits("Engines")
+
+GENERAL_OBJECTS = category_bits(*GENERAL_OBJECT_SPRITELISTS)
+ALLOWED_TERRAIN_SHIELD_COLLISIONS = category_bits(*ALLOWED_TERRAIN_SHIELD_COLLISIONS_SPRITELISTS)
+
+# Which categories each category can collide with (in the general collision checks).
+# Ground enemies are in the general sprite lists, but they can only be hit - they don't go looking for collisions
+COLLIDES_WITH = {
+    CATEGORY_IDS["Lander"]: GENERAL_OBJECTS,
+    CATEGORY_IDS["Shields"]: GENERAL_OBJECTS,
+    CATEGORY_IDS["Missiles"]: GENERAL_OBJECTS,
+    CATEGORY_IDS["Air Enemies"]: GENERAL_OBJECTS,
+    CATEGORY_IDS["Explosions"]: GENERAL_OBJECTS,
+}
 EMP_COLLISION_SPRITELISTS = ["Lander", "Shields", "Engines", "Air Enemies", "Missiles"]
+EMP_TARGETS = category_bits(*EMP_COLLISION_SPRITELISTS)
+# Physics runs in fixed steps of this length, however long each rendered frame takes - so the game plays the same on
+# any machine.  Sprites' change_x / change_y are how far they move in one of these steps.
+PHYSICS_TIMESTEP = 1 / 60
+# If we fall this many steps behind (ie. the machine can't keep up), the rest of the time is dropped and the game
+# just runs slowly, rather than trying to catch up and falling further and further behind
+MAX_PHYSICS_STEPS_PER_FRAME = 5
+# Everything whose movement is worked out by the physics store (see physics.py)
+PHYSICS_SPRITELISTS = ["Explosions", "Lander", "Missiles", "Air Enemies"]
+# Moving sprites are drawn part way between where they were before the latest physics step and where they are now
+INTERPOLATED_SPRITELISTS = ["Lander", "Missiles", "Air Enemies", "Explosions", "Shields", "Disabled Shields", "Engines"]
+# Timers count down in steps of delta_time, so whether one lands exactly on zero depends on floating point error.
+# They go off when they're within this of zero, so they go off on the frame they're actually due (and the same frame
+# whether they're counted down a frame at a time or caught up in one go - see ActivityManager).
+TIMER_TOLERANCE = 1e-9
+# Ground enemies and hostages further than this from the edge of the screen are put to sleep until they have
+# something to do (see ActivityManager)
+ACTIVITY_DISTANCE = 800
+# The things explosions can push around (if they're not on the ground)
+EXPLOSION_FORCE_SPRITELISTS = ["Lander", "Missiles", "Air Enemies"]
+# The things that can set off sensors (see sensors.py)
+SENSED_SPRITELISTS = ["Lander"]
+# Sprites within this far of the edge of the screen are still drawn (see culling.py)
+CULLING_MARGIN = 64
+# Sprites that are always right on top of something else - they're drawn if it is.  By the name of their sprite list,
+# the attribute of the thing they're on top of that they are (eg. a missile's engine, a shield's disabled shield).
+ATTACHED_SPRITELISTS = {"Engines": "engine", "Disabled Shields": "disabled_shield"}
 
 # Have to admit this feels wrong, but I often want to easily get a hold of the lander or the game camera
 # And it feels weird to have to pass them around absolutely everywhere ...
@@ -61,7 +134,9 @@ EMP_COLLISION_SPRITELISTS = ["Lander", "Shields", "Engines", "Air Enemies", "Mis
 GAME_OBJECTS = {
     "lander": None,
     "camera": None,
-    "score": None
+    "score": None,
+    # Seed for all the levels in this run of the game (see rng.py)
+    "seed": None
 }
 
 
@@ -74,6 +149,7 @@ class Levels:
     missile_launchers: int = 0
     shielded_missile_launchers: int = 10
     super_missile_launchers: int = 2
+    smart_missile_launchers: int = 0  # Their missiles aim for where the lander's going to be.  Off until they look different
 
 
 # With hostages and missile lauchers, I'm saying 'up to' these values
@@ -102,6 +178,3 @@ def get_level_config(level: int) -> Levels:
         return LEVELS[level]
     # otherwise, return max(i) such that i in LEVELS
     return Levels()
-
-# Maybe pre-load all the sounds?
-SOUNDS = {path.as_posix(): arcade.load_sound(path) for path in itertools.chain(Path('sounds/').glob('*.mp3'), Path('sounds/').glob('*.wav'))}
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import math
+from typing import NamedTuple, Optional, Tuple
+
+
+# Continuous (swept) collision detection for circles - ie. shields.
+# Rather than checking whether a shield overlaps something at the end of a frame and then nudging it back out
+# a bit at a time until it doesn't, these work out *when* during the frame's movement the circle first touched the
+# thing it hit, and which way the surface was facing at that point.  So the contact can be resolved in one go,
+# and fast objects can't skip straight through something thin in a single frame.
+#
+# Everything here moves a circle from 'start' by 'displacement' over the frame, and time runs from 0 (start of the
+# frame) to 1 (end of the frame).
+#
+# Terrain rects (and the landing pad, which sits on the terrain) are treated as columns - they have a left side, a
+# right side and a top, and go all the way down.  Nothing should ever get pushed out through the bottom of one.
+
+
+class Impact(NamedTuple):
+    time: float  # 0 -> 1 through the frame's movement
+    normal: Tuple[float, float]  # Unit vector pointing away from the surface that was hit
+    depth: float = 0  # If we were already overlapping at the start, how far we need to move along the normal
+
+
+def circle_circle_impact(start: Tuple[float, float], displacement: Tuple[float, float], radius: float,
+                         centre: Tuple[float, float]) -> Optional[Impact]:
+    """Circle moving from start, against a fixed circle at centre.  Radius is the sum of the two radii."""
+    f_x, f_y = start[0] - centre[0], start[1] - centre[1]
+    d_x, d_y = displacement
+    c = f_x * f_x + f_y * f_y - radius * radius
+    if c < 0:
+        # Already overlapping before we've moved
+        distance = math.sqrt(f_x * f_x + f_y * f_y)
+        if distance == 0:
+            return Impact(time=0, normal=(0, 1), depth=radius)
+        return Impact(time=0, normal=(f_x / distance, f_y / distance), depth=radius - distance)
+    # |f + t.d|^2 = radius^2 is a quadratic in t - we want the smaller root
+    a = d_x * d_x + d_y * d_y
+    b = 2 * (f_x * d_x + f_y * d_y)
+    discriminant = b * b - 4 * a * c
+    if a == 0 or b >= 0 or discriminant < 0:
+        # Not moving, moving away, or missing altogether
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    if t > 1:
+        return None
+    return Impact(time=t, normal=((f_x + t * d_x) / radius, (f_y + t * d_y) / radius))
+
+
+def circle_column_overlap(centre: Tuple[float, float], radius: float,
+                          left: float, right: float, top: float) -> Optional[Impact]:
+    """If the circle overlaps the column, how far (and which way) to push it out"""
+    x, y = centre
+    if left < x < right and y < top:
+        # Centre is inside the column - push out through whichever of the sides or top is closest
+        depth, normal = top + radius - y, (0, 1)
+        if x - left + radius < depth:
+            depth, normal = x - left + radius, (-1, 0)
+        if right - x + radius < depth:
+            depth, normal = right - x + radius, (1, 0)
+        return Impact(time=0, normal=normal, depth=depth)
+    closest_x = min(max(x, left), right)
+    closest_y = min(y, top)
+    f_x, f_y = x - closest_x, y - closest_y
+    distance_squared = f_x * f_x + f_y * f_y
+    if distance_squared >= radius * radius:
+        return None
+    distance = math.sqrt(distance_squared)
+    if distance == 0:
+        # Exactly on the edge
+        return Impact(time=0, normal=(0, 1) if y >= top else ((-1, 0) if x <= left else (1, 0)), depth=radius)
+    return Impact(time=0, normal=(f_x / distance, f_y / distance), depth=radius - distance)
+
+
+def circle_column_impact(start: Tuple[float, float], displacement: Tuple[float, float], radius: float,
+                         left: float, right: float, top: float) -> Optional[Impact]:
+    """Circle moving from start, against a fixed column (ie. a terrain rect)"""
+    overlap = circle_column_overlap(start, radius, left, right, top)
+    if overlap is not None:
+        return overlap
+
+    # Otherwise, we're outside the column, expanded by the radius of the circle (with rounded corners at the top).
+    # The first of those surfaces the centre of the circle crosses is where we hit.
+    s_x, s_y = start
+    d_x, d_y = displacement
+    impact = None
+    # The top
+    if d_y < 0:
+        t = (top + radius - s_y) / d_y
+        if 0 <= t <= 1 and left <= s_x + t * d_x <= right:
+            impact = Impact(time=t, normal=(0, 1))
+    # The left and right sides
+    if d_x > 0:
+        t = (left - radius - s_x) / d_x
+        if 0 <= t <= 1 and s_y + t * d_y <= top and (impact is None or t < impact.time):
+            impact = Impact(time=t, normal=(-1, 0))
+    elif d_x < 0:
+        t = (right + radius - s_x) / d_x
+        if 0 <= t <= 1 and s_y + t * d_y <= top and (impact is None or t < impact.time):
+            impact = Impact(time=t, normal=(1, 0))
+    # The top corners
+    for corner_x in (left, right):
+        corner = circle_circle_impact(start, displacement, radius, (corner_x, top))
+        if corner is None or (impact is not None and corner.time >= impact.time):
+            continue
+        # Only counts if we've hit the rounded bit of the corner, rather than carrying on along a side or the top
+        hit_x = s_x + corner.time * d_x
+        hit_y = s_y + corner.time * d_y
+        if hit_y >= top and (hit_x <= left if corner_x == left else hit_x >= right):
+            impact = corner
+    return impact
+
+
+def reflect(velocity: Tuple[float, float], normal: Tuple[float, float]) -> Tuple[float, float]:
+    """Bounce off a surface - reverse the velocity along the normal and keep it along the surface"""
+    v_n = velocity[0] * normal[0] + velocity[1] * normal[1]
+    return velocity[0] - 2 * v_n * normal[0], velocity[1] - 2 * v_n * normal[1]
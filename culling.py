@@ -0,0 +1,104 @@
+from __future__ import annotations
+import arcade
+import itertools
+import math
+from spatial import SpatialGrid
+from typing import Dict, Iterable, TYPE_CHECKING
+if TYPE_CHECKING:
+    from classes.game_scene import GameScene
+
+
+# The whole scene used to be drawn every frame - every engine, shield, explosion and ground enemy in the 20000px wide
+# world, even though the camera only ever shows about a screen's width of it.  So levels with lots of launchers (and
+# their missiles) were slow to draw, however few of them were actually on screen.
+# Instead, each frame the spatial indexes are asked what's near the camera, and only that gets drawn.  Each sprite list
+# in the scene has a twin that holds just its sprites that are on screen (the same sprites - it's not a copy), and
+# that's what gets drawn.  The twins are only changed when something comes on or goes off screen.
+#
+# Most of what's in the scene is already in the world's spatial index (it's kept up to date for the collision checks,
+# at the end of every physics step).  Engines and disabled shields are always right on top of something that's in it,
+# so they go wherever that goes.  Only the rest - explosions, EMPs, hostages and the landing pad - go in a grid of our
+# own, that's updated as they're drawn.
+
+
+class DrawingGrid(SpatialGrid):
+    """A SpatialGrid that goes by the area each sprite's texture could cover, rather than by its hit box.
+    Working out where a hit box is, every frame, for everything that's moved, cost more than drawing it all!"""
+    def sprite_cell_range(self, sprite: arcade.Sprite):
+        # (However it's turned)
+        radius = math.hypot(sprite.width, sprite.height) / 2
+        return self.cell_range(sprite.center_x - radius, sprite.center_y - radius,
+                               sprite.center_x + radius, sprite.center_y + radius)
+
+
+class SceneCuller:
+    """Draws a scene with only the sprites the camera can see"""
+    def __init__(self, scene: GameScene, spatial_index: SpatialGrid, indexed_names: Iterable[str],
+                 attached: Dict[str, str], margin: float, cell_size: int = 256):
+        self.scene = scene
+        # The sprites in these lists are in spatial_index, which someone else keeps up to date
+        self.spatial_index = spatial_index
+        self.indexed_names = set(indexed_names)
+        # The sprites in these lists are drawn along with whatever they're attached to (see ATTACHED_SPRITELISTS)
+        self.attached = attached
+        self.grid = DrawingGrid(cell_size=cell_size)
+        # How far off screen a sprite can be (as far as the indexes know) and still get drawn.  Sprites are drawn part
+        # way between physics steps (see GameView.interpolate_sprite_positions()), and some of what's drawn (glows and
+        # so on) can stick out past a sprite's hit box.
+        self.margin = margin
+        self.visible_lists: dict[str, arcade.SpriteList] = {}
+        # How many sprites were drawn, and how many weren't, the last time the scene was drawn
+        self.drawn = 0
+        self.culled = 0
+
+    def __str__(self):
+        return f"DRAWN: {self.drawn} CULLED: {self.culled}"
+
+    def draw(self, left: float, bottom: float, right: float, top: float):
+        """Draw the scene, given the edges of what the camera can see"""
+        list_names = {sprite_list: name for name, sprite_list in self.scene.name_mapping.items()}
+        # Only sprites that have changed cells since the last draw actually get moved around in the grid
+        self.grid.update(itertools.chain(*[sprite_list for sprite_list, name in list_names.items()
+                                           if name not in self.indexed_names and name not in self.attached]))
+
+        box = (left - self.margin, bottom - self.margin, right + self.margin, top + self.margin)
+        found = self.spatial_index.query(*box)
+        found += [attachment for sprite in found for attribute in self.attached.values()
+                  if (attachment := getattr(sprite, attribute, None)) is not None]
+        found += self.grid.query(*box)
+        on_screen: dict[str, dict[arcade.Sprite, None]] = {}
+        for sprite in found:
+            # (Anything that's died since the world's index was updated won't be in any sprite lists)
+            for sprite_list in sprite.sprite_lists:
+                name = list_names.get(sprite_list)
+                if name is not None:
+                    on_screen.setdefault(name, {})[sprite] = None
+
+        self.drawn = 0
+        for name, sprite_list in self.scene.name_mapping.items():
+            if name in self.scene.drawn_before:
+                self.scene.drawn_before[name]()
+            visible_list = self.visible_list(name, sprite_list, on_screen.get(name, {}))
+            visible_list.draw()
+            self.drawn += len(visible_list)
+        self.culled = sum(len(sprite_list) for sprite_list in list_names) - self.drawn
+
+    def visible_list(self, name: str, sprite_list: arcade.SpriteList,
+                     visible: dict[arcade.Sprite, None]) -> arcade.SpriteList:
+        """The twin of the named sprite list, holding just the given sprites"""
+        visible_list = self.visible_lists.get(name)
+        if visible_list is None:
+            visible_list = self.visible_lists[name] = arcade.SpriteList()
+        if len(visible_list) == len(visible) and all(sprite in visible for sprite in visible_list):
+            return visible_list
+        # Sprites that have left the scene altogether will have taken themselves out already
+        for sprite in [s for s in visible_list if s not in visible]:
+            visible_list.remove(sprite)
+        already = set(visible_list)
+        for sprite in visible:
+            if sprite not in already:
+                visible_list.append(sprite)
+        # Keep them drawn in the same order as the scene would have drawn them.  (This only happens when something's
+        # come on screen, and there's never much on screen.)
+        visible_list.sort(key=sprite_list.sprite_list.index)
+        return visible_list
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import arcade
+import numpy as np
+import collisions
+import constants
+from typing import Iterable, Tuple, TYPE_CHECKING
+if TYPE_CHECKING:
+    from physics import PhysicsStore
+
+
+# Every mobile object used to loop over every explosion in its own on_update(), working out distances and unit
+# vectors (and then an angle, and back again with cos and sin) one explosion at a time.  So a big chain reaction
+# got expensive fast.
+# Instead, the explosions' centres, radii and forces are gathered into arrays once a frame, and the force on every
+# object that could be pushed around is worked out in one go - as arrays, lined up with the physics store's rows.
+
+class ExplosionField:
+    """The summed explosion forces on everything that can be pushed around, worked out once per frame"""
+    def __init__(self, scene: arcade.Scene, sprite_list_names: Iterable[str]):
+        self.scene = scene
+        # Category bits of the things that can be pushed around
+        self.pushed = constants.category_bits(*sprite_list_names)
+        self.camera = None
+
+    def begin_frame(self, camera: arcade.Camera):
+        self.camera = camera
+
+    def forces(self, store: PhysicsStore) -> Tuple[np.ndarray, np.ndarray]:
+        """The x and y forces on everything in the physics store (by row)"""
+        force_x = np.zeros(len(store))
+        force_y = np.zeros(len(store))
+        explosions = self.scene["Explosions"]
+        if not explosions:
+            return force_x, force_y
+        # Explosion forces aren't applied to ground objects, and I don't go to the trouble of applying them to sprites
+        # that are off screen.  Anything that's nowhere near the screen is ruled out all at once, and only what's left
+        # gets checked properly.
+        x, y, extent = store.column("x"), store.column("y"), store.column("extent")
+        camera_left, camera_bottom = self.camera.position
+        camera_right = camera_left + self.camera.viewport_width
+        camera_top = camera_bottom + self.camera.viewport_height
+        near = (((store.column("category") & self.pushed) != 0) & ~store.column("on_ground")
+                & (x + extent >= camera_left) & (x - extent <= camera_right)
+                & (y + extent >= camera_bottom) & (y - extent <= camera_top))
+        rows = [row for row in np.flatnonzero(near).tolist()
+                if collisions.is_sprite_in_camera_view(sprite=store.sprites[row], camera=self.camera)]
+        if not rows:
+            return force_x, force_y
+        centres = np.array([(e.center_x, e.center_y) for e in explosions], dtype=float)
+        radii = np.array([e.radius for e in explosions], dtype=float)
+        forces = np.array([e.force for e in explosions], dtype=float)
+        positions = np.column_stack((x[rows], y[rows]))
+
+        # Vectors from every explosion to every object - shape (objects, explosions, 2)
+        offsets = positions[:, np.newaxis, :] - centres[np.newaxis, :, :]
+        distances = np.hypot(offsets[..., 0], offsets[..., 1])
+        # Explosions change size, meaning their hit box becomes inaccurate, so I treat them as circles and use the
+        # radius.  The force is along the vector from the explosion to the object - unless the object is dead centre,
+        # in which case there's no direction to push it in.
+        affected = (distances < radii) & (distances > 0)
+        # force * (offset / distance) is the force along that unit vector - no need for any angles
+        magnitudes = np.where(affected, forces / np.where(affected, distances, 1), 0)
+        totals = (offsets * magnitudes[..., np.newaxis]).sum(axis=1)
+        force_x[rows] = totals[:, 0]
+        force_y[rows] = totals[:, 1]
+        return force_x, force_y
@@ -0,0 +1,83 @@
+from __future__ import annotations
+import arcade
+import numpy as np
+
+
+# Every missile used to work out for itself, every frame, which of the lander and its two wrap-around copies was
+# closest (building the three points and sorting them), and then face it.  Instead, the bearings for all the missiles
+# are worked out together, once a frame, and each missile just looks up its own.
+#
+# Missiles either head straight for where the lander is now (pure pursuit), or - if they're smart - for where it'll
+# be by the time they get there, assuming it carries on at the same velocity and they carry on at the same speed
+# (lead pursuit).  That's the SmartMissileLauncher idea from ideas.txt.
+
+PURE_PURSUIT = 'pure'
+LEAD_PURSUIT = 'lead'
+
+# Missiles speed up as they go, so their current speed underestimates how quickly they'll actually get there - and
+# the further ahead they aim, the worse that gets.  So they never aim more than this far (in seconds) ahead.
+MAX_LEAD_TIME = 2
+
+
+class MissileGuidance:
+    """Which way every missile should be facing, worked out for all of them at once, once a frame"""
+    def __init__(self, scene: arcade.Scene, wrap_width: float, max_lead_time: float = MAX_LEAD_TIME):
+        self.scene = scene
+        # How far apart the lander and its wrap-around copies are
+        self.wrap_width = wrap_width
+        self.max_lead_time = max_lead_time
+        self._angles: dict[arcade.Sprite, float] | None = None
+
+    def begin_frame(self):
+        # The angles are worked out the first time a missile asks for one this frame - by then, everything has moved
+        self._angles = None
+
+    def angle_for(self, missile: arcade.Sprite) -> float | None:
+        """The angle the missile should be at to head for the lander (None if there's no lander to head for)"""
+        if self._angles is None:
+            self._angles = self.get_angles()
+        return self._angles.get(missile)
+
+    def get_angles(self) -> dict[arcade.Sprite, float]:
+        missiles = self.scene["Missiles"]
+        landers = self.scene["Lander"]
+        if not missiles or not landers:
+            return {}
+        lander = landers[0]
+        positions = np.array([(m.center_x, m.center_y) for m in missiles], dtype=float)
+        offsets = np.array((lander.center_x, lander.center_y), dtype=float) - positions
+
+        # The shortest way to the lander might be across the world wrap - the lander and its copies are all at the
+        # same height, so whichever is closest horizontally is closest.  (Ties go to the lander itself.)
+        candidates = offsets[:, 0, np.newaxis] + np.array((0, -self.wrap_width, self.wrap_width))
+        offsets[:, 0] = candidates[np.arange(len(missiles)), np.abs(candidates).argmin(axis=1)]
+
+        lead = np.array([getattr(m, 'guidance', PURE_PURSUIT) == LEAD_PURSUIT for m in missiles])
+        if lead.any():
+            target_velocity = np.array((lander.velocity_x, lander.velocity_y), dtype=float)
+            missile_velocities = np.array([(m.velocity_x, m.velocity_y) for m in missiles], dtype=float)
+            times = self.intercept_times(offsets[lead], missile_velocities[lead], target_velocity)
+            offsets[lead] += times[:, np.newaxis] * target_velocity
+
+        # Same as Sprite.face_point() - sprite images face upwards, and sprite angles go the other way round
+        angles = -np.degrees(np.arctan2(offsets[:, 0], offsets[:, 1]))
+        return dict(zip(missiles, angles.tolist()))
+
+    def intercept_times(self, offsets: np.ndarray, missile_velocities: np.ndarray,
+                        target_velocity: np.ndarray) -> np.ndarray:
+        """How long until each missile could meet the target, flying straight at its current speed (0 if it can't)"""
+        # Where the target will be: offset + v.t.  How far the missile can get: speed.t.  So when do they meet?
+        # |offset + v.t|^2 = speed^2.t^2   ->   (v.v - speed^2).t^2 + 2(offset.v).t + offset.offset = 0
+        a = target_velocity @ target_velocity - (missile_velocities ** 2).sum(axis=1)
+        b = 2 * (offsets @ target_velocity)
+        c = (offsets ** 2).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            root = np.sqrt(b * b - 4 * a * c)
+            roots = np.stack(((-b - root) / (2 * a), (-b + root) / (2 * a)))
+            # Want the soonest time in the future
+            t = np.where(roots > 0, roots, np.inf).min(axis=0)
+            # If the missile's exactly as fast as the target, it's not a quadratic any more
+            t = np.where(np.abs(a) < 1e-9, -c / b, t)
+        # No (positive) solution means the missile can't catch it - so it just heads straight for it
+        t = np.where(np.isfinite(t) & (t > 0), t, 0)
+        return np.minimum(t, self.max_lead_time)
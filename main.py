@@ -1,4 +1,8 @@
+import argparse
+from pathlib import Path
 import arcade
+import replay
+import textures
 from views.menu import MenuView
 #  Views for instructions, game over, etc. https://api.arcade.academy/en/stable/tutorials/views/index.html
 #  Camera for GUI overlay: https://api.arcade.academy/en/stable/examples/sprite_move_scrolling.html#sprite-move-scrolling
@@ -12,11 +16,31 @@ class ResizableWindow(arcade.Window):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lander Arcade")
+    parser.add_argument("--record", type=Path, default=None, help="Directory to record every level played into")
+    parser.add_argument("--replay", type=Path, default=None, help="Recording to play back")
+    parser.add_argument("--speed", type=float, default=1, help="How fast to play back the recording")
+    parser.add_argument("--atlas-usage", action="store_true", help="Print how full the texture atlas is")
+    args = parser.parse_args()
+
     width, height = arcade.window_commands.get_display_size()
     window = ResizableWindow(title="Lander Arcade", width=width, height=height, resizable=True)
     window.maximize()
-    menu_view = MenuView()
-    window.show_view(menu_view)
+    # Every image goes into the texture atlas now, rather than the first time it's drawn
+    textures.pack_into_atlas(window.ctx.default_atlas)
+    if args.atlas_usage:
+        print(textures.atlas_usage(window.ctx.default_atlas))
+    if args.replay is not None:
+        from views.game import GameView
+        game_view = GameView()
+        game_view.start_replay(replay.load(args.replay), speed=args.speed)
+        window.show_view(game_view)
+    else:
+        if args.record is not None:
+            from views.game import GameView
+            GameView.recording_directory = args.record
+        menu_view = MenuView()
+        window.show_view(menu_view)
     # To allow me to display FPS
     arcade.enable_timings()
     arcade.run()
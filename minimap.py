@@ -0,0 +1,67 @@
+from __future__ import annotations
+import arcade
+import itertools
+import numpy as np
+from constants import WORLD_WIDTH
+from typing import Iterable
+
+
+# The things shown on the minimap used to be drawn by blowing each real sprite up to 6 times its size, shifting it to
+# the right side of the world wrap, drawing it on its own and then putting it back - so twice a refresh, every sprite
+# had its hit box and its place in its sprite list's GPU buffers invalidated, and every one was a separate draw call.
+# (Worse, anything not the size of its texture - ie. the landing pad - came back from that the size of its texture.)
+# Instead, each of them has a stand-in (a "blip") in a sprite list of our own, already scaled up.  The blips are moved
+# to where their sprites are (all the wrap adjustments worked out together), and drawn in one go.
+
+
+class MinimapBlips:
+    """Stand-ins for the sprites in the given lists, for drawing on the minimap"""
+    def __init__(self, scene: arcade.Scene, sprite_list_names: Iterable[str], scale_multiplier: float,
+                 camera_width: int):
+        self.scene = scene
+        self.sprite_list_names = list(sprite_list_names)
+        self.scale_multiplier = scale_multiplier
+        # In the game, if the lander is at either end of the map, I keep other sprites in that same area, so that
+        # they stay on the screen.  ie. sprites can be < camera_width or > WORLD_WIDTH - camera_width.
+        # But for the mini-map, I always want them to wrap at the "correct" time
+        self.wrap_left = camera_width
+        self.wrap_right = WORLD_WIDTH - camera_width
+        self.wrap_width = WORLD_WIDTH - 2 * camera_width
+        self.sprite_list = arcade.SpriteList()
+        self.blips: dict[arcade.Sprite, arcade.Sprite] = {}
+
+    def __len__(self):
+        return len(self.blips)
+
+    def update(self):
+        sprites = list(itertools.chain(*[self.scene[name] for name in self.sprite_list_names]))
+
+        # Blips for sprites that have gone, go too
+        if len(self.blips) > len(sprites) or any(sprite not in self.blips for sprite in sprites):
+            current = set(sprites)
+            for sprite in [s for s in self.blips if s not in current]:
+                self.blips.pop(sprite).remove_from_sprite_lists()
+        if not sprites:
+            return
+
+        x = np.array([sprite.center_x for sprite in sprites])
+        x = np.where(x > self.wrap_right, x - self.wrap_width, np.where(x < self.wrap_left, x + self.wrap_width, x))
+        for sprite, blip_x in zip(sprites, x.tolist()):
+            blip = self.blips.get(sprite)
+            if blip is None:
+                blip = self.blips[sprite] = arcade.Sprite(texture=sprite.texture)
+                self.sprite_list.append(blip)
+            elif blip.texture is not sprite.texture:
+                blip.texture = sprite.texture
+            # (Going by size rather than scale, as not everything's the size of its texture - eg. the landing pad)
+            blip.width = sprite.width * self.scale_multiplier
+            blip.height = sprite.height * self.scale_multiplier
+            blip.angle = sprite.angle
+            blip.color = sprite.color
+            if blip.alpha != sprite.alpha:
+                blip.alpha = sprite.alpha
+            blip.position = (blip_x, sprite.center_y)
+
+    def draw(self):
+        self.update()
+        self.sprite_list.draw()
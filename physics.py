@@ -0,0 +1,201 @@
+from __future__ import annotations
+import arcade
+import math
+import numpy as np
+import constants
+from typing import Any, Iterable, TYPE_CHECKING
+if TYPE_CHECKING:
+    from classes.game_scene import GameScene
+    from classes.world import World
+
+
+# Every GameObject used to work out its own forces and move itself in its own on_update(), reading and writing sprite
+# properties one at a time and calling sin and cos for its engine.  With lots of missiles and explosions about, that
+# per-object overhead was most of the frame.
+# Instead, everything that moves has its physical state kept in arrays (a column per attribute, a row per object) for
+# as long as it's in the scene.  All the forces and movements are worked out in one go, and only the new positions are
+# written back to the sprites (arcade needs them, to draw them).
+#
+# The arrays are the real thing: while a sprite's in the store, its change_x, velocity_x, mass and so on (see Stored)
+# are read from and written to its row, and anything else that moves it, turns it, starts its engine or lands it
+# keeps its row up to date as it goes (see store()).  A sprite gets a row when it's added to one of the store's sprite
+# lists, and gives it up (taking its state back as plain attributes) when it's taken out of the scene.
+
+# The columns, and what's kept in them
+COLUMNS = {
+    # Position and angle - kept up to date by GameObject, whenever they're set
+    "x": float,
+    "y": float,
+    "angle": float,
+    # Attributes that live in the store (see Stored)
+    "change_x": float,
+    "change_y": float,
+    "velocity_x": float,
+    "velocity_y": float,
+    "mass": float,
+    "on_ground": bool,
+    "in_space": bool,
+    "above_space": bool,
+    # Kept up to date by the engine (see Engine)
+    "engine_on": bool,
+    "engine_force": float,
+    # Kept up to date by the lander
+    "landed": bool,
+    # These don't change once something's been made
+    "pushed_back": bool,
+    "category": np.int64,
+    # Half the diagonal of the sprite - nothing it's drawn as can stick out further than this from its centre
+    "extent": float,
+}
+STORED_ATTRIBUTES = ["change_x", "change_y", "velocity_x", "velocity_y", "mass", "on_ground", "in_space",
+                     "above_space"]
+
+
+class Stored:
+    """An attribute of a GameObject that lives in its row of the PhysicsStore while it has one (and is a plain
+    attribute otherwise)"""
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+        self.attribute = '_' + name
+
+    def __get__(self, obj: Any, objtype: type = None):
+        if obj is None:
+            return self
+        if obj.physics_store is not None:
+            return obj.physics_store.columns[self.name].item(obj.physics_row)
+        try:
+            return obj.__dict__[self.attribute]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, obj: Any, value):
+        if obj.physics_store is not None:
+            obj.physics_store.columns[self.name][obj.physics_row] = value
+        else:
+            obj.__dict__[self.attribute] = value
+
+
+def store(sprite: arcade.Sprite, column: str, value):
+    """Keep the sprite's row up to date (if it's got one) with something that's just changed about it"""
+    physics_store = getattr(sprite, 'physics_store', None)
+    if physics_store is not None:
+        physics_store.columns[column][sprite.physics_row] = value
+
+
+class PhysicsStore:
+    """Integrates the movement of everything in the given sprite lists together, once per physics step"""
+    def __init__(self, scene: GameScene, world: World, sprite_list_names: Iterable[str], capacity: int = 64):
+        self.world = world
+        # The sprite in each row
+        self.sprites: list[arcade.Sprite] = []
+        self.columns: dict[str, np.ndarray] = {name: np.zeros(capacity, dtype=dtype)
+                                               for name, dtype in COLUMNS.items()}
+        for name in sprite_list_names:
+            scene.watch(name, self.add)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def column(self, name: str) -> np.ndarray:
+        """The rows of the named column that are in use"""
+        return self.columns[name][:len(self.sprites)]
+
+    def add(self, sprite: arcade.Sprite):
+        if sprite.physics_store is not None:
+            return
+        row = len(self.sprites)
+        if row == len(self.columns["x"]):
+            # Full up - twice the room
+            self.columns = {name: np.concatenate((column, np.zeros_like(column)))
+                            for name, column in self.columns.items()}
+        engine = sprite.engine
+        values = dict(x=sprite.center_x, y=sprite.center_y, angle=sprite.angle,
+                      engine_on=engine is not None and engine.activated,
+                      engine_force=engine.force if engine is not None else 0,
+                      landed=getattr(sprite, 'landed', False),
+                      pushed_back=sprite.pushed_back_from_deep_space,
+                      category=sprite.category,
+                      extent=math.hypot(sprite.width, sprite.height) / 2)
+        values.update((name, getattr(sprite, name)) for name in STORED_ATTRIBUTES)
+        for name, value in values.items():
+            self.columns[name][row] = value
+        self.sprites.append(sprite)
+        sprite.physics_store = self
+        sprite.physics_row = row
+
+    def remove(self, sprite: arcade.Sprite):
+        if sprite.physics_store is not self:
+            return
+        row = sprite.physics_row
+        # It takes its state with it
+        values = {name: self.columns[name].item(row) for name in STORED_ATTRIBUTES}
+        sprite.physics_store = None
+        sprite.physics_row = None
+        for name, value in values.items():
+            setattr(sprite, name, value)
+        # The last row moves into the gap
+        last = self.sprites.pop()
+        if last is not sprite:
+            self.sprites[row] = last
+            last.physics_row = row
+            for column in self.columns.values():
+                column[row] = column[len(self.sprites)]
+
+    def step(self, delta_time: float):
+        if not self.sprites:
+            return
+        x, y, change_x, change_y = self.column("x"), self.column("y"), self.column("change_x"), self.column("change_y")
+        mass = self.column("mass")
+        on_ground, landed, engine_on = self.column("on_ground"), self.column("landed"), self.column("engine_on")
+        gravity = self.world.gravity
+        explosion_force_x, explosion_force_y = self.world.explosion_field.forces(self)
+        # Are we in space or not?
+        in_space = self.column("in_space")
+        above_space = self.column("above_space")
+        in_space[:] = y >= constants.SPACE_START
+        above_space[:] = y >= constants.SPACE_END
+        # Calculate current velocity from the change_x / change_y of the last step
+        velocity_x = self.column("velocity_x")
+        velocity_y = self.column("velocity_y")
+        velocity_x[:] = change_x / delta_time
+        velocity_y[:] = change_y / delta_time
+
+        # The forces.  The explosion forces go in twice - once on their own, and once more along with everything else
+        # (that's how the forces have always been added up, and the game's tuned around it)
+        force_x = explosion_force_x.copy()
+        force_y = explosion_force_y.copy()
+        # Force due to engine
+        radians = self.column("angle") / 180.0 * math.pi
+        engine_x = self.column("engine_force") * np.sin(radians)
+        engine_y = self.column("engine_force") * np.cos(radians)
+        force_x = np.where(engine_on, force_x - engine_x, force_x)
+        # Force due to friction with the ground
+        # Only really applies to explosions, since everything explodes on contact with the ground
+        friction = mass * gravity * self.world.friction_coefficient
+        force_x = np.where(on_ground & (velocity_x > 0), force_x - friction, force_x)
+        force_x = np.where(on_ground & (velocity_x < 0), force_x + friction, force_x)
+        # When not in the allowed(!) region of space, there's the world's gravity ...
+        # (Unless we're the lander and we've actually landed)
+        force_y = np.where(~in_space & ~landed, force_y - mass * gravity, force_y)
+        force_y = np.where(engine_on, force_y + engine_y, force_y)
+        # We want to stop the lander flying off into deep space, but I don't want to fling it wildly
+        # back at the ground.  So we only apply the force while it's gaining altitude
+        force_y = np.where(self.column("pushed_back") & above_space & (change_y > 0),
+                           force_y - mass * 5 * (y - constants.SPACE_END), force_y)
+        force_x = explosion_force_x + force_x
+        force_y = explosion_force_y + force_y
+
+        # Calculate changes in coordinates due to force
+        # s = ut + (0.5)at^2
+        change_x += 0.5 * (force_x / mass) * (delta_time ** 2)
+        change_y += 0.5 * (force_y / mass) * (delta_time ** 2)
+        x += change_x
+        y += change_y
+        self.sync_positions()
+
+    def sync_positions(self):
+        # The only thing the sprites need to be told - where they've got to (as plain Python numbers).
+        # (Going straight to arcade's setter, as the store already knows.)
+        set_position = arcade.Sprite.position.fset
+        for sprite, position in zip(self.sprites, zip(self.column("x").tolist(), self.column("y").tolist())):
+            set_position(sprite, position)
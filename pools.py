@@ -0,0 +1,85 @@
+from __future__ import annotations
+import arcade
+from functools import partial
+from typing import Callable, Dict, Generic, List, TypeVar, TYPE_CHECKING
+
+from classes.explosion import Explosion
+from classes.missile import Missile
+if TYPE_CHECKING:
+    from classes.world import World
+
+
+# Every missile fired used to be a brand new Missile (with a brand new Engine), and everything that died made a brand
+# new Explosion - each one a new sprite, with its textures looked up and its hit box worked out, only to be thrown away
+# a few seconds later.  With several launchers firing at once, that was enough to make the game stutter.
+# Instead, missiles and explosions that are finished with go back into a pool, and get reset and used again.  The
+# pools are filled up when the level is set up, so (usually) firing a missile or blowing something up makes nothing.
+#
+# Anything that comes from a pool has a reset() method that takes it back to how it would have been if it had just
+# been made (with the given settings), and puts it back in the scene.
+
+T = TypeVar('T')
+
+
+class ObjectPool(Generic[T]):
+    """Objects that have been finished with, ready to be used again"""
+    def __init__(self, create: Callable[[], T]):
+        self.create = create
+        self.free: List[T] = []
+        # Things finished with this frame.  Something might still be looking at them (eg. they've died part way
+        # through the collision checks) - so they don't get handed out again until the next frame.
+        # (Using a dict as an ordered set, so nothing gets put back twice.)
+        self.released: Dict[T, None] = {}
+        self.created = 0
+
+    def __len__(self):
+        return len(self.free) + len(self.released)
+
+    def new(self) -> T:
+        obj = self.create()
+        obj.pool = self
+        self.created += 1
+        return obj
+
+    def prewarm(self, count: int):
+        """Make another 'count' objects up front"""
+        self.free.extend(self.new() for _ in range(count))
+
+    def acquire(self, **settings) -> T:
+        obj = self.free.pop() if self.free else self.new()
+        obj.reset(**settings)
+        return obj
+
+    def release(self, obj: T):
+        self.released[obj] = None
+
+    def begin_frame(self):
+        self.free.extend(self.released)
+        self.released.clear()
+
+
+class Pools:
+    """The pools of missiles (one per kind of missile) and explosions for a level"""
+    def __init__(self, scene: arcade.Scene, world: World, camera: arcade.Camera):
+        self.scene = scene
+        self.world = world
+        self.camera = camera
+        self.explosions: ObjectPool[Explosion] = ObjectPool(partial(Explosion, scene, world, camera))
+        # Missiles of different kinds look different (and so have different hit boxes) - so they're kept apart
+        self._missiles: Dict[str, ObjectPool[Missile]] = {}
+
+    def missiles(self, filename: str) -> ObjectPool[Missile]:
+        if filename not in self._missiles:
+            self._missiles[filename] = ObjectPool(partial(Missile, self.scene, self.world, self.camera,
+                                                          filename=filename))
+        return self._missiles[filename]
+
+    def prewarm_missiles(self, filename: str, count: int):
+        # Every missile ends up as an explosion
+        self.missiles(filename).prewarm(count)
+        self.explosions.prewarm(count)
+
+    def begin_frame(self):
+        self.explosions.begin_frame()
+        for pool in self._missiles.values():
+            pool.begin_frame()
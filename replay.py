@@ -0,0 +1,140 @@
+from __future__ import annotations
+import struct
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Tuple, TYPE_CHECKING
+
+import constants
+if TYPE_CHECKING:
+    from simulation import Simulation
+
+
+# Recording the player's input, so that a level can be played back exactly as it happened - either in the game
+# window, or headless (see sim.py).  Every step of the physics also records a hash of the state of everything that
+# moves, so a replay can tell if (and exactly when) it stops doing what the original did.
+# With the same seed and level (see rng.py) and the same input on the same physics step, the level plays out the same.
+#
+# A recording is a small binary file.  A header (magic, version, seed, level and the camera viewport size - the
+# world's size depends on it), and then a record per input event or step: the physics step it happened on, what kind
+# of record it is, and then whatever goes with that kind of record.
+
+MAGIC = b'LREC'
+VERSION = 1
+HEADER = struct.Struct('<4sHqiii')  # magic, version, seed, level, viewport width, viewport height
+RECORD = struct.Struct('<IB')  # step, kind
+
+MOUSE_PRESS = 1
+MOUSE_RELEASE = 2
+MOUSE_MOTION = 3
+KEY_PRESS = 4
+KEY_RELEASE = 5
+STATE = 6
+
+PAYLOADS = {
+    MOUSE_PRESS: struct.Struct('<ddii'),  # x, y, button, modifiers
+    MOUSE_RELEASE: struct.Struct('<ddii'),
+    MOUSE_MOTION: struct.Struct('<dddd'),  # x, y, dx, dy
+    KEY_PRESS: struct.Struct('<qi'),  # symbol, modifiers
+    KEY_RELEASE: struct.Struct('<qi'),
+    STATE: struct.Struct('<I'),  # hash of the state after the step
+}
+
+# Which Simulation method handles each kind of input
+HANDLERS = {
+    MOUSE_PRESS: 'on_mouse_press',
+    MOUSE_RELEASE: 'on_mouse_release',
+    MOUSE_MOTION: 'on_mouse_motion',
+    KEY_PRESS: 'on_key_press',
+    KEY_RELEASE: 'on_key_release',
+}
+
+
+def state_hash(simulation: Simulation) -> int:
+    """Cheap hash of where everything that moves is, and how it's moving"""
+    values = array('d')
+    for name in constants.PHYSICS_SPRITELISTS:
+        for sprite in simulation.scene[name]:
+            values.extend((sprite.center_x, sprite.center_y, sprite.change_x, sprite.change_y, sprite.angle))
+    return zlib.crc32(values.tobytes())
+
+
+class InputRecorder:
+    """Writes a recording as the level is played"""
+    def __init__(self, path: Path, seed: int, level: int, viewport_width: int, viewport_height: int):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file: BinaryIO = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, level, viewport_width, viewport_height))
+
+    def record(self, step: int, kind: int, *values):
+        self.file.write(RECORD.pack(step, kind) + PAYLOADS[kind].pack(*values))
+
+    def close(self):
+        self.file.close()
+
+
+class Recording(NamedTuple):
+    seed: int
+    level: int
+    viewport_width: int
+    viewport_height: int
+    inputs: Dict[int, List[Tuple[int, tuple]]]  # step -> [(kind, values), ...] in the order they happened
+    states: Dict[int, int]  # step -> state hash
+    steps: int  # How many steps were recorded
+
+
+def load(path: str | Path) -> Recording:
+    data = Path(path).read_bytes()
+    magic, version, seed, level, viewport_width, viewport_height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} isn't a recording this version of the game can play")
+    inputs: Dict[int, List[Tuple[int, tuple]]] = {}
+    states: Dict[int, int] = {}
+    offset = HEADER.size
+    steps = 0
+    while offset < len(data):
+        step, kind = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        values = PAYLOADS[kind].unpack_from(data, offset)
+        offset += PAYLOADS[kind].size
+        if kind == STATE:
+            states[step] = values[0]
+        else:
+            inputs.setdefault(step, []).append((kind, values))
+        steps = max(steps, step + 1)
+    return Recording(seed, level, viewport_width, viewport_height, inputs, states, steps)
+
+
+class ReplayDriver:
+    """Feeds a recording's input back into a simulation, a step at a time, and checks it keeps doing the same thing"""
+    def __init__(self, recording: Recording):
+        self.recording = recording
+        # The step we're on
+        self.step = 0
+        self.diverged_at: int | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.step >= self.recording.steps
+
+    def feed(self, simulation: Simulation):
+        # Called just before each step, with whatever input arrived before that step
+        self.step = simulation.step_count
+        for kind, values in self.recording.inputs.get(self.step, []):
+            getattr(simulation, HANDLERS[kind])(*values)
+
+    def check(self, simulation: Simulation, state: int):
+        # Called just after each step
+        expected = self.recording.states.get(self.step)
+        if self.diverged_at is None and expected is not None and state != expected:
+            self.diverged_at = self.step
+            print(f"Replay diverged from the recording at step {self.step}")
+        self.step += 1
+        if self.finished and self.diverged_at is None:
+            print(f"Replay finished - all {self.recording.steps} steps matched the recording")
+
+
+def recording_path(directory: Path, seed: int, level: int) -> Path:
+    return directory / f"level_{level}_seed_{seed}_{time.strftime('%Y%m%d_%H%M%S')}.lrec"
@@ -0,0 +1,27 @@
+from __future__ import annotations
+import random
+
+
+# Every level gets its own random number streams, seeded from the level number and a seed for the whole session
+# (ie. one run of the game).  So the same session seed and level always give exactly the same world, and - given the
+# same input - the level plays out exactly the same way.  Handy for tracking down bugs, and for comparing timings.
+# The world's generation (terrain, background, colours, gravity, ...) and the gameplay (where things are placed on
+# the world, when launchers fire, how explosions look, ...) get separate streams, so eg. a change to how many
+# missile launchers there are can't change what the world looks like.
+#
+# Sounds still use the random module itself - which bounce or explosion sound gets played makes no difference to
+# anything else.
+
+
+def new_session_seed() -> int:
+    return random.SystemRandom().randrange(2 ** 32)
+
+
+class LevelRandom:
+    """The random number streams for one level"""
+    def __init__(self, session_seed: int, level: int):
+        self.session_seed = session_seed
+        self.level = level
+        # Seeding with a string is stable across runs (and machines), unlike eg. seeding with a tuple's hash
+        self.world = random.Random(f"{session_seed}/{level}/world")
+        self.gameplay = random.Random(f"{session_seed}/{level}/gameplay")
@@ -0,0 +1,119 @@
+from __future__ import annotations
+import arcade
+import itertools
+import math
+from spatial import SpatialGrid
+from typing import Callable, Iterable, Optional
+
+
+# Some things only care about when something else comes within a certain distance of them - a hostage starts being
+# rescued when the lander comes close enough, and the landing pad lights up.  Each of those used to work out the
+# distance for itself every frame (the lander went through every hostage in the level, every frame).
+# Instead, each one registers a Sensor - a circle around itself - with the world's SensorField, and gets told when
+# something comes into it (on_enter) and when it leaves again (on_exit).  Once a frame, after everything's moved, the
+# field checks each sprite it's watching against just the sensors in the cell it's in.
+#
+# Something can stop being inside a sensor by moving away, or by either of them leaving the scene - either way, it
+# gets an on_exit.
+
+SensorCallback = Callable[[arcade.Sprite], None]
+
+
+class Sensor:
+    """A circle around its owner, that notices sprites of the given categories coming and going"""
+    def __init__(self, owner: arcade.Sprite, radius: float, detects: int,
+                 on_enter: Optional[SensorCallback] = None, on_exit: Optional[SensorCallback] = None):
+        self.owner = owner
+        self.radius = radius
+        # Category bits (see constants.category_bits()) of the sprites we care about
+        self.detects = detects
+        self.on_enter = on_enter
+        self.on_exit = on_exit
+        # What's inside us at the moment (a dict as an ordered set)
+        self.inside: dict[arcade.Sprite, None] = {}
+
+    # Bounds, so that sensors can go in a SpatialGrid
+    @property
+    def left(self) -> float:
+        return self.owner.center_x - self.radius
+
+    @property
+    def right(self) -> float:
+        return self.owner.center_x + self.radius
+
+    @property
+    def bottom(self) -> float:
+        return self.owner.center_y - self.radius
+
+    @property
+    def top(self) -> float:
+        return self.owner.center_y + self.radius
+
+    def contains(self, sprite: arcade.Sprite) -> bool:
+        return math.hypot(sprite.center_x - self.owner.center_x, sprite.center_y - self.owner.center_y) < self.radius
+
+    def entered(self, sprite: arcade.Sprite):
+        self.inside[sprite] = None
+        if self.on_enter is not None:
+            self.on_enter(sprite)
+
+    def exited(self, sprite: arcade.Sprite):
+        del self.inside[sprite]
+        if self.on_exit is not None:
+            self.on_exit(sprite)
+
+
+class SensorField:
+    """All the sensors in a level, and the sprites they're watching out for"""
+    def __init__(self, scene: arcade.Scene, sprite_list_names: Iterable[str], cell_size: int = 256):
+        self.scene = scene
+        # Only sprites in these lists ever set a sensor off
+        self.sprite_list_names = list(sprite_list_names)
+        self.grid = SpatialGrid(cell_size=cell_size)
+        self.sensors: dict[Sensor, None] = {}
+
+    def __len__(self):
+        return len(self.sensors)
+
+    def add(self, owner: arcade.Sprite, radius: float, detects: int,
+            on_enter: Optional[SensorCallback] = None, on_exit: Optional[SensorCallback] = None) -> Sensor:
+        sensor = Sensor(owner, radius, detects, on_enter, on_exit)
+        self.sensors[sensor] = None
+        self.grid.insert(sensor)
+        return sensor
+
+    def remove(self, sensor: Sensor):
+        # Everything inside it leaves
+        for sprite in list(sensor.inside):
+            sensor.exited(sprite)
+        self.sensors.pop(sensor, None)
+        self.grid.remove(sensor)
+
+    def discard(self, sprite: arcade.Sprite):
+        """The sprite's leaving the scene - it leaves every sensor now, rather than at the next update()"""
+        for sensor in [s for s in self.sensors if sprite in s.inside]:
+            sensor.exited(sprite)
+
+    def update(self):
+        # Sensors whose owners have left the scene go with them
+        for sensor in [s for s in self.sensors if not s.owner.sprite_lists]:
+            self.remove(sensor)
+        if not self.sensors:
+            return
+        # Sensors only get moved around the grid if their owners have moved into different cells
+        self.grid.update(self.sensors)
+
+        now_inside: dict[Sensor, dict[arcade.Sprite, None]] = {}
+        for sprite in itertools.chain(*[self.scene[name] for name in self.sprite_list_names]):
+            for sensor in self.grid.query(sprite.center_x, sprite.center_y, sprite.center_x, sprite.center_y):
+                if sensor.detects & sprite.category and sensor.contains(sprite):
+                    now_inside.setdefault(sensor, {})[sprite] = None
+
+        # Only sensors that had something in them, or have something in them now, can have anything to report
+        for sensor in [s for s in self.sensors if s.inside or s in now_inside]:
+            inside = now_inside.get(sensor, {})
+            for sprite in [s for s in sensor.inside if s not in inside]:
+                sensor.exited(sprite)
+            for sprite in inside:
+                if sprite not in sensor.inside:
+                    sensor.entered(sprite)
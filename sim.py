@@ -0,0 +1,78 @@
+from __future__ import annotations
+import argparse
+import time
+from pathlib import Path
+
+import constants
+import sounds
+import replay
+import textures
+from constants import PHYSICS_TIMESTEP
+from simulation import Simulation, HeadlessCamera
+
+
+# Runs a level with no window and no sound, as fast as it'll go - for profiling, and for checking how things behave
+# over a long time on machines without a display.  eg.
+#     python -m sim --level 5 --frames 100000
+# Nothing gets drawn, and the lander doesn't get any input (so it mostly just falls out of the sky ...) - unless
+# it's playing back a recording (see replay.py):
+#     python -m sim --replay recordings/level_5_seed_1234_20240101_120000.lrec
+
+
+def run(level: int, frames: int, seed: int = None, camera_width: int = 1600, camera_height: int = 750,
+        record: Path = None, recording: replay.Recording = None, speed: float = 0) -> Simulation:
+    # Sound has to be switched off before anything that makes a noise gets created
+    sounds.disable_audio()
+    # All the images get loaded up front, as they are in the game (there's no texture atlas to put them in, though)
+    textures.load_all()
+    constants.GAME_OBJECTS["score"] = 0
+    simulation = Simulation(camera=HeadlessCamera(viewport_width=camera_width, viewport_height=camera_height))
+    if recording is not None:
+        simulation.replay = replay.ReplayDriver(recording)
+    simulation.setup(level=level, seed=seed)
+    if record is not None:
+        simulation.start_recording(record)
+
+    start = time.perf_counter()
+    frame = 0
+    level_complete = False
+    while frame < frames and not level_complete:
+        level_complete = simulation.step(PHYSICS_TIMESTEP)
+        frame += 1
+        if speed:
+            # Don't go any faster than 'speed' times real time
+            time.sleep(max(0.0, start + frame * PHYSICS_TIMESTEP / speed - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    simulation.stop_recording()
+
+    simulated = frame * PHYSICS_TIMESTEP
+    print(f"Level {level} (seed {constants.GAME_OBJECTS['seed']}): {frame} frames ({simulated:.1f}s of game time) in {elapsed:.2f}s "
+          f"- {simulated / elapsed if elapsed else float('inf'):.1f}x real time")
+    print(f"Lander {'dead' if simulation.lander.dead else 'alive'} at "
+          f"({simulation.lander.center_x:.0f}, {simulation.lander.center_y:.0f}), "
+          f"level {'complete' if level_complete else 'not complete'}, score {constants.GAME_OBJECTS['score']}")
+    print(", ".join(f"{name}: {len(simulation.scene[name])}"
+                    for name in ["Missiles", "Air Enemies", "Ground Enemies", "Hostages", "Explosions"]))
+    return simulation
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a level headless (no window, no sound)")
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None, help="Same seed and level always give the same world")
+    parser.add_argument("--frames", type=int, default=60 * 60, help="Number of physics steps (60 a second)")
+    parser.add_argument("--width", type=int, default=1600, help="Width of the (pretend) camera viewport")
+    parser.add_argument("--height", type=int, default=750, help="Height of the (pretend) camera viewport")
+    parser.add_argument("--record", type=Path, default=None, help="Record the run to this file")
+    parser.add_argument("--replay", type=Path, default=None,
+                        help="Play back this recording (its level, seed and viewport are used instead of the above)")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Don't run faster than this many times real time (0 is as fast as possible)")
+    args = parser.parse_args()
+    if args.replay is not None:
+        recording = replay.load(args.replay)
+        run(level=recording.level, frames=recording.steps, seed=recording.seed, camera_width=recording.viewport_width,
+            camera_height=recording.viewport_height, record=args.record, recording=recording, speed=args.speed)
+    else:
+        run(level=args.level, frames=args.frames, seed=args.seed, camera_width=args.width, camera_height=args.height,
+            record=args.record, speed=args.speed)
@@ -0,0 +1,380 @@
+from __future__ import annotations
+import arcade
+
+import constants
+from classes.lander import Lander
+from classes.world import World
+from classes.game_scene import GameScene
+from classes.landing_pad import LandingPad
+from classes.hostage import Hostage
+from classes.missile_launcher import MissileLauncher, SuperMissileLauncher, SmartMissileLauncher
+from rng import LevelRandom, new_session_seed
+from pools import Pools
+from constants import WORLD_WIDTH, SPACE_START, SPACE_END, SCALING, PHYSICS_TIMESTEP
+import collisions
+import replay
+
+from pyglet.math import Vec2
+from pathlib import Path
+from typing import Tuple
+
+
+# Everything about a level that isn't drawing it or listening to the user - the scene, the world and everything in
+# it, and moving it all along a step at a time.  The GameView owns one of these and draws it, but it can also be run
+# without a window at all (see sim.py).
+
+
+class HeadlessCamera:
+    """Stands in for the game camera when there's no window.  The game logic only ever needs to know where the
+    camera is and how big it is (eg. for what's on screen, and for the world wrap)."""
+    def __init__(self, viewport_width: int = 1600, viewport_height: int = 750):
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+        self.position = Vec2(0, 0)
+
+    def move_to(self, vector: Tuple[float, float], speed: float = 1.0):
+        # arcade's Camera only actually moves towards where it's been told to go when it's used for drawing, once a
+        # frame.  There's no drawing here, so it just moves straight away.
+        self.position = Vec2(self.position[0] + (vector[0] - self.position[0]) * speed,
+                             self.position[1] + (vector[1] - self.position[1]) * speed)
+
+    def shake(self, velocity: Vec2, speed: float = 1.5, damping: float = 0.9):
+        pass
+
+
+class Simulation:
+    def __init__(self, camera: arcade.Camera | HeadlessCamera):
+        self.camera = camera
+        constants.GAME_OBJECTS["camera"] = self.camera
+        self.scene = None
+        self.lander = None
+        self.world = None
+        self.landing_pad = None
+        self.level = None
+        self.level_config = None
+        self.level_random = None
+        self.timer = 0
+        # Number of physics steps since the level started
+        self.step_count = 0
+        # Recording the player's input, or playing it back (see replay.py)
+        self.recorder: replay.InputRecorder | None = None
+        self.replay: replay.ReplayDriver | None = None
+
+    def setup(self, level: int = 1, level_config: constants.Levels = None, seed: int = None):
+        # The same seed and level always give the same world.  Unless we're told otherwise, every level in a run of
+        # the game uses the same seed.
+        if seed is not None:
+            constants.GAME_OBJECTS["seed"] = seed
+        elif constants.GAME_OBJECTS["seed"] is None:
+            constants.GAME_OBJECTS["seed"] = new_session_seed()
+        self.level_random = LevelRandom(constants.GAME_OBJECTS["seed"], level)
+
+        self.scene = GameScene()
+        self.add_spritelists_to_scene()
+
+        self.level = level  # Ultimately want to use this to develop the game in later levels
+        if not constants.GAME_OBJECTS["score"]:
+            constants.GAME_OBJECTS["score"] = 0
+        self.level_config = level_config if level_config is not None else constants.get_level_config(level)
+        self.timer = 0
+        self.step_count = 0
+        self.stop_recording()
+
+        # Tied myself up in knots here.  I want to ensure there is a hill wide enough in the world for the
+        # landing pad.  But the landing pad width depends on the lander width, and I pass the world in when
+        # creating the lander ... Rather than sort that out, for now I'm just hard coding a number that's large
+        # enough and passing that in!
+        landing_pad_width_limit = 200
+        self.world = World(scene=self.scene, camera_width=self.camera.viewport_width,
+                           camera_height=self.camera.viewport_height,
+                           landing_pad_width_limit=landing_pad_width_limit,
+                           max_gravity=self.level_config.max_gravity,
+                           level_random=self.level_random)
+        # Missiles and explosions get reused, rather than made afresh every time (see pools.py)
+        self.world.pools = Pools(scene=self.scene, world=self.world, camera=self.camera)
+
+        self.create_and_place_lander_in_world()
+        self.pan_camera_to_lander(1)
+
+        # Not sure of the best pattern to do this, but most of the sound functions depend on the lander.  I don't
+        # want to always be having to pass it in - I want the object accessible in general in the module
+        # So I set it here, just after having created it!
+        constants.GAME_OBJECTS["lander"] = self.lander
+
+        self.create_and_place_objects_in_world(landing_pad_width_limit=landing_pad_width_limit)
+        # The spatial index is normally brought up to date by the collision checks - but the level can be drawn before
+        # anything's been checked (see culling.py)
+        self.world.update_spatial_index()
+
+    def create_and_place_lander_in_world(self):
+        self.lander = Lander(scene=self.scene,
+                             world=self.world,
+                             fuel=self.level_config.fuel,
+                             shield_charge=self.level_config.shield,
+                             camera=self.camera)
+        # Starting location of the Lander
+        self.lander.center_y = int((1 / 2) * (SPACE_END - SPACE_START)) + SPACE_START
+        self.lander.center_x = WORLD_WIDTH / 2
+        self.lander.change_x = self.world.random.randint(-30, 30) * PHYSICS_TIMESTEP
+        self.lander.change_y = -self.world.random.randint(10, 30) * PHYSICS_TIMESTEP
+
+    def create_and_place_objects_in_world(self, landing_pad_width_limit: int):
+        landing_pad_width = int(2 * self.lander.width)
+        if landing_pad_width > landing_pad_width_limit:
+            print("Your hardcoded value for the landing pad width limit isn't large enough!")
+            return
+        self.landing_pad = LandingPad(scene=self.scene, lander=self.lander, world=self.world,
+                                      width=landing_pad_width,
+                                      height=int(0.3 * landing_pad_width))
+
+        # Add the missile launchers
+        for i in range(self.level_config.missile_launchers):
+            MissileLauncher(scene=self.scene, world=self.world, camera=self.camera)
+        for i in range(self.level_config.shielded_missile_launchers):
+            MissileLauncher(scene=self.scene, world=self.world, camera=self.camera, shield=True)
+        for i in range(self.level_config.super_missile_launchers):
+            SuperMissileLauncher(scene=self.scene, world=self.world, camera=self.camera)
+        for i in range(self.level_config.smart_missile_launchers):
+            SmartMissileLauncher(scene=self.scene, world=self.world, camera=self.camera)
+        # Add the hostages
+        for i in range(self.level_config.hostages):
+            Hostage(scene=self.scene, world=self.world, lander=self.lander, camera=self.camera)
+
+    def add_spritelists_to_scene(self):
+        # Adding spritelists now to get the ordering I want, and so that it's easy to see all of them in one go!
+        # If we draw the engines before their owners, the angles aren't quite right
+        self.scene.add_sprite_list("EMPs")
+        self.scene.add_sprite_list("Explosions")
+        self.scene.add_sprite_list("Lander")
+        self.scene.add_sprite_list("Missiles")
+        self.scene.add_sprite_list("Air Enemies")
+        self.scene.add_sprite_list("Disabled Shields")
+        self.scene.add_sprite_list('Engines')
+        # (The terrain isn't sprites - it's drawn here, in between the engines and the ground enemies.  See World.)
+        self.scene.add_sprite_list("Ground Enemies", use_spatial_hash=True)
+        self.scene.add_sprite_list("Hostages", use_spatial_hash=True)
+        self.scene.add_sprite_list("Landing Pad", use_spatial_hash=True)
+        self.scene.add_sprite_list("Shields")
+
+    def step(self, delta_time: float) -> bool:
+        """Move the level on by delta_time.  Returns True if that completed the level."""
+        if self.replay is not None and not self.replay.finished:
+            self.replay.feed(self)
+        level_complete = self.advance(delta_time)
+        if self.recorder is not None or self.replay is not None:
+            state = replay.state_hash(self)
+            if self.recorder is not None:
+                self.recorder.record(self.step_count, replay.STATE, state)
+            if self.replay is not None and not self.replay.finished:
+                self.replay.check(self, state)
+        self.step_count += 1
+        return level_complete
+
+    def advance(self, delta_time: float) -> bool:
+        # Whatever was finished with last frame can be used again
+        self.world.pools.begin_frame()
+        # Explosion forces get worked out afresh for the new frame
+        self.world.explosion_field.begin_frame(self.camera)
+        # ... as do the directions the missiles are heading in
+        self.world.guidance.begin_frame()
+        # Move everything that moves ...
+        self.world.physics.step(delta_time)
+        # ... let anything that's been waiting for the lander to come near know that it has (or that it's gone) ...
+        self.world.sensors.update()
+        # Run the "on_update" function on every sprite in every sprite list ...
+        # (... except for those far enough from the camera to have been put to sleep)
+        self.world.activity.update_scene(self.scene, delta_time, self.camera)
+
+        # I want the lander to always face the mouse pointer, but we only get updates on events (eg. mouse movement)
+        # ie. If the mouse is still and the ship flies past it, without further events, it will be facing in the wrong
+        # direction.
+        # So on mouse move event I store the mouse coordinates, and on every update (event or not) I ensure the ship
+        # is facing the right way.
+        if self.lander.mouse_location is not None:
+            self.lander.face_point((self.lander.mouse_location + self.camera.position))
+
+        self.apply_world_wrap_to_sprites(screen_width=self.camera.viewport_width)
+
+        # Check to see if the level's been completed!
+        if self.lander.landed and len(self.scene['Hostages']) == 0:
+            constants.GAME_OBJECTS["score"] += 150
+            return True
+
+        # Check for collisions
+        collisions.check_for_collisions(self.scene, self.camera, self.world)
+
+        # Parallax scrolling of the backgrounds
+        # I find updating the positions of the backgrounds in this on_update() function causes a slight flicker as you
+        # cross the camera_width boundary - but that goes away if I move the update to the on_draw() function!
+        # I don't know why, but there you go. Parallax background position updates are done alongside the draw().
+
+        # For testing purposes - occasionally useful to have a regular explosion appear!
+        #self.add_test_explosion(delta_time)
+        return False
+
+    def add_test_explosion(self, delta_time: float):
+        self.timer += delta_time
+        if self.timer > 10:
+            self.timer = 0
+            self.world.pools.explosions.acquire(
+                mass=50,
+                scale=0.2 * SCALING,
+                radius_initial=int(self.lander.height) // 2,
+                radius_final=int(self.lander.height) * 8,
+                lifetime=4,  # seconds
+                # Force here is what's applied to airborne objects that are
+                # within the explosion (and presumably shielded!).
+                # Say gravity is 100, lander mass is 20, so gravitational force
+                # is f = ma -> 2000.
+                # So trying to get a feel for what the right value should be,
+                # but 4000 is double the kind of average gravitational pull
+                force=4000,  # was 20
+                velocity_x=0,
+                velocity_y=0,
+                center_x=3000,
+                center_y=1000,
+                owner=None)
+
+    def apply_world_wrap_to_sprites(self, screen_width: int):
+        # If the Lander (or its explosion) flies off the edge of the world, I want to wrap it around instantly,
+        # so the user doesn't notice.
+        # I have crafted the World so that the first two window.widths are the same as the last two.
+        # So I pull off this trick by never letting the user get closer than 1 window.width to the edge of the world
+        # - when this boundary is crossed, the user is flipped to the other side (along with all the sprites!).
+        # I wrap other sprites in the same way, ensuring they are always (when relevant) on the same side of
+        # the world as the lander
+        # First, just deal with sprite positions.  Then consider the camera.
+        # Landing pad is effectively terrain.  Shields and Engines move themselves, as centred on owner
+        non_terrain_spritelists = [self.scene[i] for i in constants.NON_TERRAIN_SPRITELISTS]
+        non_terrain_sprites = [s for i in non_terrain_spritelists for s in i]
+        # Flip all sprites from one side to the other
+        for s in non_terrain_sprites:
+            if s.center_x < screen_width:
+                s.center_x += WORLD_WIDTH - 2 * screen_width
+                self.world.activity.moved(s)
+            elif s.center_x > WORLD_WIDTH - screen_width:
+                s.center_x -= WORLD_WIDTH - 2 * screen_width
+                self.world.activity.moved(s)
+        # But if the lander is in the first or last 2 viewport_widths, we ensure the lander can see them
+        if self.lander.center_x < 2 * screen_width:
+            for s in [i for i in non_terrain_sprites
+                      if WORLD_WIDTH - 2 * screen_width <= i.center_x + i.width / 2]:
+                s.center_x -= WORLD_WIDTH - 2 * screen_width
+                self.world.activity.moved(s)
+        elif WORLD_WIDTH - 2 * screen_width <= self.lander.center_x:
+            for s in [i for i in non_terrain_sprites
+                      if 2 * screen_width >= i.center_x - i.width / 2]:
+                s.center_x += WORLD_WIDTH - 2 * screen_width
+                self.world.activity.moved(s)
+
+        self.apply_world_wrap_to_camera(screen_width)
+
+    def apply_world_wrap_to_camera(self, screen_width):
+        # If we've wrapped the lander to the other side of the world, we move the camera instantly
+        if abs(self.lander.center_x - self.camera.position[0]) > WORLD_WIDTH - 4 * screen_width:
+            if self.lander.center_x > self.camera.position[0]:
+                new_x_position = self.camera.position[0] + WORLD_WIDTH - 2 * screen_width
+            else:
+                new_x_position = self.camera.position[0] - (WORLD_WIDTH - 2 * screen_width)
+            new_position = Vec2(new_x_position + self.lander.change_x,
+                                self.camera.position[1] + self.lander.change_y)
+            self.move_camera_to(new_position, 1)
+        else:
+            # Gently pan the camera around after the lander
+            self.pan_camera_to_lander(panning_fraction=0.04)
+
+    def pan_camera_to_lander(self, panning_fraction: float = 1.0):
+        """
+        Manage Scrolling
+
+        :param panning_fraction: Number from 0 to 1. Higher the number, faster we
+                                 pan the camera to the user.
+        """
+
+        # Centre on the lander until it blows up, then centre on it's explosion
+        centre_on = self.lander if not self.lander.explosion else self.lander.explosion
+        camera_x0 = centre_on.center_x - (self.camera.viewport_width / 2)
+        camera_y0 = centre_on.center_y - (self.camera.viewport_height / 2)
+
+        if camera_y0 < 0:
+            camera_y0 = 0
+        user_centered = Vec2(camera_x0, camera_y0)
+
+        self.move_camera_to(user_centered, panning_fraction)
+
+    def move_camera_to(self, position: Vec2, speed: float):
+        # arcade's Camera only moves towards where it's been told to go when it's next used for drawing - so where it
+        # had got to would depend on how often we happened to draw.  Lots of things depend on where the camera is
+        # (what's awake, explosion forces, which way the lander faces), and the level has to play out the same way
+        # every time it's given the same input (see replay.py).  So the camera moves a bit every physics step instead,
+        # and drawing just uses wherever it's got to.
+        new_position = Vec2(*self.camera.position).lerp(Vec2(*position), speed)
+        self.camera.move_to(new_position, 1)
+        self.camera.position = new_position
+
+    def start_recording(self, path: Path):
+        self.stop_recording()
+        self.recorder = replay.InputRecorder(path, seed=self.level_random.session_seed, level=self.level,
+                                             viewport_width=self.camera.viewport_width,
+                                             viewport_height=self.camera.viewport_height)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def record_input(self, kind: int, *values):
+        # Input is recorded against the step it'll first make a difference to - the next one
+        if self.recorder is not None:
+            self.recorder.record(self.step_count, kind, *values)
+
+    # Controlling the lander.  The view passes on the user's input to these (and a replay feeds recorded input to them)
+    def on_mouse_press(self, x, y, button, modifiers):
+        self.record_input(replay.MOUSE_PRESS, x, y, button, modifiers)
+        self.lander.engine.angle = self.lander.angle
+        if button == arcade.MOUSE_BUTTON_RIGHT:
+            self.lander.shield.activate()
+            self.lander.trying_to_activate_shield = True
+        if button == arcade.MOUSE_BUTTON_LEFT:
+            self.lander.engine.activate()
+            self.lander.trying_to_activate_engine = True
+        if button == arcade.MOUSE_BUTTON_MIDDLE:
+            self.lander.activate_EMP()
+
+    def on_key_press(self, symbol, modifiers):
+        self.record_input(replay.KEY_PRESS, symbol, modifiers)
+        if symbol == arcade.key.BACKSLASH:
+            self.lander.engine.activate()
+            self.lander.trying_to_activate_engine = True
+        if symbol == arcade.key.X:
+            self.lander.activate_EMP()
+        if symbol == arcade.key.Z:
+            self.lander.shield.activate()
+            self.lander.trying_to_activate_shield = True
+        if modifiers & arcade.key.MOD_SHIFT:
+            self.lander.engine.boost(True)
+
+    def on_key_release(self, symbol, modifiers):
+        self.record_input(replay.KEY_RELEASE, symbol, modifiers)
+        if symbol == arcade.key.BACKSLASH:
+            self.lander.engine.deactivate()
+            self.lander.trying_to_activate_engine = False
+        if symbol == arcade.key.Z:
+            self.lander.shield.deactivate()
+            self.lander.trying_to_activate_shield = False
+        if not modifiers & arcade.key.MOD_SHIFT:
+            self.lander.engine.boost(False)
+
+    def on_mouse_release(self, x, y, button, modifiers):
+        self.record_input(replay.MOUSE_RELEASE, x, y, button, modifiers)
+        self.lander.engine.angle = self.lander.angle
+        if button == arcade.MOUSE_BUTTON_RIGHT:
+            self.lander.shield.deactivate()
+            self.lander.trying_to_activate_shield = False
+        if button == arcade.MOUSE_BUTTON_LEFT:
+            self.lander.engine.deactivate()
+            self.lander.trying_to_activate_engine = False
+
+    def on_mouse_motion(self, x, y, dx, dy):
+        self.record_input(replay.MOUSE_MOTION, x, y, dx, dy)
+        self.lander.mouse_location = Vec2(x, y)
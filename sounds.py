@@ -1,10 +1,12 @@
 from __future__ import annotations
+import math
 import arcade
-import collisions
 import constants
+from pathlib import Path
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from classes.lander import Lander
+    import pyglet.media as media
 
 
 # Generally speaking, the functions here will depend on the lander - it's velocity and position.
@@ -12,6 +14,65 @@ if TYPE_CHECKING:
 # as its created.  Doesn't feel quite right, though ...
 GAME_OBJECTS = constants.GAME_OBJECTS
 
+# All sounds go through here rather than straight to arcade, so that they can be switched off altogether - eg. when
+# running the game headless (see sim.py), where there's no audio device and we don't want to waste time loading or
+# playing anything.  When they're switched off, every sound is a NullSound and nothing ever gets played.
+audio_enabled = True
+
+
+class NullSound:
+    """Stands in for an arcade.Sound when audio is switched off.  Never playing, never makes a noise."""
+    def get_length(self) -> float:
+        return 1
+
+    def is_playing(self, player) -> bool:
+        return False
+
+    def set_volume(self, volume, player) -> None:
+        pass
+
+    def stop(self, player) -> None:
+        pass
+
+
+def load_sound(path: str | Path) -> arcade.Sound | NullSound:
+    if not audio_enabled:
+        return NullSound()
+    return arcade.load_sound(path)
+
+
+def play_sound(sound: arcade.Sound | NullSound, volume: float = 1.0, pan: float = 0.0, looping: bool = False,
+               speed: float = 1.0) -> media.Player | None:
+    if not audio_enabled or isinstance(sound, NullSound):
+        return None
+    return arcade.play_sound(sound=sound, volume=volume, pan=pan, looping=looping, speed=speed)
+
+
+def stop_sound(player: media.Player | None):
+    if player:
+        arcade.stop_sound(player)
+
+
+def disable_audio():
+    global audio_enabled
+    audio_enabled = False
+    SOUNDS.clear()
+
+
+class Sounds(dict):
+    """Sounds by path (eg. 'sounds/engine.wav').  Each one is only loaded the first time it's asked for."""
+    def __missing__(self, path: str) -> arcade.Sound | NullSound:
+        sound = self[path] = load_sound(Path(path))
+        return sound
+
+
+SOUNDS = Sounds()
+
+
+def sound_paths(prefix: str) -> list[str]:
+    """Paths of all the sounds whose names start with prefix - eg. all the different explosion sounds"""
+    return sorted(path.as_posix() for path in Path('sounds').glob(f'{prefix}*.mp3'))
+
 
 def get_lander_and_camera():
     lander: Lander = constants.GAME_OBJECTS["lander"]
@@ -25,11 +86,13 @@ def get_volume_multiplier(position: tuple[float, float]) -> float:
     # the volume of individual sounds.  This functions should just turn that up and down depending on where the lander is
     # I think the idea will be that you can't hear objects greater than a screen's width from the lander, and the
     # volume increases as it gets closer
+    if not audio_enabled:
+        return 0
     lander, camera = get_lander_and_camera()
     if not lander and camera:
         return 1
     # Don't need to worry about world wrapping here, because the game ensures sprites are always on the side of the lander
-    distance = collisions.modulus((lander.center_x - position[0], lander.center_y - position[1]))
+    distance = math.hypot(lander.center_x - position[0], lander.center_y - position[1])
     if distance > camera.viewport_width:
         return 0
     # Gets louder as it gets closer.  Like having a circle of radius camera.viewport_width centred on the lander
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import arcade
+from typing import Iterable, Tuple
+
+
+# A uniform grid that buckets sprites by their bounding boxes.
+# arcade's check_for_collision_with_lists() falls back to a GPU query for every sprite list that doesn't use a
+# spatial hash, which is why I originally only checked for collisions on screen.  With this grid, each sprite only
+# gets compared with whatever shares a cell with it, so the cost grows with the number of close pairs rather than
+# with the number of sprites squared - and collisions can happen anywhere in the world.
+
+CellRange = Tuple[int, int, int, int]
+
+
+class SpatialGrid:
+    """Uniform grid broadphase, updated incrementally from sprite positions"""
+    def __init__(self, cell_size: int = 256):
+        self.cell_size = cell_size
+        # Using dicts (rather than sets) as ordered sets, so candidates always come back in the same order
+        self.cells: dict[Tuple[int, int], dict[arcade.Sprite, None]] = {}
+        self.sprite_cells: dict[arcade.Sprite, CellRange] = {}
+
+    def __len__(self):
+        return len(self.sprite_cells)
+
+    def __contains__(self, sprite: arcade.Sprite):
+        return sprite in self.sprite_cells
+
+    def cell_range(self, left: float, bottom: float, right: float, top: float) -> CellRange:
+        return (int(left // self.cell_size), int(bottom // self.cell_size),
+                int(right // self.cell_size), int(top // self.cell_size))
+
+    def sprite_cell_range(self, sprite: arcade.Sprite) -> CellRange:
+        return self.cell_range(sprite.left, sprite.bottom, sprite.right, sprite.top)
+
+    def update(self, sprites: Iterable[arcade.Sprite]):
+        # Only sprites that have moved into a different set of cells are re-bucketed.
+        # Anything we were tracking that isn't in 'sprites' any more (ie. it's died) is dropped.
+        seen = set()
+        for sprite in sprites:
+            seen.add(sprite)
+            self.insert(sprite)
+        if len(seen) != len(self.sprite_cells):
+            for sprite in [s for s in self.sprite_cells if s not in seen]:
+                self.remove(sprite)
+
+    def insert(self, sprite: arcade.Sprite):
+        """Add a single sprite - or, if it's already in the grid, re-bucket it if it's moved"""
+        new_range = self.sprite_cell_range(sprite)
+        old_range = self.sprite_cells.get(sprite)
+        if new_range == old_range:
+            return
+        if old_range is not None:
+            self._remove_from_cells(sprite, old_range)
+        self._add_to_cells(sprite, new_range)
+        self.sprite_cells[sprite] = new_range
+
+    def remove(self, sprite: arcade.Sprite):
+        cell_range = self.sprite_cells.pop(sprite, None)
+        if cell_range is not None:
+            self._remove_from_cells(sprite, cell_range)
+
+    def clear(self):
+        self.cells.clear()
+        self.sprite_cells.clear()
+
+    def query(self, left: float, bottom: float, right: float, top: float) -> list[arcade.Sprite]:
+        """Everything sharing a cell with the given box (candidates only - not necessarily touching it)"""
+        return self._query_cells(self.cell_range(left, bottom, right, top))
+
+    def query_annulus(self, centre: Tuple[float, float], inner_radius: float,
+                      outer_radius: float) -> list[arcade.Sprite]:
+        """Everything sharing a cell with the ring between the two radii (candidates only, as with query())"""
+        c_x, c_y = centre
+        x_min, y_min, x_max, y_max = self.cell_range(c_x - outer_radius, c_y - outer_radius,
+                                                     c_x + outer_radius, c_y + outer_radius)
+        size = self.cell_size
+        found: dict[arcade.Sprite, None] = {}
+        for x in range(x_min, x_max + 1):
+            # Horizontal distances from the centre to the nearest and furthest sides of this column of cells
+            near_x = max(x * size - c_x, 0, c_x - (x + 1) * size)
+            far_x = max(abs(x * size - c_x), abs((x + 1) * size - c_x))
+            for y in range(y_min, y_max + 1):
+                cell = self.cells.get((x, y))
+                if not cell:
+                    continue
+                near_y = max(y * size - c_y, 0, c_y - (y + 1) * size)
+                far_y = max(abs(y * size - c_y), abs((y + 1) * size - c_y))
+                # Skip cells entirely outside the ring, or entirely inside the hole in the middle of it
+                if (near_x * near_x + near_y * near_y > outer_radius * outer_radius
+                        or inner_radius > 0 and far_x * far_x + far_y * far_y < inner_radius * inner_radius):
+                    continue
+                found.update(cell)
+        return list(found)
+
+    def nearby(self, sprite: arcade.Sprite) -> list[arcade.Sprite]:
+        """Candidates for a collision with the given sprite (which needn't be in the grid itself)"""
+        return [s for s in self._query_cells(self.sprite_cell_range(sprite)) if s is not sprite]
+
+    def _query_cells(self, cell_range: CellRange) -> list[arcade.Sprite]:
+        x_min, y_min, x_max, y_max = cell_range
+        if x_min == x_max and y_min == y_max:
+            # Most common case by far - the box sits entirely within one cell
+            return list(self.cells.get((x_min, y_min), ()))
+        found: dict[arcade.Sprite, None] = {}
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                cell = self.cells.get((x, y))
+                if cell:
+                    found.update(cell)
+        return list(found)
+
+    def _add_to_cells(self, sprite: arcade.Sprite, cell_range: CellRange):
+        x_min, y_min, x_max, y_max = cell_range
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                self.cells.setdefault((x, y), {})[sprite] = None
+
+    def _remove_from_cells(self, sprite: arcade.Sprite, cell_range: CellRange):
+        x_min, y_min, x_max, y_max = cell_range
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                cell = self.cells.get((x, y))
+                if cell is not None:
+                    cell.pop(sprite, None)
+                    if not cell:
+                        del self.cells[(x, y)]
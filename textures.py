@@ -0,0 +1,92 @@
+from __future__ import annotations
+import arcade
+from pathlib import Path
+
+
+# All the images go through here rather than straight to arcade, so each one is only ever loaded once and everything
+# that uses it shares the same Texture.  They used to be loaded all over the place - every engine loaded its own
+# thrust images, every explosion picked and loaded its own picture - and the first time a sprite with a new texture
+# got drawn, its image had to be copied into the GPU's texture atlas there and then, in the middle of a frame.
+# Now, as soon as there's a window, every image is loaded and packed into the atlas in one go (see pack_into_atlas()).
+#
+# Textures don't need a window to be loaded, so running headless (see sim.py) works the same way - it just never
+# gets as far as the atlas.
+
+IMAGES_DIRECTORY = Path('images')
+
+
+class Textures(dict):
+    """Textures by path (eg. 'images/missile.png').  Each one is only loaded the first time it's asked for."""
+    def __missing__(self, path: str) -> arcade.Texture:
+        texture = self[path] = arcade.load_texture(path)
+        return texture
+
+
+TEXTURES = Textures()
+
+
+def image_paths(prefix: str = '') -> list[str]:
+    """Paths of all the images whose names start with prefix - eg. all the different explosion images"""
+    return sorted(path.as_posix() for path in IMAGES_DIRECTORY.glob(f'{prefix}*.png'))
+
+
+def load_all():
+    for path in image_paths():
+        TEXTURES[path]
+
+
+def pack_into_atlas(atlas: arcade.TextureAtlas):
+    """Put every image in the atlas now, rather than whenever something that uses it first gets drawn"""
+    load_all()
+    for texture in TEXTURES.values():
+        atlas.add(texture)
+
+
+def atlas_usage(atlas: arcade.TextureAtlas) -> str:
+    # Only counts our own textures - the atlas has other things in it too (eg. the minimap)
+    ours = [texture for texture in TEXTURES.values() if atlas.has_texture(texture)]
+    area = sum(texture.width * texture.height for texture in ours)
+    return (f"Texture atlas: {len(ours)} textures, {atlas.width}x{atlas.height} "
+            f"({100 * area / (atlas.width * atlas.height):.0f}% used)")
+
+
+# Textures that are drawn rather than loaded - the circles for the shields and EMPs, and the terrain rects.
+# arcade makes a new texture for every size and colour of these (and never lets go of them), so every level's terrain
+# (with its own colour, and rects of every size) used to add dozens more textures to the atlas, until eventually it ran
+# out of space.  Instead:
+#  - Circles are made in a handful of sizes (powers of 2), and the sprite is scaled to the size it actually wants
+#  - Rects are all the same small white texture, stretched to size and tinted whatever colour they want to be
+
+SMALLEST_GENERATED_SIZE = 32
+# Circles bigger than this (eg. the EMP) are scaled up from this size - they're see-through anyway
+LARGEST_GENERATED_SIZE = 1024
+WHITE_TEXTURE_SIZE = 16
+
+
+class GeneratedTextures(dict):
+    """Generated textures, by shape, size and colour"""
+    def circle(self, radius: float, color: arcade.Color) -> arcade.Texture:
+        diameter = size_bucket(2 * radius)
+        color = tuple(color) if len(color) == 4 else (*color, 255)
+        key = ('circle', diameter, color)
+        if key not in self:
+            self[key] = arcade.make_circle_texture(diameter, color, name=f"generated_circle_{diameter}_{color}")
+        return self[key]
+
+    def white(self) -> arcade.Texture:
+        key = ('rect', WHITE_TEXTURE_SIZE, arcade.color.WHITE)
+        if key not in self:
+            self[key] = arcade.Texture.create_filled("generated_white", (WHITE_TEXTURE_SIZE, WHITE_TEXTURE_SIZE),
+                                                     arcade.color.WHITE)
+        return self[key]
+
+
+GENERATED_TEXTURES = GeneratedTextures()
+
+
+def size_bucket(size: float) -> int:
+    """The smallest power of 2 at least as big as size (within limits)"""
+    bucket = SMALLEST_GENERATED_SIZE
+    while bucket < size and bucket < LARGEST_GENERATED_SIZE:
+        bucket *= 2
+    return bucket
@@ -1,27 +1,30 @@
-import random
-
+from __future__ import annotations
 import arcade
-from arcade import Scene
 
 import constants
-from classes.lander import Lander
-from classes.world import World
-from classes.landing_pad import LandingPad
-from classes.hostage import Hostage
-from classes.missile_launcher import MissileLauncher, SuperMissileLauncher
-from classes.explosion import Explosion
-from constants import BACKGROUND_COLOR, WORLD_WIDTH, WORLD_HEIGHT, SPACE_START, SPACE_END, SCALING
-import collisions
+from constants import BACKGROUND_COLOR, WORLD_WIDTH, WORLD_HEIGHT, PHYSICS_TIMESTEP, MAX_PHYSICS_STEPS_PER_FRAME, \
+    MINIMAP_REFRESH_RATE
+import sounds
+import replay
+from simulation import Simulation
+from minimap import MinimapBlips
+from culling import SceneCuller
 
 from views.menu import MenuView
 from views.next_level import NextLevelView
-from pyglet.math import Vec2
 from uuid import uuid4
-from typing import List
 from pathlib import Path
+from typing import List, Tuple, TYPE_CHECKING
+if TYPE_CHECKING:
+    from classes.game_scene import GameScene
+    from classes.world import World
+    from classes.lander import Lander
+    from classes.landing_pad import LandingPad
 
 
 class GameView(arcade.View):
+    # If set, every level played is recorded into here (see replay.py)
+    recording_directory: Path | None = None
 
     def __init__(self):
         """Initialize the game"""
@@ -29,22 +32,23 @@ class GameView(arcade.View):
 
         # Want to leave space at the top of the screen for the mini-map
         self.game_camera = arcade.Camera(viewport_height=int((5/6) * self.window.height))
-        constants.GAME_OBJECTS["camera"] = self.game_camera
         self.overlay_camera = arcade.Camera()
-        self.scene = None
-        self.lander = None
-        self.world = None
-        self.landing_pad = None
-        self.level = None
-        self.level_config = None
+        # The level itself - everything in it, and how it all moves
+        self.simulation = Simulation(camera=self.game_camera)
 
         # Mini-map related
         # Background color must include an alpha component
         self.minimap_background_colour = (*BACKGROUND_COLOR, 255)
         self.minimap_sprite_list = None
-        # Texture and associated sprite to render our minimap to
+        # Textures and associated sprites to render our minimap to.  It's in two layers: the background (sky,
+        # mountains, terrain, landing pad), which doesn't change during a level so is only drawn when it starts,
+        # and the things moving around on top of it, which are redrawn MINIMAP_REFRESH_RATE times a second.
+        self.minimap_background_texture = None
         self.minimap_texture = None
         self.minimap_sprite = None
+        self.minimap_refresh_timer: float = 0
+        # What's drawn on the minimap for everything moving around (see minimap.py)
+        self.minimap_blips: MinimapBlips | None = None
 
         # The HUD text
         self.fuel_text = None
@@ -58,46 +62,67 @@ class GameView(arcade.View):
         self.EMP_text = None
         self.left_hud_text = []
         self.right_hud_text = []
-        self.timer = 0
+        self.culling_text = None
 
-        # Sounds
-        self.level_complete = arcade.load_sound(Path('sounds/level_complete.mp3'))
+        # Fixed timestep physics
+        # Time that's passed but that hasn't been simulated yet (always less than one physics step, after an update)
+        self.physics_accumulator = 0
+        # Where the moving sprites were before the latest physics step, so they can be drawn in between
+        self.previous_positions: dict[arcade.Sprite, Tuple[float, float]] = {}
+        self.current_positions: dict[arcade.Sprite, Tuple[float, float]] = {}
+        # How much faster than real time to run (only for replays)
+        self.replay_speed = 1
 
-    def setup(self, level: int = 1):
+        # Sounds
+        self.level_complete = sounds.SOUNDS['sounds/level_complete.mp3']
+
+    def start_replay(self, recording: replay.Recording, speed: float = 1):
+        """Play back a recording, rather than letting the user play"""
+        # The world is built to fit the camera, so it has to be the same size as when it was recorded
+        self.game_camera.resize(recording.viewport_width, recording.viewport_height)
+        self.simulation.replay = replay.ReplayDriver(recording)
+        self.replay_speed = speed
+        self.setup(level=recording.level, seed=recording.seed)
+
+    # The view mostly just needs to get at the things in the simulation, to draw them and to control the lander
+    @property
+    def scene(self) -> GameScene:
+        return self.simulation.scene
+
+    @property
+    def world(self) -> World:
+        return self.simulation.world
+
+    @property
+    def lander(self) -> Lander:
+        return self.simulation.lander
+
+    @property
+    def landing_pad(self) -> LandingPad:
+        return self.simulation.landing_pad
+
+    @property
+    def level(self) -> int:
+        return self.simulation.level
+
+    def setup(self, level: int = 1, seed: int = None):
         """Get the game ready to play"""
 
         # Set the background color
         arcade.set_background_color(BACKGROUND_COLOR)
 
-        self.scene = arcade.Scene()
-        self.add_spritelists_to_scene()
-
-        self.level = level  # Ultimately want to use this to develop the game in later levels
-        if not constants.GAME_OBJECTS["score"]:
-            constants.GAME_OBJECTS["score"] = 0
-        self.level_config = constants.get_level_config(level)
-
-        # Tied myself up in knots here.  I want to ensure there is a hill wide enough in the world for the
-        # landing pad.  But the landing pad width depends on the lander width, and I pass the world in when
-        # creating the lander ... Rather than sort that out, for now I'm just hard coding a number that's large
-        # enough and passing that in!
-        landing_pad_width_limit = 200
-        self.world = World(scene=self.scene, camera_width=self.game_camera.viewport_width,
-                           camera_height=self.game_camera.viewport_height,
-                           landing_pad_width_limit=landing_pad_width_limit,
-                           max_gravity=self.level_config.max_gravity)
-
-        self.create_and_place_lander_in_world()
-        self.pan_camera_to_lander(1)
-
-        # Not sure of the best pattern to do this, but most of the sound functions depend on the lander.  I don't
-        # want to always be having to pass it in - I want the object accessible in general in the module
-        # So I set it here, just after having created it!
-        constants.GAME_OBJECTS["lander"] = self.lander
-
-        self.create_and_place_objects_in_world(landing_pad_width_limit=landing_pad_width_limit)
+        self.simulation.setup(level=level, seed=seed)
+        if self.recording_directory is not None and self.simulation.replay is None:
+            self.simulation.start_recording(replay.recording_path(self.recording_directory,
+                                                                  seed=constants.GAME_OBJECTS["seed"], level=level))
+        self.physics_accumulator = 0
+        self.previous_positions = {}
 
         self.construct_minimap()
+        # Only what's on screen gets drawn.  Most of it is found through the world's spatial index.
+        self.scene_culler = SceneCuller(self.scene, self.world.spatial_index, constants.GENERAL_OBJECT_SPRITELISTS,
+                                        constants.ATTACHED_SPRITELISTS, margin=constants.CULLING_MARGIN,
+                                        cell_size=constants.SPATIAL_INDEX_CELL_SIZE)
 
         # Basically, I'm just reserving spaces here for some text on the left and right hand side of the screen
         # In the on_update(), I choose what to display here.  But it's not expecting the width to be larger than
@@ -116,67 +141,40 @@ class GameView(arcade.View):
             centre_x=(3 * self.window.width + self.minimap_sprite.width) // 4,
             centre_y=self.window.height - self.minimap_sprite.height // 2
         )
+        # How many sprites are being drawn (and how many aren't, as they're off screen), tucked away in the corner
+        self.culling_text = arcade.Text(
+            text="",
+            start_x=10,
+            start_y=10,
+            color=arcade.color.WHITE,
+            font_size=self.left_hud_text[0].font_size // 2,
+            font_name="Kenney Pixel Square",
+            anchor_x="left",
+            anchor_y="bottom"
+        )
 
     def construct_minimap(self):
         # Construct the minimap
         minimap_width = int(0.75 * self.game_camera.viewport_width)
         minimap_height = self.window.height - self.game_camera.viewport_height
-        self.minimap_texture = arcade.Texture.create_empty(str(uuid4()), (minimap_width, minimap_height))
-        self.minimap_sprite = arcade.Sprite(center_x=self.game_camera.viewport_width / 2,
-                                            center_y=(minimap_height / 2) + self.game_camera.viewport_height,
-                                            texture=self.minimap_texture)
+        # Every new texture takes up more room in the texture atlas (which never gets it back), so if the level's
+        # restarted or we move on to the next one, the minimap's textures get reused
+        if self.minimap_texture is None or self.minimap_texture.size != (minimap_width, minimap_height):
+            self.minimap_background_texture = arcade.Texture.create_empty(str(uuid4()), (minimap_width, minimap_height))
+            self.minimap_texture = arcade.Texture.create_empty(str(uuid4()), (minimap_width, minimap_height))
         self.minimap_sprite_list = arcade.SpriteList()
-        self.minimap_sprite_list.append(self.minimap_sprite)
-
-    def create_and_place_lander_in_world(self):
-        self.lander = Lander(scene=self.scene,
-                             world=self.world,
-                             fuel=self.level_config.fuel,
-                             shield_charge=self.level_config.shield,
-                             camera=self.game_camera)
-        # Starting location of the Lander
-        self.lander.center_y = int((1 / 2) * (SPACE_END - SPACE_START)) + SPACE_START
-        self.lander.center_x = WORLD_WIDTH / 2
-        self.lander.change_x = random.randint(-30, 30) / 60
-        self.lander.change_y = -random.randint(10, 30) / 60
-
-    def create_and_place_objects_in_world(self, landing_pad_width_limit: int):
-        landing_pad_width = int(2 * self.lander.width)
-        if landing_pad_width > landing_pad_width_limit:
-            print("Your hardcoded value for the landing pad width limit isn't large enough!")
-            return
-        self.landing_pad = LandingPad(scene=self.scene, lander=self.lander, world=self.world,
-                                      width=landing_pad_width,
-                                      height=int(0.3 * landing_pad_width))
-
-        # Add the missile launchers
-        for i in range(self.level_config.missile_launchers):
-            MissileLauncher(scene=self.scene, world=self.world, camera=self.game_camera)
-        for i in range(self.level_config.shielded_missile_launchers):
-            MissileLauncher(scene=self.scene, world=self.world, camera=self.game_camera, shield=True)
-        for i in range(self.level_config.super_missile_launchers):
-            SuperMissileLauncher(scene=self.scene, world=self.world, camera=self.game_camera)
-        # Add the hostages
-        for i in range(self.level_config.hostages):
-            Hostage(scene=self.scene, world=self.world, lander=self.lander, camera=self.game_camera)
-
-    def add_spritelists_to_scene(self):
-        # Adding spritelists now to get the ordering I want, and so that it's easy to see all of them in one go!
-        # If we draw the engines before their owners, the angles aren't quite right
-        self.scene.add_sprite_list("EMPs")
-        self.scene.add_sprite_list("Explosions")
-        self.scene.add_sprite_list("Lander")
-        self.scene.add_sprite_list("Missiles")
-        self.scene.add_sprite_list("Air Enemies")
-        self.scene.add_sprite_list("Disabled Shields")
-        self.scene.add_sprite_list('Engines')
-        self.scene.add_sprite_list("Terrain Left Edge", use_spatial_hash=True)
-        self.scene.add_sprite_list("Terrain Centre", use_spatial_hash=True)
-        self.scene.add_sprite_list("Terrain Right Edge", use_spatial_hash=True)
-        self.scene.add_sprite_list("Ground Enemies", use_spatial_hash=True)
-        self.scene.add_sprite_list("Hostages", use_spatial_hash=True)
-        self.scene.add_sprite_list("Landing Pad", use_spatial_hash=True)
-        self.scene.add_sprite_list("Shields")
+        # Moving things are drawn over the top of the background
+        for texture in (self.minimap_background_texture, self.minimap_texture):
+            self.minimap_sprite_list.append(arcade.Sprite(center_x=self.game_camera.viewport_width / 2,
+                                                          center_y=(minimap_height / 2) + self.game_camera.viewport_height,
+                                                          texture=texture))
+        self.minimap_sprite = self.minimap_sprite_list[0]
+        # Don't show all details on minimap (eg. no shields or engines), and rescale those I do draw to be larger
+        self.minimap_blips = MinimapBlips(self.scene, constants.RESCALED_MINIMAP_SPRITES, scale_multiplier=6,
+                                          camera_width=self.game_camera.viewport_width)
+        self.draw_minimap_background()
+        # The rest of it gets drawn on the first update
+        self.minimap_refresh_timer = 0
 
     @staticmethod
     def scaled_and_centred_text(texts: List[str], width: int, height: int, centre_x: int, centre_y: int) -> List[arcade.Text]:
@@ -225,102 +223,90 @@ class GameView(arcade.View):
 
         return text_objs
 
-    def update_minimap(self):
-        # Want a mini-map: https://api.arcade.academy/en/latest/advanced/texture_atlas.html
+    @property
+    def minimap_projection(self) -> Tuple[float, float, float, float]:
+        return self.game_camera.viewport_width, WORLD_WIDTH - self.game_camera.viewport_width, 0, WORLD_HEIGHT
 
-        def rescale_and_draw(sprite_lists: List[arcade.SpriteList], scale_multiplier: int):
-            for sprite_list in sprite_lists:
-                for sprite in sprite_list:
-                    sprite.scale *= scale_multiplier
-                    # In the game, if the lander is at either end of the map, I keep other sprites in that same area,
-                    # so that they stay on the screen.
-                    # ie. I let other sprites be sprite < self.game_camera.viewport_width and sprite > WORLD_WIDTH - self.game_camera.viewport_width
-                    # But for the mini-map, I always want them to wrap at the "correct" time
-                    old_center_x = sprite.center_x
-                    if sprite.center_x > WORLD_WIDTH - self.game_camera.viewport_width:
-                        sprite.center_x -= WORLD_WIDTH - 2 * self.game_camera.viewport_width
-                    elif sprite.center_x < self.game_camera.viewport_width:
-                        sprite.center_x += WORLD_WIDTH - 2 * self.game_camera.viewport_width
-                    sprite.draw()
-                    sprite.center_x = old_center_x
-                    sprite.scale /= scale_multiplier
-
-        proj = self.game_camera.viewport_width, WORLD_WIDTH - self.game_camera.viewport_width, 0, WORLD_HEIGHT
-        with self.minimap_sprite_list.atlas.render_into(self.minimap_texture, projection=proj) as fbo:
+    def draw_minimap_background(self):
+        # Want a mini-map: https://api.arcade.academy/en/latest/advanced/texture_atlas.html
+        # This used to be redrawn every frame along with everything else on the minimap - thousands of stars and
+        # hundreds of terrain rects, none of which ever change.
+        with self.minimap_sprite_list.atlas.render_into(self.minimap_background_texture,
+                                                        projection=self.minimap_projection) as fbo:
             fbo.clear(self.minimap_background_colour)
-            # Draw parallax backgrounds, from furthest away to closest
+            # Draw parallax backgrounds, from furthest away to closest.  On the minimap they're drawn where they'd be
+            # with the camera at the left hand side of the world (wherever the camera is, they'd only line up with
+            # the terrain at one place anyway).
             for parallax_factor in sorted(self.world.background_layers.keys(), reverse=True):
-                self.world.background_layers[parallax_factor].draw()
-            for name in ('Terrain Left Edge', 'Terrain Centre', 'Terrain Right Edge'):
-                self.scene.get_sprite_list(name).draw()
-            # Don't show all details on minimap (eg. no shields or engines), and rescale those I do draw to be larger
-            rescale_and_draw([self.scene[name] for name in constants.RESCALED_MINIMAP_SPRITES], 6)
+                background_layer = self.world.background_layers[parallax_factor]
+                background_layer.center_x = 0
+                background_layer.draw()
+            self.world.terrain.draw()
+
+    def update_minimap(self):
+        with self.minimap_sprite_list.atlas.render_into(self.minimap_texture, projection=self.minimap_projection) as fbo:
+            # See-through, to show the background underneath
+            fbo.clear((0, 0, 0, 0))
+            self.minimap_blips.draw()
 
     def on_update(self, delta_time: float):
         # On my crappy laptop, I see glitches.  Occasionally it takes a while to do a cycle, and then presumably the
         # delta_time is huge which means gravity (or the engine, if it's on) has acted for a long time and suddenly
-        # you can go flying.  So I'm going to limit the delta time - if the game struggles on old hardware, it will just
-        # run slowly
-        delta_time = min(delta_time, 1/50)
-
-        # Run the "on_update" function on every sprite in every sprite list ...
-        self.scene.on_update(delta_time=delta_time)
-
-        # I want the lander to always face the mouse pointer, but we only get updates on events (eg. mouse movement)
-        # ie. If the mouse is still and the ship flies past it, without further events, it will be facing in the wrong
-        # direction.
-        # So on mouse move event I store the mouse coordinates, and on every update (event or not) I ensure the ship
-        # is facing the right way.
-        if self.lander.mouse_location is not None:
-            self.lander.face_point((self.lander.mouse_location + self.game_camera.position))
-
-        self.apply_world_wrap_to_sprites(screen_width=self.game_camera.viewport_width)
-
-        # Check to see if the level's been completed!
-        if self.lander.landed and len(self.scene['Hostages']) == 0:
-            arcade.play_sound(self.level_complete)
-            constants.GAME_OBJECTS["score"] += 150
-            self.window.show_view(NextLevelView(level=self.level))
-
-
-        self.update_minimap()
+        # you can go flying.  So the physics always moves on in fixed steps, as many as fit into the time that's
+        # passed (the remainder is carried over to the next frame).  If the game struggles on old hardware, and falls
+        # too many steps behind, it just runs slowly rather than trying to catch up.
+        self.physics_accumulator += delta_time * self.replay_speed
+        max_steps = MAX_PHYSICS_STEPS_PER_FRAME * self.replay_speed
+        if self.physics_accumulator > max_steps * PHYSICS_TIMESTEP:
+            self.physics_accumulator = max_steps * PHYSICS_TIMESTEP
+        while self.physics_accumulator >= PHYSICS_TIMESTEP:
+            self.physics_accumulator -= PHYSICS_TIMESTEP
+            if self.physics_accumulator < PHYSICS_TIMESTEP:
+                # Last step this frame - remember where everything was, for drawing
+                self.previous_positions = self.get_interpolated_sprite_positions()
+            if self.physics_step(PHYSICS_TIMESTEP):
+                # Level complete
+                return
+
+        self.minimap_refresh_timer -= delta_time
+        if self.minimap_refresh_timer <= constants.TIMER_TOLERANCE:
+            self.update_minimap()
+            # (If we've fallen behind, we don't try to catch up)
+            self.minimap_refresh_timer = max(self.minimap_refresh_timer + 1 / MINIMAP_REFRESH_RATE, 0)
         self.update_hud_text()
 
-        # Check for collisions
-        collisions.check_for_collisions(self.scene, self.game_camera, self.world)
-
-        # Parallax scrolling of the backgrounds
-        # I find updating the positions of the backgrounds in this on_update() function causes a slight flicker as you
-        # cross the camera_width boundary - but that goes away if I move the update to the on_draw() function!
-        # I don't know why, but there you go. Parallax background position updates are done alongside the draw().
-
-        # For testing purposes - occasionally useful to have a regular explosion appear!
-        #self.add_test_explosion(delta_time)
-
-    def add_test_explosion(self, delta_time: float):
-        self.timer += delta_time
-        if self.timer > 10:
-            self.timer = 0
-            Explosion(scene=self.scene,
-                      world=self.world,
-                      camera=self.game_camera,
-                      mass=50,
-                      scale=0.2 * SCALING,
-                      radius_initial=int(self.lander.height) // 2,
-                      radius_final=int(self.lander.height) * 8,
-                      lifetime=4,  # seconds
-                      # Force here is what's applied to airborne objects that are
-                      # within the explosion (and presumably shielded!).
-                      # Say gravity is 100, lander mass is 20, so gravitational force
-                      # is f = ma -> 2000.
-                      # So trying to get a feel for what the right value should be,
-                      # but 4000 is double the kind of average gravitational pull
-                      force=4000,  # was 20
-                      velocity_x=0,
-                      velocity_y=0,
-                      center_x=3000,
-                      center_y=1000,
-                      owner=None)
+    def physics_step(self, delta_time: float) -> bool:
+        if self.simulation.step(delta_time):
+            # Level complete
+            self.simulation.stop_recording()
+            sounds.play_sound(self.level_complete)
+            self.window.show_view(NextLevelView(level=self.level))
+            return True
+        return False
+
+    def get_interpolated_sprite_positions(self) -> dict[arcade.Sprite, Tuple[float, float]]:
+        return {sprite: (sprite.center_x, sprite.center_y)
+                for name in constants.INTERPOLATED_SPRITELISTS for sprite in self.scene[name]}
+
+    def interpolate_sprite_positions(self):
+        # The physics has usually run a little bit ahead of the time we're drawing (up to a step), so moving sprites
+        # are drawn the right fraction of the way between where they were before the last step and where they are now.
+        # Otherwise, drawing at 144Hz (say) with 60Hz physics would look juddery.
+        fraction = self.physics_accumulator / PHYSICS_TIMESTEP
+        self.current_positions = self.get_interpolated_sprite_positions()
+        for sprite, (x, y) in self.current_positions.items():
+            previous = self.previous_positions.get(sprite)
+            # Nothing to do for new sprites, and don't draw anything half way across the world when it's wrapped!
+            if previous is None or abs(x - previous[0]) > self.game_camera.viewport_width:
+                continue
+            sprite.center_x = previous[0] + (x - previous[0]) * fraction
+            sprite.center_y = previous[1] + (y - previous[1]) * fraction
+
+    def restore_sprite_positions(self):
+        for sprite, (x, y) in self.current_positions.items():
+            sprite.center_x = x
+            sprite.center_y = y
+        self.current_positions = {}
 
     def update_hud_text(self):
         self.right_hud_text[0].text = f"FUEL: {self.lander.engine.fuel:.0f}"
@@ -331,130 +317,49 @@ class GameView(arcade.View):
         self.left_hud_text[1].text = f"SCORE: {constants.GAME_OBJECTS['score']:.0f}"
         self.left_hud_text[2].text = f"GRAVITY: {self.world.gravity:.0f}"
         self.left_hud_text[3].text = f"FPS: {arcade.get_fps():.0f}"
+        self.culling_text.text = str(self.scene_culler)
         # Might want to reactivate these at some point:
         #self.pos_text.text = f"Pos: {self.lander.center_x:.0f}, {self.lander.center_y:.0f}"
 
-    def apply_world_wrap_to_sprites(self, screen_width: int):
-        # If the Lander (or its explosion) flies off the edge of the world, I want to wrap it around instantly,
-        # so the user doesn't notice.
-        # I have crafted the World so that the first two window.widths are the same as the last two.
-        # So I pull off this trick by never letting the user get closer than 1 window.width to the edge of the world
-        # - when this boundary is crossed, the user is flipped to the other side (along with all the sprites!).
-        # I wrap other sprites in the same way, ensuring they are always (when relevant) on the same side of
-        # the world as the lander
-        # First, just deal with sprite positions.  Then consider the camera.
-        # Landing pad is effectively terrain.  Shields and Engines move themselves, as centred on owner
-        non_terrain_spritelists = [self.scene[i] for i in constants.NON_TERRAIN_SPRITELISTS]
-        non_terrain_sprites = [s for i in non_terrain_spritelists for s in i]
-        # Flip all sprites from one side to the other
-        for s in non_terrain_sprites:
-            if s.center_x < screen_width:
-                s.center_x += WORLD_WIDTH - 2 * screen_width
-            elif s.center_x > WORLD_WIDTH - screen_width:
-                s.center_x -= WORLD_WIDTH - 2 * screen_width
-        # But if the lander is in the first or last 2 viewport_widths, we ensure the lander can see them
-        if self.lander.center_x < 2 * screen_width:
-            for s in [i for i in non_terrain_sprites
-                      if WORLD_WIDTH - 2 * screen_width <= i.center_x + i.width / 2]:
-                s.center_x -= WORLD_WIDTH - 2 * screen_width
-        elif WORLD_WIDTH - 2 * screen_width <= self.lander.center_x:
-            for s in [i for i in non_terrain_sprites
-                      if 2 * screen_width >= i.center_x - i.width / 2]:
-                s.center_x += WORLD_WIDTH - 2 * screen_width
-
-        self.apply_world_wrap_to_camera(screen_width)
-
-    def apply_world_wrap_to_camera(self, screen_width):
-        # If we've wrapped the lander to the other side of the world, we move the camera instantly
-        if abs(self.lander.center_x - self.game_camera.position[0]) > WORLD_WIDTH - 4 * screen_width:
-            if self.lander.center_x > self.game_camera.position[0]:
-                new_x_position = self.game_camera.position[0] + WORLD_WIDTH - 2 * screen_width
-            else:
-                new_x_position = self.game_camera.position[0] - (WORLD_WIDTH - 2 * screen_width)
-            new_position = Vec2(new_x_position + self.lander.change_x,
-                                self.game_camera.position[1] + self.lander.change_y)
-            self.game_camera.move_to(new_position, 1)
-        else:
-            # Gently pan the camera around after the lander
-            self.pan_camera_to_lander(panning_fraction=0.04)
+    @property
+    def replaying(self) -> bool:
+        return self.simulation.replay is not None and not self.simulation.replay.finished
 
+    # While a replay is running, the user can't fly the lander - only pause
     def on_mouse_press(self, x, y, button, modifiers):
-        self.lander.engine.angle = self.lander.angle
-        if button == arcade.MOUSE_BUTTON_RIGHT:
-            self.lander.shield.activate()
-            self.lander.trying_to_activate_shield = True
-        if button == arcade.MOUSE_BUTTON_LEFT:
-            self.lander.engine.activate()
-            self.lander.trying_to_activate_engine = True
-        if button == arcade.MOUSE_BUTTON_MIDDLE:
-            self.lander.activate_EMP()
+        if not self.replaying:
+            self.simulation.on_mouse_press(x, y, button, modifiers)
 
     def on_key_press(self, symbol, modifiers):
-        if symbol == arcade.key.BACKSLASH:
-            self.lander.engine.activate()
-            self.lander.trying_to_activate_engine = True
-        if symbol == arcade.key.X:
-            self.lander.activate_EMP()
-        if symbol == arcade.key.Z:
-            self.lander.shield.activate()
-            self.lander.trying_to_activate_shield = True
-        if modifiers & arcade.key.MOD_SHIFT:
-            self.lander.engine.boost(True)
-        if symbol == arcade.key.R:
-            # eventually seem to run out of space.
-            # Found this: https://stackoverflow.com/questions/71599404/python-arcade-caches-textures-when-requested-not-to
-            # So hopefully this will be fixed in Arcade 2.7
-            # If we restart the level, the score is reset to 0
-            constants.GAME_OBJECTS["score"] = 0
-            self.setup(level=self.level)
+        if not self.replaying:
+            self.simulation.on_key_press(symbol, modifiers)
+            if symbol == arcade.key.R:
+                # Restarting used to eventually run the texture atlas out of space, as every level's terrain and
+                # minimap got new textures (see https://stackoverflow.com/questions/71599404/python-arcade-caches-textures-when-requested-not-to).
+                # The textures are shared and reused now (see textures.py).
+                # If we restart the level, the score is reset to 0
+                constants.GAME_OBJECTS["score"] = 0
+                self.setup(level=self.level)
         if symbol == arcade.key.ESCAPE:
             # pass self, the current view, so we can return to it (ie. when we unpause)
             menu = MenuView(game_view=self)
             self.window.show_view(menu)
 
     def on_key_release(self, symbol, modifiers):
-        if symbol == arcade.key.BACKSLASH:
-            self.lander.engine.deactivate()
-            self.lander.trying_to_activate_engine = False
-        if symbol == arcade.key.Z:
-            self.lander.shield.deactivate()
-            self.lander.trying_to_activate_shield = False
-        if not modifiers & arcade.key.MOD_SHIFT:
-            self.lander.engine.boost(False)
+        if not self.replaying:
+            self.simulation.on_key_release(symbol, modifiers)
 
     def on_mouse_release(self, x, y, button, modifiers):
-        self.lander.engine.angle = self.lander.angle
-        if button == arcade.MOUSE_BUTTON_RIGHT:
-            self.lander.shield.deactivate()
-            self.lander.trying_to_activate_shield = False
-        if button == arcade.MOUSE_BUTTON_LEFT:
-            self.lander.engine.deactivate()
-            self.lander.trying_to_activate_engine = False
+        if not self.replaying:
+            self.simulation.on_mouse_release(x, y, button, modifiers)
 
     def on_mouse_motion(self, x: int, y: int, dx: int, dy: int) -> None:
-        self.lander.mouse_location = Vec2(x, y)
-
-    def pan_camera_to_lander(self, panning_fraction: float = 1.0):
-        """
-        Manage Scrolling
-
-        :param panning_fraction: Number from 0 to 1. Higher the number, faster we
-                                 pan the camera to the user.
-        """
-
-        # Centre on the lander until it blows up, then centre on it's explosion
-        centre_on = self.lander if not self.lander.explosion else self.lander.explosion
-        camera_x0 = centre_on.center_x - (self.game_camera.viewport_width / 2)
-        camera_y0 = centre_on.center_y - (self.game_camera.viewport_height / 2)
-
-        if camera_y0 < 0:
-            camera_y0 = 0
-        user_centered = Vec2(camera_x0, camera_y0)
-
-        self.game_camera.move_to(user_centered, panning_fraction)
+        if not self.replaying:
+            self.simulation.on_mouse_motion(x, y, dx, dy)
 
     def on_draw(self):
         """Draw all game objects"""
+        self.interpolate_sprite_positions()
         arcade.start_render()
         # Draw the game objects
         self.game_camera.use()
@@ -470,13 +375,17 @@ class GameView(arcade.View):
             # Not sure what's happening between that function and this, but if I do the update alongside the draw here
             # it's rock solid ...
             background_layer.center_x = self.game_camera.position[0] * parallax_factor
-            background_layer.draw()
+            # Only what's on screen actually gets drawn
+            background_layer.draw(left=self.game_camera.position[0],
+                                  right=self.game_camera.position[0] + self.game_camera.viewport_width)
 
         if self.landing_pad.activated and self.lander.dead is False:
             self.lander.draw_landing_angle_guide()
         self.lander.draw_tractor_bream()
-        # Draw game sprites
-        self.scene.draw()
+        # Draw game sprites (just those on screen)
+        self.scene_culler.draw(left=self.game_camera.position[0], bottom=self.game_camera.position[1],
+                               right=self.game_camera.position[0] + self.game_camera.viewport_width,
+                               top=self.game_camera.position[1] + self.game_camera.viewport_height)
 
         # This draws all the hit boxes.
         # Slows things down, but can be used to work out what's going on with collisions!
@@ -486,6 +395,7 @@ class GameView(arcade.View):
         # Draw the overlay - minimap, fuel, shield, etc.
         self.overlay_camera.use()
         self.minimap_sprite_list.draw()
-        for text in [*self.left_hud_text, *self.right_hud_text]:
+        for text in [*self.left_hud_text, *self.right_hud_text, self.culling_text]:
             text.draw()
+        self.restore_sprite_positions()
 
@@ -1,6 +1,7 @@
 import arcade
 import arcade.gui
 from constants import SCALING
+from textures import TEXTURES
 import textwrap
 
 
@@ -9,7 +10,7 @@ class HowToPlayView(arcade.View):
         super().__init__()
         self.menu_view = menu_view  # When we pause game, I pass an instance of the game_view so we can return to it
         self.manager = arcade.gui.UIManager()
-        self.background = arcade.load_texture("images/title_screen.png")
+        self.background = TEXTURES["images/title_screen.png"]
         bg_tex = arcade.load_texture(":resources:gui_basic_assets/window/grey_panel.png")
         # Create a vertical BoxGroup to align buttons
         self.v_box = arcade.gui.UIBoxLayout()
@@ -1,6 +1,7 @@
 import arcade
 import arcade.gui
 from constants import SCALING
+from textures import TEXTURES
 
 
 class MenuView(arcade.View):
@@ -9,7 +10,7 @@ class MenuView(arcade.View):
         self.game_view = game_view  # When we pause game, I pass an instance of the game_view so we can return to it
         self.manager = arcade.gui.UIManager()
         self.resume_button_added = False
-        self.background = arcade.load_texture("images/title_screen.png")
+        self.background = TEXTURES["images/title_screen.png"]
 
         # Create a vertical BoxGroup to align buttons
         self.v_box = arcade.gui.UIBoxLayout()